@@ -0,0 +1,11 @@
+"""
+Settings of the environment named on `DJANGO_ENV`: "development" (the default) or
+"production".
+"""
+
+import os
+
+if os.environ.get("DJANGO_ENV", "development") == "production":
+    from .production import *  # noqa: F401, F403
+else:
+    from .development import *  # noqa: F401, F403
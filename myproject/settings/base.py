@@ -0,0 +1,303 @@
+"""
+Django settings for myproject project, shared by every environment (see __init__.py).
+
+Generated by 'django-admin startproject' using Django 5.1.4.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/5.1/topics/settings/
+
+For the full list of settings and their values, see
+https://docs.djangoproject.com/en/5.1/ref/settings/
+"""
+
+import os
+import sys
+
+from pathlib import Path
+
+# Build paths inside the project like this: BASE_DIR / 'subdir'.
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+
+# Quick-start development settings - unsuitable for production
+# See https://docs.djangoproject.com/en/5.1/howto/deployment/checklist/
+
+# SECURITY WARNING: keep the secret key used in production secret!
+SECRET_KEY = "UD~x6]mZK=fA/<p-J;>cz$?at)r:w3uS9V4[5y*&.!7jE{b(}FQ$P2w{#3V)X;R-,Cg8.%9N='nD>/:xhp?v^~KTqH(<[Gc_fr+B"
+
+# SECURITY WARNING: don't run with debug turned on in production!
+DEBUG = False
+
+ALLOWED_HOSTS = ["*"]
+
+SESSION_COOKIE_SECURE = True
+
+CSRF_COOKIE_SECURE = True
+
+
+# Application definition
+TESTING = "test" in sys.argv
+
+INSTALLED_APPS = [
+    "django.contrib.admin",
+    "django.contrib.auth",
+    "django.contrib.contenttypes",
+    "django.contrib.sessions",
+    "django.contrib.messages",
+    "django.contrib.staticfiles",
+    "polls.apps.PollsConfig",
+]
+
+MIDDLEWARE = [
+    # first, so it measures the time taken by everything else
+    "polls.metrics.InstrumentationMiddleware",
+    "django.middleware.security.SecurityMiddleware",
+    "polls.routers.ReplicaPinningMiddleware",
+    "django.contrib.sessions.middleware.SessionMiddleware",
+    "django.middleware.common.CommonMiddleware",
+    "django.middleware.csrf.CsrfViewMiddleware",
+    "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "django.contrib.messages.middleware.MessageMiddleware",
+    "django.middleware.clickjacking.XFrameOptionsMiddleware",
+]
+
+ROOT_URLCONF = "myproject.urls"
+
+TEMPLATES = [
+    {
+        # Django's backend, timing each render (see polls/metrics.py)
+        "BACKEND": "polls.metrics.DjangoTemplates",
+        "DIRS": [],
+        "APP_DIRS": True,
+        "OPTIONS": {
+            "context_processors": [
+                "django.template.context_processors.debug",
+                "django.template.context_processors.request",
+                "django.contrib.auth.context_processors.auth",
+                "django.contrib.messages.context_processors.messages",
+            ],
+        },
+    },
+]
+
+WSGI_APPLICATION = "myproject.wsgi.application"
+
+
+# Database
+# https://docs.djangoproject.com/en/5.1/ref/settings/#databases
+
+DATABASES = {
+    "default": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": BASE_DIR / "db.sqlite3",
+        # keep connections open between requests instead of reopening (and tuning)
+        # one each time, but check they still work before reusing them
+        "CONN_MAX_AGE": 600,
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {
+            # take the write lock when a transaction starts, so concurrent writers
+            # wait on `busy_timeout` instead of failing with "database is locked"
+            # when they upgrade from a read lock
+            "transaction_mode": "IMMEDIATE",
+        },
+    }
+}
+
+# Bearer token that Prometheus sends to scrape `/metrics`, which is otherwise only
+# served to staff members
+POLLS_METRICS_TOKEN = os.environ.get("POLLS_METRICS_TOKEN")
+
+# Read replicas (aliases on `DATABASES`) that take the reads off the primary, see
+# polls/routers.py. Clients that write keep reading from the primary for
+# `POLLS_REPLICA_PIN_SECONDS`, which should be longer than the replication lag.
+DATABASE_ROUTERS = ["polls.routers.ReplicaRouter"]
+POLLS_DATABASE_REPLICAS = []
+POLLS_REPLICA_PIN_SECONDS = 5
+
+if os.environ.get("POLLS_SQLITE_REPLICA") == "1":
+    # stand-in replica to try the router locally: a copy of db.sqlite3 kept in
+    # sync by `manage.py sync_replica --interval 1`
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "NAME": BASE_DIR / "db.replica.sqlite3",
+        "TEST": {"MIRROR": "default"},
+    }
+    POLLS_DATABASE_REPLICAS = ["replica"]
+
+# Pragmas run on each new SQLite connection (see polls/sqlite.py). WAL lets readers
+# go on while a write is in progress, NORMAL only syncs on checkpoints (safe under
+# WAL), busy_timeout makes locked writers retry for up to that many milliseconds, and
+# mmap_size and cache_size (negative means KiB) keep more of the database in memory.
+POLLS_SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -64 * 1024,
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+
+# The poll versions and everything else on the cache must be the same for every
+# worker process, so deployments with more than one need a cache they all share,
+# like Redis at `DJANGO_REDIS_URL`. Without it, each process keeps its own cache in
+# memory, which only suits a single process (like `manage.py runserver`).
+if REDIS_URL := os.environ.get("DJANGO_REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "OPTIONS": {"MAX_ENTRIES": 10000},
+        }
+    }
+
+# Whether the cache is shared by every process serving requests
+POLLS_CACHE_SHARED = bool(REDIS_URL)
+
+if TESTING:
+    # the database is rolled back after each test but a cache wouldn't be, so tests
+    # run without one unless they enable it (see polls/tests/test_caching.py)
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+
+# With a shared cache, sessions are read from it and written through to the
+# database, so they survive restarts (see `manage.py clear_stale_sessions` for the
+# cleanup), and the users of authenticated requests are cached for
+# `POLLS_USER_CACHE_TIMEOUT` seconds too (see polls/auth.py). They're dropped from
+# the cache whenever they're saved. On a cache of each process, the others would
+# keep sessions that were logged out and users that were deactivated, so they're
+# read from the database.
+if POLLS_CACHE_SHARED:
+    SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
+    AUTHENTICATION_BACKENDS = ["polls.auth.CachedModelBackend"]
+POLLS_USER_CACHE_TIMEOUT = 60
+
+# Login attempts allowed per client IP and per username over a sliding window of
+# `POLLS_LOGIN_THROTTLE_WINDOW` seconds (see polls/throttle.py). Attempts over them
+# are rejected before the password is hashed.
+POLLS_LOGIN_MAX_ATTEMPTS_PER_IP = 30
+POLLS_LOGIN_MAX_ATTEMPTS_PER_USERNAME = 10
+POLLS_LOGIN_THROTTLE_WINDOW = 5 * 60
+
+# Addresses of the reverse proxies in front of the app, comma separated on
+# `POLLS_TRUSTED_PROXIES`. Requests from them are limited by the client IP they add
+# to `X-Forwarded-For` instead of by their own, which every visitor would share.
+POLLS_TRUSTED_PROXIES = [
+    address.strip()
+    for address in os.environ.get("POLLS_TRUSTED_PROXIES", "").split(",")
+    if address.strip()
+]
+
+# Searches rank only the newest `POLLS_SEARCH_MAX_RANKED` questions matching them, so
+# a common word doesn't make SQLite score every question. The older matches are
+# listed after them, newest first (see polls/search.py).
+POLLS_SEARCH_MAX_RANKED = 2000
+
+# Largest number of rows the admin lists count exactly. Lists with more are estimated
+# (see `EstimatedCountPaginator` in polls/admin.py).
+POLLS_ADMIN_MAX_COUNT = 1000
+
+# Votes weigh half as much on the trending polls every `POLLS_TRENDING_HALF_LIFE`
+# seconds. The top `POLLS_TRENDING_SIZE` polls are kept on the cache, and read again
+# from the database every `POLLS_TRENDING_CACHE_TIMEOUT` seconds (see polls/trending.py).
+POLLS_TRENDING_HALF_LIFE = 6 * 60 * 60
+POLLS_TRENDING_SIZE = 20
+POLLS_TRENDING_CACHE_TIMEOUT = 60
+
+# Seconds the vote histograms keep their minute and hour buckets before they are
+# rolled up into hours and days by `manage.py roll_up_votes` (see polls/histogram.py).
+POLLS_HISTOGRAM_MINUTE_RETENTION = 24 * 60 * 60
+POLLS_HISTOGRAM_HOUR_RETENTION = 30 * 24 * 60 * 60
+
+# Seconds the snapshot of a poll stays cached (see polls/caching.py). It is also
+# replaced whenever the poll or its votes change.
+POLLS_SNAPSHOT_CACHE_TIMEOUT = 60 * 60
+
+# Longest time (in seconds) an index page is cached for anonymous visitors. Pages also
+# expire when the next scheduled question gets published and whenever a question changes.
+POLLS_INDEX_CACHE_TIMEOUT = 10 * 60
+
+
+# Password validation
+# https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
+    },
+    {
+        "NAME": "django.contrib.auth.password_validation.MinimumLengthValidator",
+    },
+    {
+        # Django's, with the list loaded when the app starts (see polls/validators.py)
+        "NAME": "polls.validators.CommonPasswordValidator",
+    },
+    {
+        "NAME": "django.contrib.auth.password_validation.NumericPasswordValidator",
+    },
+]
+
+
+# Internationalization
+# https://docs.djangoproject.com/en/5.1/topics/i18n/
+
+LANGUAGE_CODE = "en-us"
+
+TIME_ZONE = "America/Sao_Paulo"
+
+USE_I18N = True
+
+USE_TZ = True
+
+
+# Static files (CSS, JavaScript, Images)
+# https://docs.djangoproject.com/en/5.1/howto/static-files/
+
+STATIC_URL = "static/"
+STATICFILES_DIRS = [BASE_DIR / "myproject/static"]
+STATIC_ROOT = BASE_DIR / "static"
+
+# Serve the index, details, results and vote pages through the async views in
+# polls/async_views.py. They only pay off under ASGI, so asgi.py turns this on.
+POLLS_ASYNC_VIEWS = os.environ.get("POLLS_ASYNC_VIEWS") == "1"
+
+if POLLS_ASYNC_VIEWS:
+    # requests don't run on a fixed set of threads under ASGI, so persistent
+    # connections wouldn't be reused and would only pile up
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+
+# The ASGI app streams the results of each poll as they change (see polls/live.py).
+# The vote counts of a watched poll are read once every `POLLS_LIVE_RESULTS_INTERVAL`
+# seconds, however many clients watch it, and idle streams get a keepalive comment
+# every `POLLS_LIVE_RESULTS_KEEPALIVE` seconds.
+POLLS_LIVE_RESULTS_INTERVAL = 1.0
+POLLS_LIVE_RESULTS_KEEPALIVE = 15
+
+# Vote counting
+# `VoteView` records votes through the counter class set here (see polls/counters.py).
+# Use "polls.counters.ShardedCounter" to spread the votes of each choice across
+# `POLLS_VOTE_SHARDS` rows when a single poll gets many concurrent voters, or
+# "polls.counters.BufferedCounter" to write them in batches under bursty traffic, or
+# "polls.counters.LedgerCounter" to only insert them on the vote ledger and count them
+# later with `manage.py compact_votes`.
+
+POLLS_VOTE_COUNTER = "polls.counters.DirectCounter"
+POLLS_VOTE_SHARDS = 8
+
+# A buffered counter flushes after this many votes or this many seconds, which is
+# also the most a crashed worker can lose. The sharded counter buffers the activity
+# of the questions (see polls/trending.py) the same way.
+POLLS_VOTE_BUFFER_MAX_VOTES = 100
+POLLS_VOTE_BUFFER_MAX_DELAY = 0.3
+
+# Default primary key field type
+# https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
+
+DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
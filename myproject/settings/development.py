@@ -0,0 +1,23 @@
+"""
+Settings for local development, with debugging and the Django Debug Toolbar on.
+"""
+
+from .base import *  # noqa: F401, F403
+from .base import INSTALLED_APPS, MIDDLEWARE, TESTING
+
+DEBUG = True
+
+INTERNAL_IPS = [
+    "127.0.0.1",
+]
+
+if not TESTING:
+    INSTALLED_APPS = [
+        *INSTALLED_APPS,
+        "debug_toolbar",
+    ]
+
+    MIDDLEWARE = [
+        *MIDDLEWARE,
+        "debug_toolbar.middleware.DebugToolbarMiddleware",
+    ]
@@ -0,0 +1,59 @@
+"""
+Settings for production, with nothing that only helps debugging. Run
+`DJANGO_ENV=production manage.py check --deploy` to make sure none of it is left on.
+"""
+
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .base import *  # noqa: F401, F403
+from .base import POLLS_CACHE_SHARED, SECRET_KEY, TEMPLATES
+
+DEBUG = False
+
+SECRET_KEY = os.environ.get("DJANGO_SECRET_KEY", SECRET_KEY)
+
+ALLOWED_HOSTS = os.environ.get("DJANGO_ALLOWED_HOSTS", "*").split(",")
+
+# every worker must see the same cache (see base.py). A cache table on the database
+# would take more queries than the cache saves, so it has to be Redis.
+if not POLLS_CACHE_SHARED:
+    raise ImproperlyConfigured(
+        "Set DJANGO_REDIS_URL to a Redis cache that every worker shares."
+    )
+
+# parse each template once per process instead of on every render, and leave out
+# the debug context processor, which tracks the SQL queries of each request
+TEMPLATES = [
+    {
+        **TEMPLATES[0],
+        "APP_DIRS": False,
+        "OPTIONS": {
+            **TEMPLATES[0]["OPTIONS"],
+            "context_processors": [
+                processor
+                for processor in TEMPLATES[0]["OPTIONS"]["context_processors"]
+                if processor != "django.template.context_processors.debug"
+            ],
+            "loaders": [
+                (
+                    "django.template.loaders.cached.Loader",
+                    [
+                        "django.template.loaders.filesystem.Loader",
+                        "django.template.loaders.app_directories.Loader",
+                    ],
+                ),
+            ],
+        },
+    },
+]
+
+# serve static files under names that include a hash of their content, so they can
+# be cached by browsers forever (run `manage.py collectstatic` on each deploy)
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {
+        "BACKEND": "django.contrib.staticfiles.storage.ManifestStaticFilesStorage"
+    },
+}
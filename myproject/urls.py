@@ -15,10 +15,11 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
 
-from debug_toolbar.toolbar import debug_toolbar_urls
+from polls.views import MetricsView
 
 from .views import RedirectToPolls
 
@@ -26,4 +27,11 @@ urlpatterns = [
     path("", RedirectToPolls.as_view()),
     path("admin/", admin.site.urls),
     path("polls/", include("polls.urls")),
-] + debug_toolbar_urls()
+    path("metrics", MetricsView.as_view(), name="metrics"),
+]
+
+# only installed in development (see myproject/settings)
+if "debug_toolbar" in settings.INSTALLED_APPS:
+    from debug_toolbar.toolbar import debug_toolbar_urls
+
+    urlpatterns += debug_toolbar_urls()
@@ -1,6 +1,129 @@
+import datetime
+from math import ceil
+
+from django.conf import settings
 from django.contrib import admin
+from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
+from django.db.models import Max, Min, QuerySet
+from django.utils import timezone
+from django.utils.functional import cached_property
 
 from .models import Question, Choice
+from .search import match_query, search_filter
+
+
+class EstimatedCountPaginator(Paginator):
+    """Counts at most `settings.POLLS_ADMIN_MAX_COUNT` rows, so large tables aren't
+    counted whole on every page. Past that, unfiltered lists are estimated by their
+    largest id and filtered ones are cut at the limit.
+
+    The pages of an estimated count only go as far as the rows known to be there:
+    the ones within the limit, and the page after each full page that is opened, so
+    "next" reaches every row without linking pages that may not exist.
+    """
+
+    estimated = False
+
+    @cached_property
+    def count(self):
+        limit = settings.POLLS_ADMIN_MAX_COUNT
+        count = self.object_list.order_by().values("pk")[: limit + 1].count()
+        if count <= limit:
+            return count
+        self.estimated = True
+        self.known = count
+        if not self.object_list.query.has_filters():
+            return self.object_list.aggregate(last=Max("pk"))["last"]
+        return limit
+
+    @property
+    def num_pages(self):
+        self.count  # tells whether it's estimated
+        if not self.estimated:
+            return super().num_pages
+        return ceil(max(1, self.known - self.orphans) / self.per_page)
+
+    def page(self, number):
+        self.count  # tells whether it's estimated
+        if not self.estimated:
+            return super().page(number)
+
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(self.error_messages["invalid_page"])
+        if number < 1:
+            raise EmptyPage(self.error_messages["min_page"])
+        bottom = (number - 1) * self.per_page
+        # with the first row of the next page, if there is one
+        rows = list(self.object_list[bottom : bottom + self.per_page + 1])
+        if not rows:
+            raise EmptyPage(self.error_messages["no_results"])
+        self.known = max(self.known, bottom + len(rows))
+        return self._get_page(rows[: self.per_page], number, self)
+
+
+def truncate_date(value: datetime.datetime, kind: str, tzinfo) -> datetime.datetime:
+    value = value.astimezone(tzinfo)
+    fields = {
+        "year": (value.year, 1, 1),
+        "month": (value.year, value.month, 1),
+        "day": (value.year, value.month, value.day),
+    }
+    return timezone.make_aware(datetime.datetime(*fields[kind]), tzinfo)
+
+
+def next_date(value: datetime.datetime, kind: str, tzinfo) -> datetime.datetime:
+    if kind == "year":
+        following = datetime.datetime(value.year + 1, 1, 1)
+    elif kind == "month":
+        following = datetime.datetime(
+            value.year + value.month // 12, value.month % 12 + 1, 1
+        )
+    else:
+        following = datetime.datetime(
+            value.year, value.month, value.day
+        ) + datetime.timedelta(days=1)
+    return timezone.make_aware(following, tzinfo)
+
+
+class IndexedDatesQuerySet(QuerySet):
+    """Finds the years, months or days of the date hierarchy by seeking the next one
+    on the `pub_date` index, one query per date found, instead of truncating the date
+    of every question to pick the distinct ones.
+    """
+
+    def aggregate(self, *args, **kwargs):
+        # SQLite only reads a MIN() or MAX() straight from an index when it's alone
+        # on its query, like the ones of the first and last dates of the hierarchy
+        if (
+            not args
+            and len(kwargs) > 1
+            and all(isinstance(aggregate, (Min, Max)) for aggregate in kwargs.values())
+        ):
+            aggregate = super().aggregate
+            return {
+                name: aggregate(**{name: value})[name] for name, value in kwargs.items()
+            }
+        return super().aggregate(*args, **kwargs)
+
+    def datetimes(self, field_name, kind, order="ASC", tzinfo=None):
+        if kind not in ("year", "month", "day"):
+            return super().datetimes(field_name, kind, order, tzinfo)
+
+        tzinfo = tzinfo or timezone.get_current_timezone()
+        dates = self.order_by(field_name).values_list(field_name, flat=True)
+        found = []
+        start = None
+        while True:
+            following = (
+                dates.filter(**{f"{field_name}__gte": start}) if start else dates
+            )
+            if (first := following.first()) is None:
+                break
+            found.append(truncate_date(first, kind, tzinfo))
+            start = next_date(found[-1], kind, tzinfo)
+        return found if order == "ASC" else found[::-1]
 
 
 # class that will be used to display a model as part of another model on the create/edit page
@@ -8,11 +131,19 @@ class ChoiceInLine(admin.TabularInline):
     model = Choice
     extra = 2
 
+    # `votes` doesn't include the votes stored on shards, so the sum is shown next to it
+    readonly_fields = ["total_votes"]
+
 
 class QuestionAdmin(admin.ModelAdmin):
     # defines all the information that will be displayed on the page listing all the entries on the data base
     # also allows sorting by any of these values (although arbitrary functions need some extra steps for that)
-    list_display = ["question_text", "pub_date", "was_published_recently"]
+    list_display = [
+        "question_text",
+        "pub_date",
+        "was_published_recently",
+        "total_votes",
+    ]
 
     # associate field groups of the model to named sections on the create/edit page
     fieldsets = (
@@ -26,8 +157,47 @@ class QuestionAdmin(admin.ModelAdmin):
     # allows entries to be filtered by the fields in the list (the filter is based on the type of the function)
     list_filter = ["pub_date"]
 
+    # newest first, which walks the `(pub_date, id)` index instead of sorting
+    # every matching entry (the admin adds the id to the ordering itself)
+    ordering = ["-pub_date"]
+
+    # links to browse the entries by year, month and day (see `IndexedDatesQuerySet`)
+    date_hierarchy = "pub_date"
+
+    # the counts of big tables are estimated instead (see `EstimatedCountPaginator`),
+    # and the count of the unfiltered table isn't shown at all
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
     # allows searches on the specified fields
     search_fields = ["question_text"]
 
+    # searches go through the full-text index instead of `LIKE '%term%'` on the
+    # fields above, and match the text of the choices too (see polls/search.py)
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        if not match_query(search_term):  # only punctuation, which FTS5 can't match
+            return queryset.none(), False
+        return queryset.filter(search_filter(search_term)), False
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        return IndexedDatesQuerySet(queryset.model, queryset.query, queryset.db)
+
+    def get_changelist_instance(self, request):
+        # the votes of the questions on the page are summed with a single query
+        changelist = super().get_changelist_instance(request)
+        questions = {question.pk: question for question in changelist.result_list}
+        for question in questions.values():
+            question.total_votes = 0
+        for choice in Choice.objects.filter(question__in=questions).with_total_votes():
+            questions[choice.question_id].total_votes += choice.total_votes
+        return changelist
+
+    @admin.display(description="Total votes")
+    def total_votes(self, question: Question):
+        return question.total_votes
+
 
 admin.site.register(Question, QuestionAdmin)
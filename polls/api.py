@@ -0,0 +1,180 @@
+"""
+Read-only JSON API of the polls, for the clients that would otherwise scrape the
+HTML pages.
+
+Every response has a strong ETag and requests that send it back on If-None-Match
+get a 304. The ETags of a poll come from its snapshot version (see caching.py),
+so checking them costs a single cache lookup, and the list pages are cached whole,
+like the index page. Versions only tell every worker that a poll changed when they
+share the cache (`settings.POLLS_CACHE_SHARED`), so the polls have no ETags
+otherwise: a worker that missed a bump would keep answering 304 to stale ETags.
+"""
+
+import hashlib
+import json
+
+from django.conf import settings
+from django.http import (
+    HttpRequest,
+    HttpResponse,
+    HttpResponseBadRequest,
+    JsonResponse,
+    Http404,
+)
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.http import condition
+
+from .models import Question
+from .caching import (
+    get_poll_version,
+    get_poll_snapshot,
+    get_cached_index_page,
+    cache_index_page,
+)
+from .counters import get_vote_counter, with_pending_votes
+from .histogram import Resolution, bucket_start, get_histogram
+from .pagination import get_page
+from .routers import use_primary
+
+
+def question_data(question: Question) -> dict:
+    return {
+        "id": question.pk,
+        "question_text": question.question_text,
+        "pub_date": question.pub_date.isoformat(),
+    }
+
+
+def etag_version(pk: int) -> int | None:
+    # None when the cache can't hold versions, or when they aren't shared
+    return get_poll_version(pk) if settings.POLLS_CACHE_SHARED else None
+
+
+def poll_etag(request: HttpRequest, pk: int) -> str | None:
+    # quoted by `condition()`, and left out without a version
+    version = etag_version(pk)
+    return f"poll-{pk}-{version}" if version is not None else None
+
+
+def results_etag(request: HttpRequest, pk: int) -> str | None:
+    # the results include the pending votes, which the version doesn't cover when
+    # each worker has its own
+    if get_vote_counter().pending_per_process:
+        return None
+    version = etag_version(pk)
+    return f"results-{pk}-{version}" if version is not None else None
+
+
+def get_resolution(request: HttpRequest) -> Resolution | None:
+    resolutions = {resolution.label: resolution for resolution in Resolution}
+    return resolutions.get(request.GET.get("resolution", Resolution.HOUR.label))
+
+
+def histogram_etag(request: HttpRequest, pk: int) -> str | None:
+    # the histogram also changes when its buckets move along, with or without votes
+    version = etag_version(pk)
+    if version is None or (resolution := get_resolution(request)) is None:
+        return None
+    bucket = int(bucket_start(timezone.now(), resolution).timestamp())
+    return f"histogram-{pk}-{version}-{resolution.label}-{bucket}"
+
+
+class QuestionListView(View):
+    """Published questions, newest first, in pages that start after the `?after`
+    cursor given on `next` by the previous one.
+    """
+
+    page_size = 20
+
+    def get(self, request: HttpRequest):
+        cursor = request.GET.get("after")
+        content = get_cached_index_page(cursor, "api-index")
+        if content is None:
+            with use_primary():
+                content = self.render_page(cursor)
+            cache_index_page(cursor, content, "api-index")
+
+        response = HttpResponse(content, content_type="application/json")
+        response["ETag"] = f'"{hashlib.md5(content).hexdigest()}"'
+        return get_conditional_response(
+            request, etag=response["ETag"], response=response
+        )
+
+    def render_page(self, cursor: str | None) -> bytes:
+        try:
+            questions, next_cursor = get_page(
+                Question.objects.all(), cursor, self.page_size, timezone.now()
+            )
+        except ValueError:
+            raise Http404("Invalid page.")
+
+        data = {
+            "questions": [
+                {
+                    **question_data(question),
+                    "url": reverse("polls:api-question", args=(question.pk,)),
+                }
+                for question in questions
+            ],
+            "next": next_cursor,
+        }
+        return json.dumps(data).encode()
+
+
+@method_decorator(condition(etag_func=poll_etag), name="get")
+class QuestionDetailView(View):
+    def get(self, request: HttpRequest, pk: int):
+        question, choices = get_poll_snapshot(pk)
+        if question.pub_date > timezone.now():
+            raise Http404("No Question matches the given query.")
+
+        return JsonResponse(
+            {
+                **question_data(question),
+                "choices": [
+                    {"id": choice.pk, "choice_text": choice.choice_text}
+                    for choice in choices
+                ],
+                "results": reverse("polls:api-results", args=(pk,)),
+            }
+        )
+
+
+@method_decorator(condition(etag_func=results_etag), name="get")
+class ResultsView(View):
+    def get(self, request: HttpRequest, pk: int):
+        question, choices = get_poll_snapshot(pk)
+        return JsonResponse(
+            {
+                **question_data(question),
+                "choices": [
+                    {
+                        "id": choice.pk,
+                        "choice_text": choice.choice_text,
+                        "votes": choice.total_votes,
+                    }
+                    for choice in with_pending_votes(choices)
+                ],
+            }
+        )
+
+
+@method_decorator(condition(etag_func=histogram_etag), name="get")
+class HistogramView(View):
+    """Votes of each choice over time, on the buckets of the `?resolution` given
+    (minute, hour or day, hour by default).
+    """
+
+    def get(self, request: HttpRequest, pk: int):
+        resolution = get_resolution(request)
+        if resolution is None:
+            return HttpResponseBadRequest("Unknown resolution.")
+
+        question, choices = get_poll_snapshot(pk)
+        with use_primary():
+            histogram = get_histogram(choices, resolution)
+        return JsonResponse({**question_data(question), **histogram})
@@ -4,3 +4,21 @@ from django.apps import AppConfig
 class PollsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "polls"
+
+    def ready(self):
+        # keeps the caches in sync with the models
+        from . import signals  # noqa: F401
+
+        # tunes each new database connection
+        from . import sqlite  # noqa: F401
+
+        # times the queries of each request
+        from . import metrics  # noqa: F401
+
+        # loads the lists of the password validators before the first registration
+        from .validators import preload_password_validators
+
+        preload_password_validators()
+
+        # flags debugging aids left on in production
+        from . import checks  # noqa: F401
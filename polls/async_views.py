@@ -0,0 +1,200 @@
+"""
+Async versions of the views that get the most traffic, which use the async ORM
+all the way through so they don't need a thread per request under ASGI.
+
+They are served instead of the ones in `views.py` when `settings.POLLS_ASYNC_VIEWS`
+is set (see polls/urls.py).
+"""
+
+import json
+from contextlib import aclosing
+from urllib.parse import urlencode
+
+from django.utils import timezone
+from django.contrib.auth.views import redirect_to_login
+from django.http import (
+    HttpResponse,
+    HttpResponseBadRequest,
+    HttpResponseRedirect,
+    Http404,
+    StreamingHttpResponse,
+)
+from django.urls import reverse
+from django.views import View
+from django.shortcuts import render
+from django.core.handlers.asgi import ASGIRequest
+
+from .models import Question, Choice
+from .counters import AlreadyVoted, acast_vote, awith_pending_votes
+from .caching import aget_poll_snapshot, aget_cached_index_page, acache_index_page
+from .pagination import aget_page
+from .export import FORMATS, aexport_results
+from .live import live_results
+from .routers import use_primary
+from . import views
+
+
+async def load_user(request: ASGIRequest):
+    """Loads the user without blocking and stores it on `request.user`, so the
+    templates don't trigger a synchronous query when reading it.
+    """
+    request.user = await request.auser()
+    return request.user
+
+
+class IndexView(View):
+    async def get(self, request: ASGIRequest):
+        user = await load_user(request)
+        cursor = request.GET.get("after")
+        if user.is_authenticated:
+            return await self.render_page(request, cursor)
+
+        # anonymous visitors all see the same page, so it can be cached whole
+        content = await aget_cached_index_page(cursor)
+        if content is not None:
+            return HttpResponse(content)
+
+        with use_primary():
+            response = await self.render_page(request, cursor)
+        await acache_index_page(cursor, response.content)
+        return response
+
+    async def render_page(self, request: ASGIRequest, cursor: str | None):
+        try:
+            question_list, next_cursor = await aget_page(
+                Question.objects.all(),
+                cursor,
+                views.IndexView.page_size,
+                timezone.now(),
+            )
+        except ValueError:
+            raise Http404("Invalid page.")
+
+        return render(
+            request,
+            "polls/index.html",
+            context={
+                "question_list": question_list,
+                "next_cursor": next_cursor,
+                "is_first_page": not cursor,
+            },
+        )
+
+
+class DetailView(View):
+    async def get(self, request: ASGIRequest, pk: int):
+        await load_user(request)
+        question, choices = await aget_poll_snapshot(pk)
+        if question.pub_date > timezone.now():
+            raise Http404("No Question matches the given query.")
+        return render(
+            request,
+            "polls/details.html",
+            context={"question": question, "choices": choices},
+        )
+
+
+class ResultsView(View):
+    async def get(self, request: ASGIRequest, pk: int):
+        await load_user(request)
+        question, choices = await aget_poll_snapshot(pk)
+        return render(
+            request,
+            "polls/results.html",
+            context={
+                "question": question,
+                "choices": await awith_pending_votes(choices),
+            },
+        )
+
+
+class ResultsStreamView(View):
+    """Server-Sent Events stream of the vote counts of a question, which sends a
+    `votes` event with the counts that changed (choice id -> votes) whenever
+    they do, starting with all of them.
+    """
+
+    async def get(self, request: ASGIRequest, pk: int):
+        await aget_poll_snapshot(pk)  # 404 before starting the stream
+        response = StreamingHttpResponse(
+            self.events(pk), content_type="text/event-stream"
+        )
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"  # don't let proxies hold the events
+        return response
+
+    async def events(self, question_id: int):
+        sent = None
+        # stops watching as soon as the client goes away (Django drops the stream)
+        async with aclosing(live_results.watch(question_id)) as updates:
+            async for totals in updates:
+                if totals is None:
+                    yield ": keepalive\n\n"  # lets the server notice closed connections
+                    continue
+
+                # the first event has every count, even when there are none
+                changed = {
+                    pk: votes
+                    for pk, votes in totals.items()
+                    if sent is None or sent.get(pk) != votes
+                }
+                if sent is None or changed:
+                    yield f"event: votes\ndata: {json.dumps(changed)}\n\n"
+                sent = totals
+
+
+class VoteView(views.VoteView):
+    async def post(self, request: ASGIRequest, question_id: int):
+        user = await load_user(request)
+        if not user.is_authenticated:
+            params = {
+                "next": reverse("polls:details", args=(question_id,)),
+                "error": "You need to be authenticated in to vote.",
+            }
+            return HttpResponseRedirect(f"{reverse('polls:login')}?{urlencode(params)}")
+
+        question, choices = await aget_poll_snapshot(question_id)
+        try:
+            choice = self.get_choice(choices, request.POST["choice"])
+        except (KeyError, ValueError, Choice.DoesNotExist):
+            return self.render_error(
+                request, question, choices, self.ErrorMessages.INVALID_CHOICE
+            )
+
+        try:
+            await acast_vote(user, choice)
+        except AlreadyVoted:
+            return self.render_error(
+                request, question, choices, self.ErrorMessages.ALREADY_VOTED
+            )
+
+        return HttpResponseRedirect(reverse("polls:results", args=(question.id,)))
+
+    def render_error(self, request: ASGIRequest, question, choices, error):
+        return render(
+            request,
+            "polls/details.html",
+            context={
+                "question": question,
+                "choices": choices,
+                "error_message": error.value,
+            },
+        )
+
+
+class ExportView(View):
+    """Async version of `views.ExportView`, which ASGI servers stream as the choices
+    are read instead of reading the whole export first.
+    """
+
+    async def get(self, request: ASGIRequest):
+        # like `staff_member_required`, which can't decorate async methods yet
+        user = await load_user(request)
+        if not (user.is_active and user.is_staff):
+            return redirect_to_login(request.get_full_path(), reverse("admin:login"))
+
+        file_format = request.GET.get("format", "csv")
+        if file_format not in FORMATS:
+            return HttpResponseBadRequest("Unknown format.")
+
+        return views.export_response(aexport_results(file_format), file_format)
@@ -0,0 +1,31 @@
+"""
+Authentication backend that keeps the users of recent requests on the cache, so
+authenticated requests don't look their user up on the database each time. Together
+with the cached sessions, that leaves no queries before the view. The settings only
+use both with a cache that every process shares, so a change to a user or a session
+isn't missed by the others.
+"""
+
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+
+def user_key(user_id) -> str:
+    return f"polls:user:{user_id}"
+
+
+def forget_user(user_id):
+    """Drops the cached user, which must be done whenever it changes."""
+    cache.delete(user_key(user_id))
+
+
+class CachedModelBackend(ModelBackend):
+    def get_user(self, user_id):
+        key = user_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user, settings.POLLS_USER_CACHE_TIMEOUT)
+        return user
@@ -0,0 +1,303 @@
+"""
+Versioned caches of poll snapshots and of the index pages.
+
+A snapshot is a compact tuple with everything the poll pages show: the question
+text, its publication date and its choices in order, along with their vote counts.
+
+Everything cached is read from the primary database (see routers.py), as replicas
+may not have the changes that led to it being cached yet.
+
+Each question has a version number on the cache that is bumped whenever its
+snapshot changes (votes, flushes, compactions and edits), and the snapshots are
+cached under a key that includes that version, so old entries are never read
+again and simply expire. Versions are only created for questions that exist, and
+expire too. The index pages work the same way with a single version
+for every page, bumped whenever a question is created, edited or deleted.
+
+A bump only reaches the processes that share the cache where it's made, so with
+several worker processes the cache has to be one they all use, like Redis (see
+`CACHES` in the settings). On a cache of their own, the other workers keep
+serving what they cached before the bump.
+"""
+
+import time
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Sum
+from django.db.models.functions import Coalesce
+from django.http import Http404
+from django.utils import timezone
+
+from .models import Question, Choice
+from .routers import use_primary
+
+INDEX_VERSION_KEY = "polls:index-version"
+
+
+def version_key(question_id: int) -> str:
+    return f"polls:snapshot-version:{question_id}"
+
+
+def snapshot_key(question_id: int, version: int) -> str:
+    return f"polls:snapshot:{question_id}:{version}"
+
+
+def new_version() -> int:
+    # a version that wasn't used before, in case the old one was evicted
+    return time.time_ns()
+
+
+def version_timeout() -> int:
+    # versions expire like the snapshots cached under them, so the questions that
+    # aren't read anymore (or were deleted) don't keep one forever
+    return settings.POLLS_SNAPSHOT_CACHE_TIMEOUT
+
+
+def get_poll_version(question_id: int) -> int | None:
+    """Returns the version of the question, or `None` if it has none on the cache,
+    which only `get_poll_snapshot()` and `bump_poll_version()` create.
+    """
+    return cache.get(version_key(question_id))
+
+
+async def aget_poll_version(question_id: int) -> int | None:
+    return await cache.aget(version_key(question_id))
+
+
+def bump_poll_version(*question_ids: int):
+    """Makes the cached snapshots of the given questions stale."""
+    for question_id in question_ids:
+        try:
+            cache.incr(version_key(question_id))
+        except ValueError:  # not on the cache
+            cache.add(version_key(question_id), new_version(), version_timeout())
+
+
+def stats_key(name: str, outcome: str) -> str:
+    return f"polls:{name}-cache:{outcome}"
+
+
+def record(name: str, outcome: str):
+    """Counts a hit or a miss (`outcome`) of the cache called `name`."""
+    key = stats_key(name, outcome)
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, None):
+            cache.incr(key)
+
+
+async def arecord(name: str, outcome: str):
+    key = stats_key(name, outcome)
+    try:
+        await cache.aincr(key)
+    except ValueError:
+        if not await cache.aadd(key, 1, None):
+            await cache.aincr(key)
+
+
+def snapshot_rows(question_id: int):
+    """Query that returns one row per choice of the question (or a single row
+    without choice when it has none), with the votes of the shards already added up.
+    """
+    return (
+        Question.objects.filter(pk=question_id)
+        .values(
+            "question_text",
+            "pub_date",
+            "choice__pk",
+            "choice__choice_text",
+            "choice__votes",
+        )
+        .annotate(shard_votes=Coalesce(Sum("choice__shards__count"), 0))
+        .order_by("choice__pk")
+    )
+
+
+def pack(question_id: int, rows: list[dict]):
+    if not rows:
+        return None
+
+    choices = tuple(
+        (
+            row["choice__pk"],
+            row["choice__choice_text"],
+            row["choice__votes"],
+            row["choice__votes"] + row["shard_votes"],
+        )
+        for row in rows
+        if row["choice__pk"] is not None
+    )
+    return (question_id, rows[0]["question_text"], rows[0]["pub_date"], choices)
+
+
+def unpack(snapshot):
+    """Turns a snapshot into the (unsaved) question and choices the views use."""
+    question_id, question_text, pub_date, choices = snapshot
+    question = Question(pk=question_id, question_text=question_text, pub_date=pub_date)
+    return question, [
+        Choice(
+            pk=choice_id,
+            question_id=question_id,
+            choice_text=choice_text,
+            votes=votes,
+            total_votes=total_votes,
+        )
+        for choice_id, choice_text, votes, total_votes in choices
+    ]
+
+
+def get_poll_snapshot(question_id: int):
+    """Returns the question and its choices (with `total_votes`) from a snapshot,
+    which costs a single query when it isn't cached. Raises `Http404` when the
+    question doesn't exist.
+
+    Votes still waiting on the counter are not included (see `with_pending_votes()`).
+    """
+    version = get_poll_version(question_id)
+    snapshot = None
+    if version is not None:
+        snapshot = cache.get(snapshot_key(question_id, version))
+    if snapshot is not None:
+        record("snapshot", "hits")
+        return unpack(snapshot)
+
+    record("snapshot", "misses")
+    with use_primary():  # replicas may not have what bumped the version yet
+        snapshot = pack(question_id, list(snapshot_rows(question_id)))
+    if snapshot is None:
+        raise Http404("No Question matches the given query.")
+    if version is None:
+        version = new_version()
+        if not cache.add(version_key(question_id), version, version_timeout()):
+            # bumped while the snapshot was read, which may be stale already
+            return unpack(snapshot)
+    cache.set(
+        snapshot_key(question_id, version),
+        snapshot,
+        settings.POLLS_SNAPSHOT_CACHE_TIMEOUT,
+    )
+    return unpack(snapshot)
+
+
+async def aget_poll_snapshot(question_id: int):
+    """Async version of `get_poll_snapshot()`."""
+    version = await aget_poll_version(question_id)
+    snapshot = None
+    if version is not None:
+        snapshot = await cache.aget(snapshot_key(question_id, version))
+    if snapshot is not None:
+        await arecord("snapshot", "hits")
+        return unpack(snapshot)
+
+    await arecord("snapshot", "misses")
+    with use_primary():
+        rows = [row async for row in snapshot_rows(question_id)]
+    snapshot = pack(question_id, rows)
+    if snapshot is None:
+        raise Http404("No Question matches the given query.")
+    if version is None:
+        version = new_version()
+        if not await cache.aadd(version_key(question_id), version, version_timeout()):
+            return unpack(snapshot)
+    await cache.aset(
+        snapshot_key(question_id, version),
+        snapshot,
+        settings.POLLS_SNAPSHOT_CACHE_TIMEOUT,
+    )
+    return unpack(snapshot)
+
+
+def bump_index_version():
+    """Makes every cached index page stale."""
+    try:
+        cache.incr(INDEX_VERSION_KEY)
+    except ValueError:
+        cache.add(INDEX_VERSION_KEY, new_version(), None)
+
+
+def index_page_key(version: int, cursor: str | None, page: str = "index") -> str:
+    return f"polls:{page}-page:{version}:{cursor or ''}"
+
+
+def get_index_version() -> int:
+    version = cache.get(INDEX_VERSION_KEY)
+    if version is None:
+        cache.add(INDEX_VERSION_KEY, new_version(), None)
+        version = cache.get(INDEX_VERSION_KEY)
+    return version
+
+
+async def aget_index_version() -> int:
+    version = await cache.aget(INDEX_VERSION_KEY)
+    if version is None:
+        await cache.aadd(INDEX_VERSION_KEY, new_version(), None)
+        version = await cache.aget(INDEX_VERSION_KEY)
+    return version
+
+
+def next_publication_query():
+    return (
+        Question.objects.filter(pub_date__gt=timezone.now())
+        .order_by("pub_date")
+        .values_list("pub_date", flat=True)
+    )
+
+
+def index_page_timeout(next_publication: datetime | None) -> int:
+    """Returns for how long an index page can be cached: until the next scheduled
+    question gets published, and `settings.POLLS_INDEX_CACHE_TIMEOUT` at most.
+    """
+    timeout = settings.POLLS_INDEX_CACHE_TIMEOUT
+    if next_publication is not None:
+        until_published = (next_publication - timezone.now()).total_seconds()
+        timeout = min(timeout, int(until_published))
+    return timeout
+
+
+def get_cached_index_page(cursor: str | None, page: str = "index") -> bytes | None:
+    """Returns the cached content of the index page that starts at `cursor`.
+    `page` tells apart the pages that list the questions in different ways.
+    """
+    content = cache.get(index_page_key(get_index_version(), cursor, page))
+    record(page, "misses" if content is None else "hits")
+    return content
+
+
+async def aget_cached_index_page(
+    cursor: str | None, page: str = "index"
+) -> bytes | None:
+    content = await cache.aget(index_page_key(await aget_index_version(), cursor, page))
+    await arecord(page, "misses" if content is None else "hits")
+    return content
+
+
+def cache_index_page(cursor: str | None, content: bytes, page: str = "index"):
+    # read the version first, so a question saved while the next publication is
+    # looked up makes this entry stale right away
+    key = index_page_key(get_index_version(), cursor, page)
+    with use_primary():
+        timeout = index_page_timeout(next_publication_query().first())
+    if timeout > 0:
+        cache.set(key, content, timeout)
+
+
+async def acache_index_page(cursor: str | None, content: bytes, page: str = "index"):
+    key = index_page_key(await aget_index_version(), cursor, page)
+    with use_primary():
+        timeout = index_page_timeout(await next_publication_query().afirst())
+    if timeout > 0:
+        await cache.aset(key, content, timeout)
+
+
+def get_cache_stats(name: str) -> dict:
+    hits = cache.get(stats_key(name, "hits"), 0)
+    misses = cache.get(stats_key(name, "misses"), 0)
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": hits / total if total else None,
+    }
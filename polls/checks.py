@@ -0,0 +1,107 @@
+"""
+Deployment checks that flag debugging aids left on, which slow down every request,
+and caches that the worker processes don't share. They run with
+`manage.py check --deploy` (or `--tag performance` to run only the first ones).
+"""
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestFilesMixin
+from django.core.checks import Error, Tags, Warning, register
+from django.utils.module_loading import import_string
+
+PERFORMANCE = "performance"
+
+# cache backends that keep a separate cache in each process
+PER_PROCESS_CACHES = ["django.core.cache.backends.locmem.LocMemCache"]
+
+
+@register(PERFORMANCE, deploy=True)
+def check_debug(app_configs, **kwargs):
+    warnings = []
+    if settings.DEBUG:
+        warnings.append(
+            Warning(
+                "DEBUG is on, so every SQL query is kept in memory on "
+                "connection.queries.",
+                hint="Use the production settings (DJANGO_ENV=production).",
+                id="polls.W001",
+            )
+        )
+    if "debug_toolbar" in settings.INSTALLED_APPS or any(
+        middleware.startswith("debug_toolbar.") for middleware in settings.MIDDLEWARE
+    ):
+        warnings.append(
+            Warning(
+                "The Django Debug Toolbar is installed, so its middleware runs on "
+                "every request.",
+                hint="Only add it to INSTALLED_APPS and MIDDLEWARE in development.",
+                id="polls.W002",
+            )
+        )
+    return warnings
+
+
+@register(PERFORMANCE, Tags.templates, deploy=True)
+def check_templates(app_configs, **kwargs):
+    warnings = []
+    for template in settings.TEMPLATES:
+        options = template.get("OPTIONS", {})
+        loaders = options.get("loaders")
+        # without explicit loaders, Django already uses the cached one
+        if loaders and not any(
+            (loader[0] if isinstance(loader, (list, tuple)) else loader)
+            == "django.template.loaders.cached.Loader"
+            for loader in loaders
+        ):
+            warnings.append(
+                Warning(
+                    f"The {template['BACKEND']} templates are parsed again on "
+                    "every render.",
+                    hint="Wrap the loaders in django.template.loaders.cached.Loader.",
+                    id="polls.W003",
+                )
+            )
+        if "django.template.context_processors.debug" in options.get(
+            "context_processors", []
+        ):
+            warnings.append(
+                Warning(
+                    "The debug context processor is enabled.",
+                    hint="Remove django.template.context_processors.debug.",
+                    id="polls.W004",
+                )
+            )
+    return warnings
+
+
+@register(PERFORMANCE, Tags.staticfiles, deploy=True)
+def check_static_storage(app_configs, **kwargs):
+    storage = import_string(settings.STORAGES["staticfiles"]["BACKEND"])
+    if issubclass(storage, ManifestFilesMixin):
+        return []
+    return [
+        Warning(
+            "Static files are served under names without a hash of their content, "
+            "so browsers can't cache them for long.",
+            hint="Use django.contrib.staticfiles.storage.ManifestStaticFilesStorage.",
+            id="polls.W005",
+        )
+    ]
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    if (
+        settings.DEBUG
+        or settings.CACHES["default"]["BACKEND"] not in PER_PROCESS_CACHES
+    ):
+        return []
+    return [
+        Error(
+            "Each worker process has its own cache, so the others keep serving "
+            "stale polls after a change, and allows the full login attempt "
+            "limits by itself.",
+            hint="Set DJANGO_REDIS_URL.",
+            id="polls.E001",
+        )
+    ]
@@ -0,0 +1,373 @@
+import atexit
+import random
+import threading
+from abc import ABC, abstractmethod
+from datetime import timezone as dt_timezone
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Case, Count, F, IntegerField, Value, When
+from django.db.models.functions import TruncMinute
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Choice, ChoiceShard, Vote
+from .caching import bump_poll_version
+from .histogram import add_to_buckets
+from .trending import record_votes
+
+
+class AlreadyVoted(Exception):
+    pass
+
+
+def add_votes(amounts: dict[int, int]):
+    """Adds `amounts` (choice id -> votes) to `Choice.votes` with a single
+    `UPDATE ... CASE` statement, so either every choice is updated or none is.
+    """
+    increments = Case(
+        *[
+            When(pk=choice_id, then=Value(amount))
+            for choice_id, amount in amounts.items()
+        ],
+        output_field=IntegerField(),
+    )
+    Choice.objects.filter(pk__in=amounts).update(votes=F("votes") + increments)
+
+
+def votes_per_question(amounts: dict[int, int], questions: dict[int, int]):
+    """Adds up `amounts` (choice id -> votes) by the question of each choice, as
+    given by `questions` (choice id -> question id).
+    """
+    totals = {}
+    for choice_id, amount in amounts.items():
+        question_id = questions[choice_id]
+        totals[question_id] = totals.get(question_id, 0) + amount
+    return totals
+
+
+class BaseVoteCounter(ABC):
+    # whether `increment()` counts the vote right away (see `Vote.counted`)
+    counts_votes = True
+    # whether `pending()` only has the votes of this process, so the responses that
+    # include them differ between workers
+    pending_per_process = False
+
+    @abstractmethod
+    def increment(self, choice: Choice, amount: int = 1):
+        """Counts `amount` votes on `choice`."""
+
+    def pending(self, choice_ids) -> dict[int, int]:
+        """Returns the votes of the given choices that haven't reached the database yet."""
+        return {}
+
+    async def apending(self, choice_ids) -> dict[int, int]:
+        return self.pending(choice_ids)
+
+    def flush(self) -> int:
+        """Writes any pending votes to the database and returns how many were written."""
+        return 0
+
+
+class DirectCounter(BaseVoteCounter):
+    """Adds every vote straight to `Choice.votes` (one row per choice)."""
+
+    def increment(self, choice: Choice, amount: int = 1):
+        # performs the update directly on the database
+        Choice.objects.filter(pk=choice.pk).update(votes=F("votes") + amount)
+        record_votes({choice.question_id: amount})
+        add_to_buckets({choice.pk: amount}, timezone.now())
+
+
+class ShardedCounter(BaseVoteCounter):
+    """Spreads the votes of each choice across `shard_count` rows picked at random,
+    so concurrent voters of the same choice rarely wait on each other.
+
+    The shards are created lazily and are summed by `Choice.total_votes`. The
+    activity of the question is a single row that every voter would wait on again,
+    so it's added up on the process wide `activity_buffer` and written in batches
+    (see `ActivityBuffer`).
+    """
+
+    def __init__(self, shard_count: int | None = None):
+        self.shard_count = shard_count or settings.POLLS_VOTE_SHARDS
+
+    def increment(self, choice: Choice, amount: int = 1):
+        shard = random.randrange(self.shard_count)
+        shards = ChoiceShard.objects.filter(choice_id=choice.pk, shard=shard)
+        if not shards.update(count=F("count") + amount):
+            # first vote on this shard
+            try:
+                with transaction.atomic():
+                    ChoiceShard.objects.create(
+                        choice_id=choice.pk, shard=shard, count=amount
+                    )
+            except IntegrityError:
+                # another voter created it first
+                shards.update(count=F("count") + amount)
+
+        if activity_buffer.add(choice, amount):
+            # after the vote commits, which a failure to record the activity
+            # mustn't undo (see `BufferedCounter.increment()`)
+            transaction.on_commit(activity_buffer.flush, robust=True)
+
+    def flush(self) -> int:
+        activity_buffer.flush()
+        return 0  # the votes themselves are written already
+
+
+class VoteBuffer:
+    """Collects vote increments per choice in memory and writes them to the database
+    with `write()`, as a single `UPDATE ... CASE` statement.
+
+    A flush happens once `settings.POLLS_VOTE_BUFFER_MAX_VOTES` votes are pending or
+    `settings.POLLS_VOTE_BUFFER_MAX_DELAY` seconds after the first pending vote,
+    whichever comes first, so those two settings bound how many votes a crashed
+    worker can lose. Pending votes are also flushed when the interpreter exits.
+    """
+
+    def __init__(self):
+        self.pending: dict[int, int] = {}
+        self.questions: dict[int, int] = {}  # question id of each pending choice
+        self.lock = threading.Lock()
+        self.timer = None
+
+    def add(self, choice: Choice, amount: int = 1) -> bool:
+        """Adds the votes to the buffer and returns whether it must be flushed now."""
+        with self.lock:
+            self.pending[choice.pk] = self.pending.get(choice.pk, 0) + amount
+            self.questions[choice.pk] = choice.question_id
+            full = sum(self.pending.values()) >= settings.POLLS_VOTE_BUFFER_MAX_VOTES
+            if not full and self.timer is None:
+                self.timer = threading.Timer(
+                    settings.POLLS_VOTE_BUFFER_MAX_DELAY, self.flush_from_timer
+                )
+                self.timer.daemon = True
+                self.timer.start()
+
+        return full
+
+    def get(self, choice_ids) -> dict[int, int]:
+        with self.lock:
+            return {
+                choice_id: self.pending[choice_id]
+                for choice_id in choice_ids
+                if choice_id in self.pending
+            }
+
+    def flush(self) -> int:
+        with self.lock:
+            pending, self.pending = self.pending, {}
+            questions, self.questions = self.questions, {}
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+
+        if not pending:
+            return 0
+
+        try:
+            with transaction.atomic():
+                changed = self.write(pending, questions)
+        except Exception:
+            # put the votes back so the next flush can retry them
+            with self.lock:
+                for choice_id, amount in pending.items():
+                    self.pending[choice_id] = self.pending.get(choice_id, 0) + amount
+                self.questions.update(questions)
+            raise
+
+        bump_poll_version(*changed)
+        return sum(pending.values())
+
+    def write(self, pending: dict[int, int], questions: dict[int, int]) -> set[int]:
+        """Writes the `pending` votes (choice id -> votes) of the choices of
+        `questions` (choice id -> question id), and returns the ids of the questions
+        whose polls changed.
+        """
+        add_votes(pending)
+        record_votes(votes_per_question(pending, questions))
+        add_to_buckets(pending, timezone.now())
+        return set(questions.values())
+
+    def flush_from_timer(self):
+        with self.lock:
+            self.timer = None
+        try:
+            self.flush()
+        finally:
+            # the timer runs on its own thread, which has its own connection
+            connection.close()
+
+
+class ActivityBuffer(VoteBuffer):
+    """Collects the votes that were counted already, and only writes them to the
+    activity of their questions (see polls/trending.py) and to the histograms of
+    their choices (see polls/histogram.py), on the same schedule as the votes of a
+    `VoteBuffer`.
+    """
+
+    def write(self, pending: dict[int, int], questions: dict[int, int]) -> set[int]:
+        record_votes(votes_per_question(pending, questions))
+        add_to_buckets(pending, timezone.now())
+        return set()  # the polls show the votes, which changed already
+
+
+vote_buffer = VoteBuffer()
+atexit.register(vote_buffer.flush)
+activity_buffer = ActivityBuffer()
+atexit.register(activity_buffer.flush)
+
+
+class BufferedCounter(BaseVoteCounter):
+    """Adds the votes to the process wide `vote_buffer` instead of writing them
+    on every request (see `VoteBuffer`).
+    """
+
+    pending_per_process = True
+
+    def increment(self, choice: Choice, amount: int = 1):
+        if vote_buffer.add(choice, amount):
+            # once the vote is committed, so the new versions of the polls aren't
+            # cached with the counts from before, and a failed flush (whose votes
+            # stay on the buffer) is only logged instead of failing the vote
+            transaction.on_commit(vote_buffer.flush, robust=True)
+
+    def pending(self, choice_ids) -> dict[int, int]:
+        return vote_buffer.get(choice_ids)
+
+    def flush(self) -> int:
+        return vote_buffer.flush()
+
+
+class LedgerCounter(BaseVoteCounter):
+    """Turns every vote into a single INSERT on the `Vote` ledger, leaving the
+    choices alone until `compact_votes()` adds the new votes to them.
+    """
+
+    counts_votes = False
+
+    def increment(self, choice: Choice, amount: int = 1):
+        pass
+
+    def pending(self, choice_ids) -> dict[int, int]:
+        uncounted = self.get_uncounted(choice_ids)
+        return {row["choice"]: row["count"] for row in uncounted}
+
+    async def apending(self, choice_ids) -> dict[int, int]:
+        uncounted = self.get_uncounted(choice_ids)
+        return {row["choice"]: row["count"] async for row in uncounted}
+
+    def get_uncounted(self, choice_ids):
+        return (
+            Vote.objects.filter(choice_id__in=choice_ids, counted=False)
+            .values("choice")
+            .annotate(count=Count("pk"))
+            .order_by()
+        )
+
+
+def compact_votes(batch_size: int = 10000) -> int:
+    """Adds up to `batch_size` uncounted votes from the ledger to their choices
+    and returns how many were counted.
+    """
+    with transaction.atomic():
+        vote_ids = list(
+            Vote.objects.filter(counted=False)
+            .select_for_update(skip_locked=True)
+            .order_by("pk")
+            .values_list("pk", flat=True)[:batch_size]
+        )
+        if not vote_ids:
+            return 0
+
+        votes = Vote.objects.filter(pk__in=vote_ids)
+        totals = list(
+            votes.values("choice", "question").annotate(count=Count("pk")).order_by()
+        )
+        amounts = {row["choice"]: row["count"] for row in totals}
+        add_votes(amounts)
+        record_votes(
+            votes_per_question(
+                amounts, {row["choice"]: row["question"] for row in totals}
+            )
+        )
+        # on the minutes the votes were cast in, however late they're counted
+        minutes = (
+            votes.values(
+                "choice", minute=TruncMinute("voted_at", tzinfo=dt_timezone.utc)
+            )
+            .annotate(count=Count("pk"))
+            .order_by()
+        )
+        per_minute = {}
+        for row in minutes:
+            per_minute.setdefault(row["minute"], {})[row["choice"]] = row["count"]
+        for minute, minute_amounts in per_minute.items():
+            add_to_buckets(minute_amounts, minute)
+        votes.update(counted=True)
+
+    # only once the new counts are visible to everyone
+    bump_poll_version(*{row["question"] for row in totals})
+    return len(vote_ids)
+
+
+def cast_vote(user, choice: Choice, counter: BaseVoteCounter | None = None):
+    """Records the vote of `user` on the ledger and counts it with `counter` (the
+    configured one by default), which also adds it to the histogram of its choice.
+
+    Raises `AlreadyVoted` if the user already voted on the question.
+    """
+    counter = counter or get_vote_counter()
+    with transaction.atomic():
+        # the first query of the transaction, so a duplicate vote can roll the
+        # whole of it back, without a savepoint to return to
+        try:
+            Vote.objects.create(
+                user=user,
+                question_id=choice.question_id,
+                choice=choice,
+                counted=counter.counts_votes,
+            )
+        except IntegrityError:
+            raise AlreadyVoted
+
+        counter.increment(choice)
+
+    bump_poll_version(choice.question_id)
+
+
+async def acast_vote(user, choice: Choice, counter: BaseVoteCounter | None = None):
+    """Async version of `cast_vote()`.
+
+    The vote and its count have to share a transaction, which the async ORM can't
+    open yet, so the whole of `cast_vote()` runs in a worker thread (just like each
+    async ORM query does). That's also why the counters have no async methods: they
+    only ever run inside that transaction.
+    """
+    await sync_to_async(cast_vote)(user, choice, counter)
+
+
+def get_vote_counter() -> BaseVoteCounter:
+    """Returns an instance of the counter set on `settings.POLLS_VOTE_COUNTER`."""
+    return import_string(settings.POLLS_VOTE_COUNTER)()
+
+
+def with_pending_votes(choices):
+    """Adds the votes still waiting on the configured counter to the `total_votes`
+    of each choice and returns them as a list.
+    """
+    choices = list(choices)
+    pending = get_vote_counter().pending([choice.pk for choice in choices])
+    for choice in choices:
+        choice.total_votes += pending.get(choice.pk, 0)
+    return choices
+
+
+async def awith_pending_votes(choices):
+    """Async version of `with_pending_votes()`, which takes a list of choices."""
+    pending = await get_vote_counter().apending([choice.pk for choice in choices])
+    for choice in choices:
+        choice.total_votes += pending.get(choice.pk, 0)
+    return choices
@@ -0,0 +1,45 @@
+"""
+Creation of polls in bulk, used by `CreateQuestionView` and the `import_polls` command.
+"""
+
+from datetime import datetime
+from itertools import islice
+from typing import Iterable, Iterator
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Question, Choice
+from .caching import bump_index_version
+
+# a poll to create: question text, publication date (`None` for now) and choice texts
+Poll = tuple[str, datetime | None, list[str]]
+
+
+def create_polls(polls: list[Poll]) -> list[Question]:
+    """Creates the given polls with one INSERT for all the questions and one for
+    all their choices, in a single transaction.
+
+    `bulk_create()` doesn't send the `post_save` signals, so the cached index pages
+    are made stale here instead.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        questions = Question.objects.bulk_create(
+            Question(question_text=question_text, pub_date=pub_date or now)
+            for question_text, pub_date, choices in polls
+        )
+        Choice.objects.bulk_create(
+            Choice(question=question, choice_text=choice_text)
+            for question, (_, _, choices) in zip(questions, polls)
+            for choice_text in choices
+        )
+        transaction.on_commit(bump_index_version)
+    return questions
+
+
+def batched(polls: Iterable[Poll], size: int) -> Iterator[list[Poll]]:
+    """Splits `polls` into lists of `size` polls, reading it lazily."""
+    polls = iter(polls)
+    while batch := list(islice(polls, size)):
+        yield batch
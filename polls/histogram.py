@@ -0,0 +1,176 @@
+"""
+Histograms of the votes of each choice over time, ready to be charted.
+
+Votes are counted on the `VoteBucket` of their choice for the minute they were
+cast in, when their counter writes them (so a buffered vote lands on the minute of
+its flush, and a vote on the ledger on its own minute once it's compacted).
+
+As they age, `roll_up_buckets()` (see `manage.py roll_up_votes`) sums the minute
+buckets older than `settings.POLLS_HISTOGRAM_MINUTE_RETENTION` into hour buckets,
+and the hour buckets older than `settings.POLLS_HISTOGRAM_HOUR_RETENTION` into day
+buckets, which are kept. So each choice has at most a day of minutes and a month
+of hours, and one row per day before that.
+
+Histograms are read from the buckets alone, adding the finer ones up into the
+requested resolution, so the votes themselves are never scanned.
+"""
+
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.utils import timezone
+
+from .models import Choice, VoteBucket
+
+Resolution = VoteBucket.Resolution
+
+# number of buckets on the histograms of each resolution, ending on the current one
+POINTS = {Resolution.MINUTE: 60, Resolution.HOUR: 48, Resolution.DAY: 90}
+
+
+def bucket_start(value: datetime, resolution: int) -> datetime:
+    """Returns the start of the bucket of `resolution` seconds `value` falls in."""
+    timestamp = int(value.timestamp())
+    return datetime.fromtimestamp(timestamp - timestamp % resolution, dt_timezone.utc)
+
+
+def add_to_buckets(amounts: dict[int, int], voted_at: datetime):
+    """Adds `amounts` (choice id -> votes) to the minute buckets of their choices
+    that `voted_at` falls in, with a single `UPDATE` unless some of them are new.
+    """
+    amounts = {choice_id: amount for choice_id, amount in amounts.items() if amount}
+    if not amounts:
+        return
+
+    increments = Case(
+        *[
+            When(choice_id=choice_id, then=Value(amount))
+            for choice_id, amount in amounts.items()
+        ],
+        output_field=IntegerField(),
+    )
+    start = bucket_start(voted_at, Resolution.MINUTE)
+    buckets = VoteBucket.objects.filter(
+        choice_id__in=amounts, resolution=Resolution.MINUTE, start=start
+    )
+    updated = buckets.update(count=F("count") + increments)
+    if updated < len(amounts):
+        missing = amounts.keys()
+        if updated:
+            missing -= set(buckets.values_list("choice_id", flat=True))
+        # first votes of the minute, the buckets are created empty (unless other
+        # voters got to them first) and then counted like the others
+        VoteBucket.objects.bulk_create(
+            [
+                VoteBucket(
+                    choice_id=choice_id, resolution=Resolution.MINUTE, start=start
+                )
+                for choice_id in missing
+            ],
+            ignore_conflicts=True,
+        )
+        buckets.filter(choice_id__in=missing).update(count=F("count") + increments)
+
+
+def roll_up(finer: int, coarser: int, before: datetime, batch_size: int) -> int:
+    """Adds up to `batch_size` buckets of the `finer` resolution that start before
+    `before` to the buckets of the `coarser` one and deletes them. Returns how many
+    were rolled up.
+    """
+    with transaction.atomic():
+        batch = list(
+            VoteBucket.objects.filter(resolution=finer, start__lt=before)
+            .order_by("start")
+            .values_list("pk", "choice_id", "start", "count")[:batch_size]
+        )
+        if not batch:
+            return 0
+
+        totals = {}
+        for _, choice_id, start, count in batch:
+            key = (choice_id, bucket_start(start, coarser))
+            totals[key] = totals.get(key, 0) + count
+
+        existing = {
+            (bucket.choice_id, bucket.start): bucket
+            for bucket in VoteBucket.objects.filter(
+                resolution=coarser,
+                choice_id__in={choice_id for choice_id, _ in totals},
+                start__in={start for _, start in totals},
+            )
+        }
+        updated, created = [], []
+        for (choice_id, start), count in totals.items():
+            if bucket := existing.get((choice_id, start)):
+                bucket.count += count
+                updated.append(bucket)
+            else:
+                created.append(
+                    VoteBucket(
+                        choice_id=choice_id,
+                        resolution=coarser,
+                        start=start,
+                        count=count,
+                    )
+                )
+        VoteBucket.objects.bulk_update(updated, ["count"])
+        VoteBucket.objects.bulk_create(created)
+        VoteBucket.objects.filter(pk__in=[row[0] for row in batch]).delete()
+
+    return len(batch)
+
+
+def roll_up_buckets(now: datetime | None = None, batch_size: int = 1000) -> int:
+    """Rolls the minute and hour buckets past their retention up into hours and
+    days, and returns how many were rolled up.
+    """
+    now = now or timezone.now()
+    rolled = 0
+    for finer, coarser, retention in [
+        (Resolution.MINUTE, Resolution.HOUR, settings.POLLS_HISTOGRAM_MINUTE_RETENTION),
+        (Resolution.HOUR, Resolution.DAY, settings.POLLS_HISTOGRAM_HOUR_RETENTION),
+    ]:
+        # only whole coarser buckets, so each one is rolled up at once
+        before = bucket_start(now - timedelta(seconds=retention), coarser)
+        while batch := roll_up(finer, coarser, before, batch_size):
+            rolled += batch
+    return rolled
+
+
+def get_histogram(
+    choices: list[Choice], resolution: int, now: datetime | None = None
+) -> dict:
+    """Returns the votes of `choices` on each of the last `POINTS[resolution]`
+    buckets of `resolution` seconds, as a list of the starts of the buckets and a
+    list of counts per choice, in the same order.
+    """
+    now = now or timezone.now()
+    points = POINTS[resolution]
+    first = bucket_start(now, resolution) - timedelta(seconds=resolution * (points - 1))
+
+    counts = {choice.pk: [0] * points for choice in choices}
+    buckets = VoteBucket.objects.filter(
+        choice_id__in=counts, resolution__lte=resolution, start__gte=first
+    ).values_list("choice_id", "start", "count")
+    for choice_id, start, count in buckets:
+        point = int((start - first).total_seconds()) // resolution
+        if point < points:
+            counts[choice_id][point] += count
+
+    return {
+        "resolution": Resolution(resolution).label,
+        "labels": [
+            (first + timedelta(seconds=resolution * point)).isoformat()
+            for point in range(points)
+        ],
+        "series": [
+            {
+                "id": choice.pk,
+                "choice_text": choice.choice_text,
+                "votes": counts[choice.pk],
+            }
+            for choice in choices
+        ],
+    }
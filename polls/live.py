@@ -0,0 +1,112 @@
+"""
+In-process fan-out of live poll results, used by the Server-Sent Events stream of
+the results page (see `async_views.ResultsStreamView`).
+
+Every watched question gets a single `Topic`, whose task reads the vote counts once
+per `settings.POLLS_LIVE_RESULTS_INTERVAL` seconds, no matter how many clients are
+watching it, and wakes them up when the counts change. Clients that fall behind
+only get the latest counts, so bursts of votes are coalesced. If reading the counts
+fails, the error is logged and every client watching the question is let go.
+"""
+
+import asyncio
+import logging
+
+from django.conf import settings
+from django.http import Http404
+
+from .caching import aget_poll_snapshot
+from .counters import awith_pending_votes
+
+logger = logging.getLogger(__name__)
+
+
+class Topic:
+    def __init__(self, question_id: int):
+        self.question_id = question_id
+        self.totals: dict[int, int] | None = None  # until they're first read
+        self.seq = 0  # bumped whenever `totals` changes
+        self.failed = False
+        self.changed = asyncio.Condition()
+        self.watchers = 0
+        self.task = None
+
+    async def read_totals(self) -> dict[int, int]:
+        question, choices = await aget_poll_snapshot(self.question_id)
+        return {
+            choice.pk: choice.total_votes
+            for choice in await awith_pending_votes(choices)
+        }
+
+    async def poll(self):
+        try:
+            await self.poll_totals()
+        except Exception:
+            logger.exception(
+                "Reading the votes of question %s failed.", self.question_id
+            )
+            async with self.changed:
+                self.failed = True
+                self.changed.notify_all()
+
+    async def poll_totals(self):
+        while True:
+            try:
+                totals = await self.read_totals()
+            except Http404:  # deleted while being watched
+                totals = self.totals if self.totals is not None else {}
+
+            if totals != self.totals:
+                async with self.changed:
+                    self.totals = totals
+                    self.seq += 1
+                    self.changed.notify_all()
+
+            await asyncio.sleep(settings.POLLS_LIVE_RESULTS_INTERVAL)
+
+    async def wait(self, seen: int, timeout: float):
+        """Waits until the totals change after `seq` reached `seen`, or polling
+        them fails. Raises `TimeoutError` if neither happens within `timeout` seconds.
+        """
+        async with self.changed:
+            await asyncio.wait_for(
+                self.changed.wait_for(lambda: self.seq > seen or self.failed), timeout
+            )
+
+
+class ResultsHub:
+    def __init__(self):
+        self.topics: dict[int, Topic] = {}
+
+    async def watch(self, question_id: int):
+        """Yields the vote count of each choice of the question (choice id -> votes)
+        whenever it changes, starting with the current one, or `None` when nothing
+        changed for `settings.POLLS_LIVE_RESULTS_KEEPALIVE` seconds. Stops if the
+        counts can't be read anymore.
+        """
+        topic = self.topics.get(question_id)
+        if topic is None:
+            topic = self.topics[question_id] = Topic(question_id)
+            topic.task = asyncio.create_task(topic.poll())
+        topic.watchers += 1
+
+        try:
+            seen = 0
+            while True:
+                try:
+                    await topic.wait(seen, settings.POLLS_LIVE_RESULTS_KEEPALIVE)
+                except TimeoutError:
+                    yield None
+                    continue
+                if topic.failed:
+                    return
+                seen = topic.seq
+                yield topic.totals
+        finally:
+            topic.watchers -= 1
+            if not topic.watchers:
+                topic.task.cancel()
+                del self.topics[question_id]
+
+
+live_results = ResultsHub()
@@ -0,0 +1,339 @@
+import asyncio
+import itertools
+import json
+import math
+import random
+import statistics
+import threading
+import time
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.db.backends.signals import connection_created
+from django.test import AsyncClient, Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from polls.creation import create_polls
+from polls.models import Question, Vote
+
+PAGES = ["index", "details", "results", "vote", "create", "login"]
+# metrics compared against the baseline, and whether higher values are better
+METRICS = {"req_s": True, "p95_ms": False, "queries": False}
+PASSWORD = "bench-http-password"
+# the same clients log in over and over, which the login limits would turn into 429s
+# after a few attempts, so they're lifted while measuring
+UNLIMITED_LOGINS = override_settings(
+    POLLS_LOGIN_MAX_ATTEMPTS_PER_IP=math.inf,
+    POLLS_LOGIN_MAX_ATTEMPTS_PER_USERNAME=math.inf,
+)
+
+
+def is_error(status_code: int) -> bool:
+    """Returns whether a response didn't do what the page does, e.g. a 429 or a
+    404, and not only a server error.
+    """
+    return not 200 <= status_code < 400
+
+
+class QueryCounter:
+    """Counts the queries run on every database connection, including the ones
+    opened by other threads while it's installed.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        with self.lock:
+            self.count += 1
+        return execute(sql, params, many, context)
+
+    def add_to(self, sender, connection, **kwargs):
+        connection.execute_wrappers.append(self)
+
+    def install(self):
+        connection_created.connect(self.add_to)
+        for conn in connections.all(initialized_only=True):
+            conn.execute_wrappers.append(self)
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds a set of polls and measures requests/s, latency percentiles and "
+        "queries per request of the poll pages through the WSGI and/or the ASGI "
+        "request handler. The async views are only used when POLLS_ASYNC_VIEWS is "
+        "set, e.g. `POLLS_ASYNC_VIEWS=1 manage.py bench_http --interface asgi`. "
+        "Results can be saved as a baseline, and later runs fail when they are "
+        "worse than it by more than --threshold."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interface",
+            action="append",
+            dest="interfaces",
+            choices=["wsgi", "asgi"],
+            help=(
+                "Request handler to use, can be repeated (defaults to asgi when "
+                "POLLS_ASYNC_VIEWS is set and wsgi otherwise)."
+            ),
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=8,
+            help="Number of clients sending requests at the same time.",
+        )
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=400,
+            help="Number of requests sent to each page.",
+        )
+        parser.add_argument(
+            "--pages",
+            default=",".join(PAGES),
+            help=f"Comma separated list of pages to request ({', '.join(PAGES)}).",
+        )
+        parser.add_argument(
+            "--questions",
+            type=int,
+            default=200,
+            help="Number of polls seeded before the run (with 2 to 8 choices each).",
+        )
+        parser.add_argument(
+            "--save-baseline",
+            type=Path,
+            help="Write the results to this JSON file.",
+        )
+        parser.add_argument(
+            "--baseline",
+            type=Path,
+            help="Fail if the results are worse than the ones on this JSON file.",
+        )
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.2,
+            help="Largest regression from the baseline that is tolerated (0.2 = 20%%).",
+        )
+
+    def handle(self, *args, **options):
+        interfaces = options["interfaces"] or [
+            "asgi" if settings.POLLS_ASYNC_VIEWS else "wsgi"
+        ]
+        pages = options["pages"].split(",")
+        if unknown := set(pages) - set(PAGES):
+            raise CommandError(f"Unknown pages: {', '.join(sorted(unknown))}")
+        baseline = None
+        if options["baseline"]:
+            baseline = json.loads(options["baseline"].read_text())
+
+        self.queries = QueryCounter()
+        self.queries.install()
+        self.seed(options["questions"], options["concurrency"])
+        results = {}
+        try:
+            with UNLIMITED_LOGINS:
+                for interface in interfaces:
+                    self.stdout.write(
+                        f"{interface} (async views: {settings.POLLS_ASYNC_VIEWS}), "
+                        f"concurrency {options['concurrency']}"
+                    )
+                    results[interface] = {}
+                    for page in pages:
+                        result = self.run(
+                            interface, page, options["concurrency"], options["requests"]
+                        )
+                        results[interface][page] = result
+                        self.report(page, result)
+                        Vote.objects.filter(user__in=self.users).delete()
+        finally:
+            self.cleanup()
+
+        if options["save_baseline"]:
+            options["save_baseline"].write_text(json.dumps(results, indent=2))
+        if baseline is not None:
+            regressions = self.compare(results, baseline, options["threshold"])
+            if regressions:
+                raise CommandError(
+                    "Regressed from the baseline:\n  " + "\n  ".join(regressions)
+                )
+            self.stdout.write("No regressions from the baseline.")
+
+    def seed(self, questions: int, concurrency: int):
+        """Creates published polls with 2 to 8 choices, one user per client and
+        one with a password for the login page.
+        """
+        now = timezone.now()
+        polls = [
+            (
+                f"bench_http {i}",
+                now - timedelta(minutes=random.randrange(60 * 24 * 365)),
+                [f"choice {j}" for j in range(random.randint(2, 8))],
+            )
+            for i in range(questions)
+        ]
+        create_polls(polls)
+        self.polls = [
+            (question.pk, list(question.choice_set.values_list("pk", flat=True)))
+            for question in Question.objects.filter(
+                question_text__startswith="bench_http"
+            )
+        ]
+        self.users = User.objects.bulk_create(
+            User(username=f"bench_http_{i}") for i in range(concurrency)
+        )
+        User.objects.create_user(username="bench_http_login", password=PASSWORD)
+
+    def cleanup(self):
+        Question.objects.filter(question_text__startswith="bench_http").delete()
+        User.objects.filter(username__startswith="bench_http_").delete()
+
+    def get_request(self, page: str, n: int, worker_n: int):
+        """Returns the method, path and data of the `n`th request to `page`, which
+        is the `worker_n`th one sent by its client.
+        """
+        question_id, choice_ids = self.polls[n % len(self.polls)]
+        if page == "index":
+            return "get", reverse("polls:index"), None
+        if page == "details":
+            return "get", reverse("polls:details", args=(question_id,)), None
+        if page == "results":
+            return "get", reverse("polls:results", args=(question_id,)), None
+        if page == "vote":
+            # each client votes on the polls in order, so it never votes twice
+            question_id, choice_ids = self.polls[worker_n % len(self.polls)]
+            return (
+                "post",
+                reverse("polls:vote", args=(question_id,)),
+                {"choice": random.choice(choice_ids)},
+            )
+        if page == "create":
+            return (
+                "post",
+                reverse("polls:create"),
+                {"question": f"bench_http created {n}", "choices": ["yes", "no"]},
+            )
+        return (
+            "post",
+            reverse("polls:login"),
+            {"username": "bench_http_login", "password": PASSWORD},
+        )
+
+    def run(self, interface: str, page: str, concurrency: int, requests: int):
+        queries_before = self.queries.count
+        if interface == "wsgi":
+            elapsed, latencies, errors = self.run_wsgi(page, concurrency, requests)
+        else:
+            elapsed, latencies, errors = asyncio.run(
+                self.run_asgi(page, concurrency, requests)
+            )
+
+        percentiles = statistics.quantiles(latencies, n=100)
+        return {
+            "req_s": len(latencies) / elapsed,
+            "p50_ms": percentiles[49] * 1000,
+            "p95_ms": percentiles[94] * 1000,
+            "p99_ms": percentiles[98] * 1000,
+            "queries": (self.queries.count - queries_before) / len(latencies),
+            "errors": errors,
+        }
+
+    def run_wsgi(self, page: str, concurrency: int, requests: int):
+        remaining = itertools.count()
+        latencies = []
+        errors = []
+        lock = threading.Lock()
+
+        def worker(user):
+            client = Client(raise_request_exception=False)
+            client.force_login(user)
+            times = []
+            failed = 0
+            try:
+                for worker_n in itertools.count():
+                    if (n := next(remaining)) >= requests:
+                        break
+                    method, path, data = self.get_request(page, n, worker_n)
+                    start = time.perf_counter()
+                    response = getattr(client, method)(path, data)
+                    times.append(time.perf_counter() - start)
+                    failed += is_error(response.status_code)
+            finally:
+                connection.close()
+            with lock:
+                latencies.extend(times)
+                errors.append(failed)
+
+        threads = [
+            threading.Thread(target=worker, args=(user,))
+            for user in self.users[:concurrency]
+        ]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return time.perf_counter() - start, latencies, sum(errors)
+
+    async def run_asgi(self, page: str, concurrency: int, requests: int):
+        remaining = itertools.count()
+        latencies = []
+        errors = 0
+
+        async def worker(user):
+            nonlocal errors
+            client = AsyncClient(raise_request_exception=False)
+            await client.aforce_login(user)
+            for worker_n in itertools.count():
+                if (n := next(remaining)) >= requests:
+                    break
+                method, path, data = self.get_request(page, n, worker_n)
+                start = time.perf_counter()
+                response = await getattr(client, method)(path, data)
+                latencies.append(time.perf_counter() - start)
+                errors += is_error(response.status_code)
+
+        start = time.perf_counter()
+        await asyncio.gather(*[worker(user) for user in self.users[:concurrency]])
+        return time.perf_counter() - start, latencies, errors
+
+    def report(self, page: str, result: dict):
+        self.stdout.write(
+            f"  {page:<8} {result['req_s']:>8.1f} req/s"
+            f"  p50 {result['p50_ms']:>7.2f} ms"
+            f"  p95 {result['p95_ms']:>7.2f} ms"
+            f"  p99 {result['p99_ms']:>7.2f} ms"
+            f"  {result['queries']:>5.1f} queries"
+            f"  ({result['errors']} errors)"
+        )
+
+    def compare(self, results: dict, baseline: dict, threshold: float) -> list[str]:
+        """Returns a description of each metric that is worse than on `baseline`
+        by more than `threshold` (a fraction of the baseline value).
+        """
+        regressions = []
+        for interface, pages in results.items():
+            for page, result in pages.items():
+                expected = baseline.get(interface, {}).get(page)
+                if expected is None:
+                    continue
+                for metric, higher_is_better in METRICS.items():
+                    value, base = result[metric], expected[metric]
+                    if higher_is_better:
+                        regressed = value < base * (1 - threshold)
+                    else:
+                        regressed = value > base * (1 + threshold)
+                    if regressed:
+                        regressions.append(
+                            f"{interface} {page} {metric}: {value:.2f} "
+                            f"(baseline {base:.2f})"
+                        )
+        return regressions
@@ -0,0 +1,102 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth import password_validation
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from polls.validators import load_password_list, preload_password_validators
+
+# unlike the usernames, so the similarity validator doesn't reject it
+PASSWORD = "x9!kQz#mw2Lp"
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures the latency of registrations on a cold worker, which hasn't "
+        "loaded the data of the password validators yet, with and without "
+        "preloading it when the app starts, and on a warm one. Hashing the "
+        "password takes most of each registration, use --fast-hasher to leave it "
+        "out."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--runs",
+            type=int,
+            default=20,
+            help="Number of cold starts measured for each mode.",
+        )
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=20,
+            help="Number of registrations measured on a warm worker.",
+        )
+        parser.add_argument(
+            "--fast-hasher",
+            action="store_true",
+            help="Hash the passwords with MD5 instead of the configured hashers.",
+        )
+
+    def handle(self, *args, **options):
+        hashers = settings.PASSWORD_HASHERS
+        if options["fast_hasher"]:
+            hashers = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+        self.client = Client()
+        self.registrations = 0
+        try:
+            with override_settings(PASSWORD_HASHERS=hashers):
+                self.register()  # everything but the validators warmed up
+                for preload in [False, True]:
+                    startups, latencies = [], []
+                    for _ in range(options["runs"]):
+                        startups.append(self.cold_start(preload))
+                        latencies.append(self.register())
+                    name = "cold, preloaded" if preload else "cold"
+                    self.report(name, latencies, startups)
+
+                latencies = [self.register() for _ in range(options["requests"])]
+                self.report("warm", latencies)
+        finally:
+            User.objects.filter(username__startswith="bench_register_").delete()
+
+    def cold_start(self, preload: bool) -> float:
+        """Forgets the validators and their data like a new worker would, loading
+        them again if `preload`, and returns how long that took.
+        """
+        password_validation.get_default_password_validators.cache_clear()
+        load_password_list.cache_clear()
+        start = time.perf_counter()
+        if preload:
+            preload_password_validators()
+        return time.perf_counter() - start
+
+    def register(self) -> float:
+        """Registers a new user and returns how long the request took."""
+        self.registrations += 1
+        start = time.perf_counter()
+        response = self.client.post(
+            reverse("polls:register"),
+            {
+                "username": f"bench_register_{self.registrations}",
+                "password1": PASSWORD,
+                "password2": PASSWORD,
+            },
+        )
+        latency = time.perf_counter() - start
+        self.client.logout()
+
+        if response.status_code != 302:
+            self.stderr.write(f"Registration failed ({response.status_code}).")
+        return latency
+
+    def report(self, name: str, latencies: list[float], startups: list[float] = None):
+        line = f"{name:<16} registration {statistics.median(latencies) * 1000:>8.2f} ms"
+        if startups is not None:
+            line += f"  at startup {statistics.median(startups) * 1000:>7.2f} ms"
+        self.stdout.write(line)
@@ -0,0 +1,140 @@
+import itertools
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from polls.models import Question
+
+# SQLite settings compared, as (connection options, pragmas run on connect)
+PROFILES = {
+    # what Django and SQLite do out of the box
+    "default": ({}, {"journal_mode": "DELETE", "synchronous": "FULL"}),
+    # what the settings (myproject/settings) set up
+    "tuned": (None, None),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures how many votes per second VoteView records with concurrent "
+        "voters, and how many fail with 'database is locked', with SQLite's "
+        "default settings and with the tuned ones from the settings."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--profile",
+            action="append",
+            dest="profiles",
+            help=f"SQLite profile to measure ({', '.join(PROFILES)}, can be repeated).",
+        )
+        parser.add_argument(
+            "--voters",
+            default="1,4,16",
+            help="Comma separated list of concurrent voter counts.",
+        )
+        parser.add_argument(
+            "--votes",
+            type=int,
+            default=400,
+            help="Number of votes sent on each run (one per user).",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("The default database isn't SQLite.")
+        profiles = options["profiles"] or list(PROFILES)
+        if unknown := set(profiles) - set(PROFILES):
+            raise CommandError(f"Unknown profiles: {', '.join(sorted(unknown))}")
+        voter_counts = [int(count) for count in options["voters"].split(",")]
+        self.tuned_options = connection.settings_dict.get("OPTIONS", {})
+        # the failed votes are counted, there is no need to log each of them
+        logging.getLogger("django.request").setLevel(logging.CRITICAL)
+
+        question = Question.objects.create(question_text="bench_sqlite")
+        choice = question.choice_set.create(choice_text="hot choice")
+        User.objects.bulk_create(
+            User(username=f"bench_sqlite_{i}") for i in range(options["votes"])
+        )
+        clients = []
+        for user in User.objects.filter(username__startswith="bench_sqlite_"):
+            client = Client(raise_request_exception=False)
+            client.force_login(user)
+            clients.append(client)
+        try:
+            for profile in profiles:
+                self.stdout.write(profile)
+                for voters in voter_counts:
+                    with self.use_profile(profile):
+                        votes, errors, elapsed = self.run(
+                            question, choice, clients, voters
+                        )
+                    self.stdout.write(
+                        f"  {voters:>4} voters: {votes / elapsed:>8.1f} votes/s"
+                        f"  {errors / (votes + errors):>6.1%} locked"
+                    )
+                    question.vote_set.all().delete()
+        finally:
+            for client in clients:
+                client.logout()
+            question.delete()
+            User.objects.filter(username__startswith="bench_sqlite_").delete()
+            connection.settings_dict["OPTIONS"] = self.tuned_options
+            connection.close()
+
+    def use_profile(self, profile: str):
+        """Makes the connections opened from now on use `profile`."""
+        options, pragmas = PROFILES[profile]
+        # the connections of every thread are created from this same dictionary
+        connection.settings_dict["OPTIONS"] = (
+            options if options is not None else self.tuned_options
+        )
+        connection.close()
+        return override_settings(
+            POLLS_SQLITE_PRAGMAS=(
+                pragmas if pragmas is not None else settings.POLLS_SQLITE_PRAGMAS
+            )
+        )
+
+    def run(self, question, choice, clients: list[Client], voters: int):
+        """Sends one vote per client (each logged in as a different user) from
+        `voters` threads through VoteView and returns the number of recorded votes,
+        of failed ones and the time it took.
+        """
+        path = reverse("polls:vote", args=(question.pk,))
+        next_client = itertools.count()
+        results = []
+        lock = threading.Lock()
+        start = threading.Barrier(voters)
+
+        def vote():
+            votes = errors = 0
+            start.wait()
+            try:
+                while (i := next(next_client)) < len(clients):
+                    response = clients[i].post(path, {"choice": choice.pk})
+                    if response.status_code >= 500:
+                        errors += 1
+                    else:
+                        votes += 1
+            finally:
+                connection.close()
+            with lock:
+                results.append((votes, errors))
+
+        threads = [threading.Thread(target=vote) for _ in range(voters)]
+        began = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - began
+
+        return sum(r[0] for r in results), sum(r[1] for r in results), elapsed
@@ -0,0 +1,118 @@
+import itertools
+import threading
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection
+from django.utils.module_loading import import_string
+
+from polls.counters import cast_vote, compact_votes
+from polls.models import Question, Vote
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures vote write throughput on a single hot choice with an increasing "
+        "number of concurrent voters, for each of the given vote counters."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--counter",
+            action="append",
+            dest="counters",
+            help="Dotted path of a vote counter class (can be repeated).",
+        )
+        parser.add_argument(
+            "--voters",
+            default="1,2,4,8,16",
+            help="Comma separated list of concurrent voter counts.",
+        )
+        parser.add_argument(
+            "--duration",
+            type=float,
+            default=2.0,
+            help="Maximum number of seconds each run lasts.",
+        )
+        parser.add_argument(
+            "--users",
+            type=int,
+            default=5000,
+            help="Number of users created to vote (each one votes once per run).",
+        )
+
+    def handle(self, *args, **options):
+        counters = options["counters"] or [
+            "polls.counters.DirectCounter",
+            "polls.counters.ShardedCounter",
+            "polls.counters.BufferedCounter",
+            "polls.counters.LedgerCounter",
+        ]
+        voter_counts = [int(count) for count in options["voters"].split(",")]
+
+        question = Question.objects.create(question_text="bench_votes")
+        choice = question.choice_set.create(choice_text="hot choice")
+        User.objects.bulk_create(
+            User(username=f"bench_votes_{i}") for i in range(options["users"])
+        )
+        users = list(User.objects.filter(username__startswith="bench_votes_"))
+        try:
+            for counter_path in counters:
+                counter = import_string(counter_path)()
+                self.stdout.write(counter_path)
+                for voters in voter_counts:
+                    votes, errors, elapsed = self.run(
+                        counter, choice, users, voters, options["duration"]
+                    )
+                    self.stdout.write(
+                        f"  {voters:>4} voters: {votes / elapsed:>10.1f} votes/s"
+                        f" ({errors} errors)"
+                    )
+                    Vote.objects.filter(question=question).delete()
+        finally:
+            question.delete()
+            User.objects.filter(username__startswith="bench_votes_").delete()
+
+    def run(self, counter, choice, users, voters: int, duration: float):
+        """Runs `voters` threads voting on `choice` for up to `duration` seconds
+        (or until every user voted) and returns the number of successful votes,
+        of failed ones and the time it took.
+        """
+        results = []
+        lock = threading.Lock()
+        start = threading.Barrier(voters)
+        next_user = itertools.count()
+
+        def vote():
+            votes = errors = 0
+            start.wait()
+            deadline = time.perf_counter() + duration
+            try:
+                while time.perf_counter() < deadline:
+                    i = next(next_user)
+                    if i >= len(users):
+                        break
+                    try:
+                        cast_vote(users[i], choice, counter)
+                        votes += 1
+                    except OperationalError:  # e.g. "database is locked"
+                        errors += 1
+            finally:
+                connection.close()
+            with lock:
+                results.append((votes, errors))
+
+        threads = [threading.Thread(target=vote) for _ in range(voters)]
+        began = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - began
+
+        counter.flush()
+        while compact_votes():
+            pass
+
+        return sum(r[0] for r in results), sum(r[1] for r in results), elapsed
@@ -0,0 +1,46 @@
+import time
+
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes the expired sessions from the database in small batches, walking "
+        "the index on their expiry date from the oldest one, so neither the whole "
+        "table is scanned nor the database is locked for long. The cached copies "
+        "expire on their own."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Maximum number of sessions deleted per query.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            help="Keep running, cleaning up again every INTERVAL seconds.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            deleted = 0
+            while batch := self.delete_batch(options["batch_size"]):
+                deleted += batch
+            self.stdout.write(f"Deleted {deleted} expired sessions.")
+
+            if options["interval"] is None:
+                break
+            time.sleep(options["interval"])
+
+    def delete_batch(self, size: int) -> int:
+        expired = Session.objects.filter(expire_date__lt=timezone.now()).order_by(
+            "expire_date"
+        )
+        keys = list(expired.values_list("session_key", flat=True)[:size])
+        deleted, _ = Session.objects.filter(session_key__in=keys).delete()
+        return deleted
@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from polls.counters import compact_votes
+
+
+class Command(BaseCommand):
+    help = (
+        "Adds the votes recorded on the ledger while LedgerCounter is in use to "
+        "the count of their choices."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=10000,
+            help="Maximum number of votes counted per transaction.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            help="Keep running, compacting again every INTERVAL seconds.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            counted = 0
+            while batch := compact_votes(options["batch_size"]):
+                counted += batch
+            self.stdout.write(f"Counted {counted} votes.")
+
+            if options["interval"] is None:
+                break
+            time.sleep(options["interval"])
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from polls.export import FORMATS, export_results
+
+
+class Command(BaseCommand):
+    help = (
+        "Writes every choice with its question and vote count as CSV or as "
+        "newline-delimited JSON, streaming it a chunk at a time."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=list(FORMATS), default="csv")
+        parser.add_argument(
+            "--output",
+            help="File to write to (the standard output by default).",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=2000,
+            help="Number of choices read from the database at a time.",
+        )
+
+    def handle(self, *args, **options):
+        pieces = export_results(options["format"], options["chunk_size"])
+        if options["output"] is None:
+            for piece in pieces:
+                self.stdout.write(piece, ending="")
+            return
+
+        with open(options["output"], "w", newline="", encoding="utf-8") as file:
+            file.writelines(pieces)
@@ -0,0 +1,122 @@
+import csv
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from polls.creation import Poll, batched, create_polls
+
+
+class Command(BaseCommand):
+    help = (
+        "Imports polls from JSONL files (one {'question', 'pub_date', 'choices'} "
+        "object per line) or CSV files (a header, then one 'question,pub_date,"
+        "choice,choice,...' row per poll), reading them as a stream and inserting "
+        "them in batches. An empty pub_date means now."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("files", nargs="+", type=Path)
+        parser.add_argument(
+            "--format",
+            choices=["jsonl", "csv"],
+            help="Format of the files (guessed from their extension by default).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of polls inserted per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        self.skipped = 0
+        polls = choices = 0
+        began = time.perf_counter()
+        for path in options["files"]:
+            file_format = options["format"] or path.suffix.lstrip(".").lower()
+            if file_format not in ("jsonl", "csv"):
+                raise CommandError(f"Unknown format of {path}, use --format.")
+
+            with open(path, newline="", encoding="utf-8") as file:
+                if file_format == "jsonl":
+                    records, parse = self.read_jsonl(file), self.parse_jsonl
+                else:
+                    records, parse = self.read_csv(file), self.parse_csv
+                for batch in batched(
+                    self.valid(path, records, parse), options["batch_size"]
+                ):
+                    create_polls(batch)
+                    polls += len(batch)
+                    choices += sum(len(poll[2]) for poll in batch)
+
+        elapsed = time.perf_counter() - began
+        self.stdout.write(
+            f"Imported {polls} polls and {choices} choices in {elapsed:.1f}s "
+            f"({(polls + choices) / elapsed:.1f} rows/s), skipped {self.skipped} "
+            "invalid polls."
+        )
+
+    def read_jsonl(self, file):
+        """Yields the number and content of each line with something on it."""
+        for number, line in enumerate(file, 1):
+            if line.strip():
+                yield number, line
+
+    def parse_jsonl(self, line: str):
+        data = json.loads(line)  # JSONDecodeError is a ValueError
+        if not isinstance(data, dict):
+            raise ValueError("not a JSON object")
+        question_text = data.get("question")
+        pub_date = data.get("pub_date")
+        choices = data.get("choices")
+        if not isinstance(question_text, str | None):
+            raise ValueError("the question must be a string")
+        if not isinstance(pub_date, str | None):
+            raise ValueError("pub_date must be a string")
+        if not isinstance(choices, list | None) or not all(
+            isinstance(choice, str) for choice in choices or []
+        ):
+            raise ValueError("choices must be a list of strings")
+        return question_text, pub_date, choices
+
+    def read_csv(self, file):
+        """Yields the line number and fields of each row after the header."""
+        reader = csv.reader(file)
+        next(reader, None)  # header
+        for row in reader:
+            if row:
+                yield reader.line_num, row
+
+    def parse_csv(self, row: list[str]):
+        return row[0], row[1] if len(row) > 1 else None, row[2:]
+
+    def valid(self, path: Path, records, parse):
+        """Yields the polls that `CreateQuestionView` would accept, warning about
+        the others, and about the records that `parse` can't read.
+        """
+        for number, record in records:
+            try:
+                question_text, pub_date, choices = parse(record)
+                choices = [choice for choice in choices or [] if choice]
+                if not question_text:
+                    raise ValueError("empty question")
+                if not (2 <= len(choices) <= 8):
+                    raise ValueError("there must be between 2 and 8 choices")
+                poll: Poll = (question_text, self.parse_date(pub_date), choices)
+            except ValueError as e:
+                self.skipped += 1
+                self.stderr.write(f"{path}, line {number}: {e}")
+                continue
+            yield poll
+
+    def parse_date(self, value: str | None) -> datetime | None:
+        if not value:
+            return None
+        date = datetime.fromisoformat(value)
+        if timezone.is_naive(date):
+            date = timezone.make_aware(date)
+        return date
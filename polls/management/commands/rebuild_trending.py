@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from polls.trending import rebuild_activity
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes the total votes and the trending score of every question from "
+        "the counts of their choices and the vote ledger, e.g. for the votes cast "
+        "before the scores were kept."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of votes read and of questions written per query.",
+        )
+
+    def handle(self, *args, **options):
+        questions = rebuild_activity(options["batch_size"])
+        self.stdout.write(f"Rebuilt the activity of {questions} questions.")
@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from polls.histogram import roll_up_buckets
+
+
+class Command(BaseCommand):
+    help = (
+        "Rolls the minute and hour buckets of the vote histograms past their "
+        "retention up into hour and day buckets."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Maximum number of buckets rolled up per transaction.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            help="Keep running, rolling up again every INTERVAL seconds.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            rolled = roll_up_buckets(batch_size=options["batch_size"])
+            self.stdout.write(f"Rolled up {rolled} buckets.")
+
+            if options["interval"] is None:
+                break
+            time.sleep(options["interval"])
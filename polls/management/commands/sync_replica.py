@@ -0,0 +1,50 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+
+class Command(BaseCommand):
+    help = (
+        "Copies the SQLite primary database onto the SQLite replicas listed on "
+        "POLLS_DATABASE_REPLICAS, to stand in for replication when trying the "
+        "read/write split locally (POLLS_SQLITE_REPLICA=1)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            help="Keep running, copying again every INTERVAL seconds.",
+        )
+
+    def handle(self, *args, **options):
+        replicas = settings.POLLS_DATABASE_REPLICAS
+        if not replicas:
+            raise CommandError("There are no replicas on POLLS_DATABASE_REPLICAS.")
+        aliases = ["default", *replicas]
+        if any(connections[alias].vendor != "sqlite" for alias in aliases):
+            raise CommandError("The primary and the replicas must be SQLite databases.")
+
+        primary = connections["default"].settings_dict["NAME"]
+        while True:
+            began = time.perf_counter()
+            with sqlite3.connect(primary) as source:
+                for alias in replicas:
+                    # the backup API copies a consistent snapshot, even while the
+                    # primary is written to
+                    with sqlite3.connect(
+                        connections[alias].settings_dict["NAME"]
+                    ) as target:
+                        source.backup(target)
+                    target.close()
+            source.close()
+            self.stdout.write(
+                f"Synced {len(replicas)} replicas in {time.perf_counter() - began:.2f}s."
+            )
+
+            if options["interval"] is None:
+                break
+            time.sleep(options["interval"])
@@ -0,0 +1,256 @@
+"""
+Per-request performance metrics: which view handled each request, how many queries
+it ran and for how long, how long its templates took to render and how long it took
+overall.
+
+`InstrumentationMiddleware` sends them back on a `Server-Timing` header and adds
+them to histograms per view, which `MetricsView` serves in the Prometheus text
+format. The histograms live in the memory of each process, so every worker has to
+be scraped.
+
+Queries are timed by an execute wrapper added to every database connection and
+templates by the `DjangoTemplates` backend below, and both report to the request
+being handled in the current context, so the queries and templates of async views
+(which may run on other threads) are included too.
+"""
+
+import threading
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.template.backends import django as django_backend
+
+# upper bounds of the histogram buckets
+SECONDS_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERIES_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+# methods labeled as they are, any other one a client sends is labeled "other", so
+# it can't add series to the registry
+METHODS = {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS", "TRACE"}
+
+
+class Histogram:
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value: float):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Registry:
+    """Histograms and counters by name and labels."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.descriptions: dict[str, str] = {}
+        self.histograms: dict[str, dict[tuple, Histogram]] = {}
+        self.counters: dict[str, dict[tuple, float]] = {}
+
+    def observe(self, name: str, value: float, buckets: tuple, **labels):
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            histograms = self.histograms.setdefault(name, {})
+            if key not in histograms:
+                histograms[key] = Histogram(buckets)
+            histograms[key].observe(value)
+
+    def inc(self, name: str, amount: float = 1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            counters = self.counters.setdefault(name, {})
+            counters[key] = counters.get(key, 0) + amount
+
+    def describe(self, name: str, description: str):
+        self.descriptions[name] = description
+
+    def clear(self):
+        with self.lock:
+            self.histograms.clear()
+            self.counters.clear()
+
+    def render(self) -> str:
+        """Returns every metric in the Prometheus text exposition format."""
+        lines = []
+        with self.lock:
+            for name, counters in sorted(self.counters.items()):
+                self.render_header(lines, name, "counter")
+                for labels, value in counters.items():
+                    lines.append(f"{name}{format_labels(labels)} {value}")
+
+            for name, histograms in sorted(self.histograms.items()):
+                self.render_header(lines, name, "histogram")
+                for labels, histogram in histograms.items():
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        bucket_labels = format_labels(labels + (("le", bound),))
+                        lines.append(f"{name}_bucket{bucket_labels} {count}")
+                    bucket_labels = format_labels(labels + (("le", "+Inf"),))
+                    lines.append(f"{name}_bucket{bucket_labels} {histogram.count}")
+                    lines.append(f"{name}_sum{format_labels(labels)} {histogram.sum}")
+                    lines.append(
+                        f"{name}_count{format_labels(labels)} {histogram.count}"
+                    )
+        return "\n".join(lines) + "\n"
+
+    def render_header(self, lines: list[str], name: str, metric_type: str):
+        if name in self.descriptions:
+            lines.append(f"# HELP {name} {self.descriptions[name]}")
+        lines.append(f"# TYPE {name} {metric_type}")
+
+
+def format_labels(labels: tuple) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{name}="{escape(value)}"' for name, value in labels)
+    return f"{{{pairs}}}"
+
+
+def escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+registry = Registry()
+registry.describe("polls_request_duration_seconds", "Time taken by each request.")
+registry.describe("polls_request_queries", "Database queries run by each request.")
+registry.describe(
+    "polls_request_db_duration_seconds", "Time each request spent on the database."
+)
+registry.describe(
+    "polls_request_template_duration_seconds",
+    "Time each request spent rendering templates.",
+)
+
+
+class RequestStats:
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+
+
+_stats: ContextVar[RequestStats | None] = ContextVar(
+    "polls_request_stats", default=None
+)
+
+
+def time_query(execute, sql, params, many, context):
+    stats = _stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.db_time += time.perf_counter() - start
+
+
+@receiver(connection_created)
+def add_query_timer(sender, connection, **kwargs):
+    connection.execute_wrappers.append(time_query)
+
+
+class Template:
+    def __init__(self, template):
+        self.template = template
+
+    def __getattr__(self, name):
+        return getattr(self.template, name)
+
+    def render(self, context=None, request=None):
+        stats = _stats.get()
+        if stats is None:
+            return self.template.render(context, request)
+
+        start = time.perf_counter()
+        try:
+            return self.template.render(context, request)
+        finally:
+            stats.template_time += time.perf_counter() - start
+
+
+class DjangoTemplates(django_backend.DjangoTemplates):
+    """Django's template backend, but timing each render for the metrics."""
+
+    def from_string(self, template_code):
+        return Template(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return Template(super().get_template(template_name))
+
+
+class InstrumentationMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        stats = RequestStats()
+        token = _stats.set(stats)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _stats.reset(token)
+        return self.record(request, response, stats, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        stats = RequestStats()
+        token = _stats.set(stats)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _stats.reset(token)
+        return self.record(request, response, stats, time.perf_counter() - start)
+
+    def record(self, request, response, stats: RequestStats, duration: float):
+        match = request.resolver_match
+        labels = {
+            "view": (match.view_name if match else None) or "<unresolved>",
+            "method": request.method if request.method in METHODS else "other",
+        }
+        registry.observe(
+            "polls_request_duration_seconds", duration, SECONDS_BUCKETS, **labels
+        )
+        registry.observe(
+            "polls_request_queries", stats.queries, QUERIES_BUCKETS, **labels
+        )
+        registry.observe(
+            "polls_request_db_duration_seconds",
+            stats.db_time,
+            SECONDS_BUCKETS,
+            **labels,
+        )
+        registry.observe(
+            "polls_request_template_duration_seconds",
+            stats.template_time,
+            SECONDS_BUCKETS,
+            **labels,
+        )
+
+        response["Server-Timing"] = ", ".join(
+            [
+                f'db;dur={stats.db_time * 1000:.2f};desc="{stats.queries} queries"',
+                f"tpl;dur={stats.template_time * 1000:.2f}",
+                f"total;dur={duration * 1000:.2f}",
+            ]
+        )
+        return response
@@ -0,0 +1,45 @@
+# Generated by Django 5.1.4 on 2026-10-17 06:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("polls", "0003_alter_question_pub_date"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ChoiceShard",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("shard", models.PositiveSmallIntegerField(verbose_name="shard")),
+                ("count", models.IntegerField(default=0, verbose_name="count")),
+                (
+                    "choice",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="shards",
+                        to="polls.choice",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("choice", "shard"), name="unique_choice_shard"
+                    )
+                ],
+            },
+        ),
+    ]
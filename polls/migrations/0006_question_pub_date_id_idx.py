@@ -0,0 +1,19 @@
+# Generated by Django 5.1.4 on 2026-10-17 06:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("polls", "0005_vote"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="question",
+            index=models.Index(
+                fields=["pub_date", "id"], name="question_pub_date_id_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,109 @@
+from django.db import migrations
+
+# FTS5 index of the text of each question and of its choices (joined by spaces),
+# with the id of the question as its rowid. The triggers keep it in sync with every
+# write, including bulk ones that don't send signals, and leave it alone when only
+# the vote counts change.
+CREATE_SQL = [
+    """
+    CREATE VIRTUAL TABLE polls_question_search USING fts5(
+        question_text,
+        choice_text,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER polls_question_search_insert AFTER INSERT ON polls_question
+    BEGIN
+        INSERT INTO polls_question_search (rowid, question_text, choice_text)
+        VALUES (new.id, new.question_text, '');
+    END
+    """,
+    """
+    CREATE TRIGGER polls_question_search_update
+    AFTER UPDATE OF question_text ON polls_question
+    BEGIN
+        UPDATE polls_question_search SET question_text = new.question_text
+        WHERE rowid = new.id;
+    END
+    """,
+    """
+    CREATE TRIGGER polls_question_search_delete AFTER DELETE ON polls_question
+    BEGIN
+        DELETE FROM polls_question_search WHERE rowid = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER polls_choice_search_insert AFTER INSERT ON polls_choice
+    BEGIN
+        UPDATE polls_question_search SET choice_text = (
+            SELECT group_concat(choice_text, ' ') FROM polls_choice
+            WHERE question_id = new.question_id
+        )
+        WHERE rowid = new.question_id;
+    END
+    """,
+    """
+    CREATE TRIGGER polls_choice_search_update
+    AFTER UPDATE OF choice_text, question_id ON polls_choice
+    BEGIN
+        UPDATE polls_question_search SET choice_text = coalesce((
+            SELECT group_concat(choice_text, ' ') FROM polls_choice
+            WHERE question_id = polls_question_search.rowid
+        ), '')
+        WHERE rowid IN (old.question_id, new.question_id);
+    END
+    """,
+    """
+    CREATE TRIGGER polls_choice_search_delete AFTER DELETE ON polls_choice
+    BEGIN
+        UPDATE polls_question_search SET choice_text = coalesce((
+            SELECT group_concat(choice_text, ' ') FROM polls_choice
+            WHERE question_id = old.question_id
+        ), '')
+        WHERE rowid = old.question_id;
+    END
+    """,
+    # indexes the existing questions
+    """
+    INSERT INTO polls_question_search (rowid, question_text, choice_text)
+    SELECT id, question_text, coalesce((
+        SELECT group_concat(choice_text, ' ') FROM polls_choice
+        WHERE question_id = polls_question.id
+    ), '')
+    FROM polls_question
+    """,
+]
+
+DROP_SQL = [
+    "DROP TRIGGER polls_question_search_insert",
+    "DROP TRIGGER polls_question_search_update",
+    "DROP TRIGGER polls_question_search_delete",
+    "DROP TRIGGER polls_choice_search_insert",
+    "DROP TRIGGER polls_choice_search_update",
+    "DROP TRIGGER polls_choice_search_delete",
+    "DROP TABLE polls_question_search",
+]
+
+
+def run_on_sqlite(statements):
+    """Only SQLite has FTS5, other databases search with LIKE (see polls/search.py)."""
+
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor == "sqlite":
+            for sql in statements:
+                schema_editor.execute(sql)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("polls", "0006_question_pub_date_id_idx"),
+    ]
+
+    operations = [
+        migrations.RunPython(run_on_sqlite(CREATE_SQL), run_on_sqlite(DROP_SQL)),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.1.4 on 2026-10-17 06:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("polls", "0007_question_search"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="QuestionActivity",
+            fields=[
+                (
+                    "question",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="activity",
+                        serialize=False,
+                        to="polls.question",
+                    ),
+                ),
+                (
+                    "total_votes",
+                    models.IntegerField(default=0, verbose_name="total votes"),
+                ),
+                ("score", models.FloatField(verbose_name="score")),
+            ],
+            options={
+                "verbose_name_plural": "question activities",
+                "indexes": [models.Index(fields=["score"], name="activity_score_idx")],
+            },
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.1.4 on 2026-10-17 06:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("polls", "0008_questionactivity"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="VoteBucket",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "resolution",
+                    models.PositiveIntegerField(
+                        choices=[(60, "minute"), (3600, "hour"), (86400, "day")],
+                        verbose_name="resolution",
+                    ),
+                ),
+                ("start", models.DateTimeField(verbose_name="start")),
+                ("count", models.IntegerField(default=0, verbose_name="count")),
+                (
+                    "choice",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="buckets",
+                        to="polls.choice",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["resolution", "start"], name="vote_bucket_rollup_idx"
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("choice", "resolution", "start"),
+                        name="unique_vote_bucket",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -1,6 +1,9 @@
 import datetime
 
+from django.conf import settings
 from django.db import models
+from django.db.models import F, Sum
+from django.db.models.functions import Coalesce
 from django.contrib import admin
 from django.utils import timezone
 
@@ -9,6 +12,12 @@ class Question(models.Model):
     question_text = models.CharField("question", max_length=200)
     pub_date = models.DateTimeField("date published", default=timezone.now)
 
+    class Meta:
+        indexes = [
+            # backs the filtering, sorting and keyset pagination of the index page
+            models.Index(fields=["pub_date", "id"], name="question_pub_date_id_idx"),
+        ]
+
     # information used by the admin site
     @admin.display(
         boolean=True,  # makes the field be displayed as boolean
@@ -23,10 +32,150 @@ class Question(models.Model):
         return f"{self.question_text}, {self.pub_date}"
 
 
+class ChoiceQuerySet(models.QuerySet):
+    def with_total_votes(self):
+        """Annotates each choice with `total_votes`, the sum of its `votes` field
+        and the counts stored on its shards, using a single query.
+        """
+        return self.annotate(
+            total_votes=F("votes") + Coalesce(Sum("shards__count"), 0)
+        ).order_by("pk")
+
+
 class Choice(models.Model):
     question = models.ForeignKey(Question, on_delete=models.CASCADE)
     choice_text = models.CharField("choice", max_length=200)
     votes = models.IntegerField("votes", default=0)
 
+    objects = ChoiceQuerySet.as_manager()
+
+    # `votes` only holds the count that isn't spread across shards, so this is
+    # the value that should be displayed (filled by `with_total_votes()` when possible)
+    @property
+    @admin.display(description="Total votes")
+    def total_votes(self):
+        if not hasattr(self, "_total_votes"):
+            shard_votes = self.shards.aggregate(total=Sum("count"))["total"] or 0
+            self._total_votes = self.votes + shard_votes
+        return self._total_votes
+
+    @total_votes.setter
+    def total_votes(self, value):
+        self._total_votes = value
+
     def __str__(self):
         return f"{self.choice_text}, {self.votes}"
+
+
+class ChoiceShard(models.Model):
+    """One of the counters a choice's votes are spread across when sharded
+    counting is enabled, so concurrent voters don't all update the same row.
+    """
+
+    choice = models.ForeignKey(Choice, on_delete=models.CASCADE, related_name="shards")
+    shard = models.PositiveSmallIntegerField("shard")
+    count = models.IntegerField("count", default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["choice", "shard"], name="unique_choice_shard"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.choice_id}#{self.shard}, {self.count}"
+
+
+class Vote(models.Model):
+    """Append-only record of who voted on which choice, which also makes sure
+    each user votes only once per question.
+    """
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    question = models.ForeignKey(Question, on_delete=models.CASCADE)
+    choice = models.ForeignKey(Choice, on_delete=models.CASCADE)
+    voted_at = models.DateTimeField("voted at", default=timezone.now)
+
+    # whether the vote was already added to the count of the choice (votes cast while
+    # `LedgerCounter` is in use only get counted by `compact_votes()`)
+    counted = models.BooleanField("counted", default=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "question"], name="unique_vote_per_question"
+            ),
+        ]
+        indexes = [
+            # keeps the lookup of the votes waiting to be counted cheap
+            models.Index(
+                fields=["choice"],
+                condition=models.Q(counted=False),
+                name="vote_uncounted_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} -> {self.choice_id}, {self.voted_at}"
+
+
+class QuestionActivity(models.Model):
+    """Running totals of the counted votes of a question, updated along with the
+    counts, so the trending polls are found without adding up every choice.
+    """
+
+    question = models.OneToOneField(
+        Question, on_delete=models.CASCADE, primary_key=True, related_name="activity"
+    )
+    total_votes = models.IntegerField("total votes", default=0)
+
+    # log2 of the sum of the votes, each one doubled for every half-life that passed
+    # between the Unix epoch and when it was counted. Every score decays at the same
+    # rate, so ordering by it ranks the questions by how much they are voted on now
+    # (see polls/trending.py).
+    score = models.FloatField("score")
+
+    class Meta:
+        verbose_name_plural = "question activities"
+        indexes = [
+            # backs the reads of the top of the leaderboard
+            models.Index(fields=["score"], name="activity_score_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.question_id}, {self.total_votes}, {self.score}"
+
+
+class VoteBucket(models.Model):
+    """Votes cast on a choice during a minute, an hour or a day (UTC).
+
+    Votes are counted on minute buckets as they're cast, which get rolled up into
+    hours and then days as they age (see polls/histogram.py).
+    """
+
+    class Resolution(models.IntegerChoices):
+        # the length of the buckets, in seconds
+        MINUTE = 60, "minute"
+        HOUR = 60 * 60, "hour"
+        DAY = 24 * 60 * 60, "day"
+
+    choice = models.ForeignKey(Choice, on_delete=models.CASCADE, related_name="buckets")
+    resolution = models.PositiveIntegerField("resolution", choices=Resolution.choices)
+    start = models.DateTimeField("start")
+    count = models.IntegerField("count", default=0)
+
+    class Meta:
+        constraints = [
+            # also backs the reads of the histograms of each choice
+            models.UniqueConstraint(
+                fields=["choice", "resolution", "start"], name="unique_vote_bucket"
+            ),
+        ]
+        indexes = [
+            # backs the roll ups, which go through the oldest buckets of a resolution
+            models.Index(fields=["resolution", "start"], name="vote_bucket_rollup_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.choice_id}, {self.start} +{self.resolution}s, {self.count}"
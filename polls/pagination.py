@@ -0,0 +1,94 @@
+"""
+Keyset ("seek") pagination of questions by (pub_date, id).
+
+Each page starts right after the last question of the previous one, which is
+identified by an opaque cursor, so the database walks the `(pub_date, id)` index
+from that point instead of skipping rows with OFFSET: deep pages cost as much as
+the first one.
+"""
+
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+
+from django.db import connections
+from django.db.models import BooleanField, QuerySet
+from django.db.models.expressions import RawSQL
+
+from .models import Question
+
+
+def encode_cursor(question: Question) -> str:
+    key = f"{question.pub_date.isoformat()}|{question.pk}"
+    return urlsafe_b64encode(key.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Returns the pub_date and id encoded on `cursor`. Raises `ValueError` if
+    the cursor is malformed.
+    """
+    try:
+        key = urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        pub_date, pk = key.split("|")
+        return datetime.fromisoformat(pub_date), int(pk)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+def page_query(
+    queryset: QuerySet, cursor: str | None, size: int, until: datetime
+) -> QuerySet:
+    """Returns the query for the `size` questions published up to `until` that
+    follow `cursor` (newest first), plus one more to know if there is a next page.
+    Raises `ValueError` if the cursor is malformed or after `until`.
+    """
+    if not cursor:
+        return queryset.filter(pub_date__lte=until).order_by("-pub_date", "-pk")[
+            : size + 1
+        ]
+
+    pub_date, pk = decode_cursor(cursor)
+    if pub_date > until:
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    # the questions before the cursor are published already, and adding
+    # `pub_date <= until` would make the database bound the index scan with it
+    # instead, walking down from the newest question again
+    return queryset.filter(before_key(queryset, pub_date, pk)).order_by(
+        "-pub_date", "-pk"
+    )[: size + 1]
+
+
+def before_key(queryset: QuerySet, pub_date: datetime, pk: int) -> RawSQL:
+    """Returns the condition `(pub_date, id) < (pub_date, pk)`, as a single row
+    value comparison the database can seek the `(pub_date, id)` index to (unlike
+    the same condition written with OR).
+    """
+    ops = connections[queryset.db].ops
+    meta = queryset.model._meta
+    table = ops.quote_name(meta.db_table)
+    columns = [
+        f"{table}.{ops.quote_name(meta.get_field(name).column)}"
+        for name in ["pub_date", "id"]
+    ]
+    return RawSQL(
+        f"({', '.join(columns)}) < (%s, %s)",
+        [ops.adapt_datetimefield_value(pub_date), pk],
+        output_field=BooleanField(),
+    )
+
+
+def split_page(questions: list[Question], size: int):
+    """Returns the questions of the page and the cursor of the next one (or `None`)."""
+    if len(questions) > size:
+        return questions[:size], encode_cursor(questions[size - 1])
+    return questions, None
+
+
+def get_page(queryset: QuerySet, cursor: str | None, size: int, until: datetime):
+    return split_page(list(page_query(queryset, cursor, size, until)), size)
+
+
+async def aget_page(queryset: QuerySet, cursor: str | None, size: int, until: datetime):
+    questions = [
+        question async for question in page_query(queryset, cursor, size, until)
+    ]
+    return split_page(questions, size)
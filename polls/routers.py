@@ -0,0 +1,112 @@
+"""
+Read/write splitting between the primary database ("default") and the read replicas
+listed on `settings.POLLS_DATABASE_REPLICAS`.
+
+Replicas lag behind the primary, so once a request writes, the rest of its reads go
+to the primary, and so do the reads of the same client for the next
+`settings.POLLS_REPLICA_PIN_SECONDS` seconds (see `ReplicaPinningMiddleware`). That
+way a voter is never redirected to results that don't have their vote yet.
+"""
+
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+PRIMARY = "default"
+
+
+class Pin:
+    """Where the reads of the current request go: `pinned` requests read from the
+    primary, and so does any request after it `wrote` to it.
+    """
+
+    def __init__(self, pinned: bool = False):
+        self.pinned = pinned
+        self.wrote = False
+
+
+_pin: ContextVar[Pin | None] = ContextVar("polls_replica_pin", default=None)
+
+
+@contextmanager
+def use_primary():
+    """Sends the reads inside the block to the primary, which is needed for anything
+    cached under a version bumped by a write that replicas may not have yet.
+    """
+    token = _pin.set(Pin(pinned=True))
+    try:
+        yield
+    finally:
+        _pin.reset(token)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        pin = _pin.get()
+        if not settings.POLLS_DATABASE_REPLICAS or (pin and (pin.pinned or pin.wrote)):
+            return PRIMARY
+        return random.choice(settings.POLLS_DATABASE_REPLICAS)
+
+    def db_for_write(self, model, **hints):
+        if (pin := _pin.get()) is not None:
+            pin.wrote = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # replicas get their tables from the primary
+        return db not in settings.POLLS_DATABASE_REPLICAS
+
+
+class ReplicaPinningMiddleware:
+    """Tracks the writes of each request and keeps the clients that made them
+    reading from the primary for a while, through a cookie.
+    """
+
+    cookie_name = "polls_primary"
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        pin = Pin(pinned=self.cookie_name in request.COOKIES)
+        token = _pin.set(pin)
+        try:
+            response = self.get_response(request)
+        finally:
+            _pin.reset(token)
+        return self.pin_client(pin, response)
+
+    async def __acall__(self, request):
+        pin = Pin(pinned=self.cookie_name in request.COOKIES)
+        token = _pin.set(pin)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _pin.reset(token)
+        return self.pin_client(pin, response)
+
+    def pin_client(self, pin: Pin, response):
+        if pin.wrote and settings.POLLS_DATABASE_REPLICAS:
+            response.set_cookie(
+                self.cookie_name,
+                "1",
+                max_age=settings.POLLS_REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
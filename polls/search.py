@@ -0,0 +1,125 @@
+"""
+Full-text search of questions, by their text and the text of their choices.
+
+On SQLite, questions are indexed on the `polls_question_search` FTS5 table, which
+triggers keep in sync with the questions and choices (see migration 0007), and
+matches are ranked with bm25, weighing the question text more than its choices.
+Ranking costs about a microsecond per match, so only the newest
+`settings.POLLS_SEARCH_MAX_RANKED` published matches are ranked, which keeps
+searches for common words as fast as the rest. Older matches follow them on later
+pages, unranked and newest first.
+Other databases fall back to `icontains` lookups, which scan the whole table.
+"""
+
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Exists, OuterRef, Q, QuerySet
+from django.db.models.expressions import RawSQL
+from django.utils import timezone
+
+from .models import Question, Choice
+
+# words of a search beyond this are ignored
+MAX_TERMS = 8
+# how much more a match on the question text counts than one on its choices
+QUESTION_WEIGHT = 4.0
+
+
+def match_query(terms: str) -> str:
+    """Returns the FTS5 query matching questions with every word of `terms`, the
+    last one as a prefix, or an empty string if there are no words. The words are
+    quoted, so the FTS5 syntax can't be used (or break the query).
+    """
+    words = re.findall(r"\w+", terms)[:MAX_TERMS]
+    if not words:
+        return ""
+    return " ".join(f'"{word}"' for word in words) + "*"
+
+
+def use_fts() -> bool:
+    return connection.vendor == "sqlite"
+
+
+def search_filter(terms: str) -> Q:
+    """Returns a filter for the questions matching `terms`, unranked, which matches
+    none if `terms` has no words.
+    """
+    if not (query := match_query(terms)):
+        return Q(pk__in=[])
+    if use_fts():
+        return Q(
+            pk__in=RawSQL(
+                "SELECT rowid FROM polls_question_search "
+                "WHERE polls_question_search MATCH %s",
+                [query],
+            )
+        )
+    return Q(question_text__icontains=terms) | Q(
+        Exists(
+            Choice.objects.filter(question=OuterRef("pk"), choice_text__icontains=terms)
+        )
+    )
+
+
+# the published questions matching the query, to select from
+MATCHES = (
+    "FROM polls_question_search "
+    "JOIN polls_question ON polls_question.id = polls_question_search.rowid "
+    "WHERE polls_question_search MATCH %s AND polls_question.pub_date <= %s"
+)
+
+
+def search_questions(terms: str, page: int, size: int):
+    """Returns the published questions matching `terms` on `page` (counting from 1),
+    best matches first, and whether there is a next page.
+    """
+    if not match_query(terms):
+        return [], False
+
+    offset = (page - 1) * size
+    if use_fts():
+        now = connection.ops.adapt_datetimefield_value(timezone.now())
+        ranked = settings.POLLS_SEARCH_MAX_RANKED
+        questions = []
+        if offset < ranked:
+            questions = list(
+                Question.objects.raw(
+                    "SELECT id, question_text, pub_date FROM ("
+                    "  SELECT polls_question.id, polls_question.question_text,"
+                    "  polls_question.pub_date,"
+                    f"  bm25(polls_question_search, %s, 1.0) AS score {MATCHES}"
+                    "  ORDER BY polls_question_search.rowid DESC LIMIT %s"
+                    ") ORDER BY score LIMIT %s OFFSET %s",
+                    [
+                        QUESTION_WEIGHT,
+                        match_query(terms),
+                        now,
+                        ranked,
+                        size + 1,
+                        offset,
+                    ],
+                )
+            )
+        if len(questions) <= size and offset + len(questions) >= ranked:
+            # past the ranked matches, the older ones follow unranked, newest first
+            questions += Question.objects.raw(
+                "SELECT polls_question.id, polls_question.question_text, "
+                f"polls_question.pub_date {MATCHES} "
+                "ORDER BY polls_question_search.rowid DESC LIMIT %s OFFSET %s",
+                [
+                    match_query(terms),
+                    now,
+                    size + 1 - len(questions),
+                    offset + len(questions),
+                ],
+            )
+    else:
+        queryset: QuerySet = Question.objects.filter(
+            search_filter(terms), pub_date__lte=timezone.now()
+        )
+        questions = queryset.order_by("-pub_date", "-pk")[offset : offset + size + 1]
+
+    questions = list(questions)
+    return questions[:size], len(questions) > size
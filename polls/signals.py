@@ -0,0 +1,23 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Question, Choice
+from .caching import bump_poll_version, bump_index_version
+from .auth import forget_user
+
+
+@receiver([post_save, post_delete], sender=Question)
+def question_changed(sender, instance: Question, **kwargs):
+    bump_poll_version(instance.pk)
+    bump_index_version()
+
+
+@receiver([post_save, post_delete], sender=Choice)
+def choice_changed(sender, instance: Choice, **kwargs):
+    bump_poll_version(instance.question_id)
+
+
+@receiver([post_save, post_delete], sender=get_user_model())
+def user_changed(sender, instance, **kwargs):
+    forget_user(instance.pk)
@@ -0,0 +1,22 @@
+"""
+Tuning of the SQLite connections, which Django opens with SQLite's defaults: a
+rollback journal that makes readers wait on writers, a full sync on each commit
+and a small page cache.
+"""
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+def apply_pragmas(connection, pragmas: dict):
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+
+
+@receiver(connection_created)
+def configure_connection(sender, connection, **kwargs):
+    """Runs `settings.POLLS_SQLITE_PRAGMAS` on each new SQLite connection."""
+    if connection.vendor == "sqlite":
+        apply_pragmas(connection, settings.POLLS_SQLITE_PRAGMAS)
@@ -0,0 +1,34 @@
+"""URL configuration that serves the async views, used by `test_async_views`."""
+
+from django.contrib import admin
+from django.urls import include, path
+
+from polls import async_views, urls
+
+async_patterns = [
+    path("", async_views.IndexView.as_view(), name="index"),
+    path("<int:pk>/", async_views.DetailView.as_view(), name="details"),
+    path("<int:pk>/results/", async_views.ResultsView.as_view(), name="results"),
+    path("<int:question_id>/vote/", async_views.VoteView.as_view(), name="vote"),
+    path("export/", async_views.ExportView.as_view(), name="export"),
+    path(
+        "<int:pk>/results/stream/",
+        async_views.ResultsStreamView.as_view(),
+        name="results-stream",
+    ),
+]
+async_names = {pattern.name for pattern in async_patterns}
+
+urlpatterns = [
+    path("admin/", admin.site.urls),
+    path(
+        "polls/",
+        include(
+            (
+                async_patterns
+                + [p for p in urls.urlpatterns if p.name not in async_names],
+                "polls",
+            )
+        ),
+    ),
+]
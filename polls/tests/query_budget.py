@@ -0,0 +1,115 @@
+"""
+Query budgets: how many queries each view may run, checked by `test_query_budgets`.
+
+`QUERY_BUDGETS` is the manifest, with the budget of each view for a logged in user,
+which includes the session and user lookups and the savepoints of its transactions
+(tests run inside one). Raise a budget only along with the change that needs it.
+"""
+
+import traceback
+from contextlib import ContextDecorator
+from pathlib import Path
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+QUERY_BUDGETS = {
+    "polls:index": 3,  # session, user, page
+    "polls:details": 3,  # session, user, snapshot
+    "polls:results": 3,  # session, user, snapshot
+    # session, user, snapshot, vote, count and activity of the question (updated, or
+    # created on a savepoint on its first vote) and histogram bucket of the choice
+    # (updated, or created and updated on the first vote of the minute) in a
+    # transaction
+    "polls:vote": 14,
+    # session, user, question and choices in a transaction
+    "polls:create": 6,
+}
+
+# frames of these files are left out of the origin of the queries
+IGNORED_FILES = {Path(__file__).resolve()}
+
+
+def query_origin(limit: int = 3) -> list[str]:
+    """Returns the last `limit` frames of the project's own code on the stack."""
+    frames = []
+    for frame in traceback.extract_stack()[:-2]:
+        path = Path(frame.filename).resolve()
+        if (
+            path.is_relative_to(settings.BASE_DIR)
+            and "site-packages" not in path.parts
+            and path not in IGNORED_FILES
+        ):
+            frames.append(
+                f"{path.relative_to(settings.BASE_DIR)}:{frame.lineno} in {frame.name}"
+            )
+    return frames[-limit:]
+
+
+class QueryLog(ContextDecorator):
+    """Records the SQL of each query run inside it, and where it came from."""
+
+    def __init__(self, using: str = DEFAULT_DB_ALIAS):
+        self.using = using
+
+    def __enter__(self):
+        self.queries: list[tuple[str, list[str]]] = []
+        self.wrapper = connections[self.using].execute_wrapper(self.record)
+        self.wrapper.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.wrapper.__exit__(*exc_info)
+
+    def __len__(self):
+        return len(self.queries)
+
+    def record(self, execute, sql, params, many, context):
+        self.queries.append((sql, query_origin()))
+        return execute(sql, params, many, context)
+
+    def report(self) -> str:
+        lines = []
+        for number, (sql, origin) in enumerate(self.queries, 1):
+            lines.append(f"{number}. {sql}")
+            lines.extend(f"     from {frame}" for frame in reversed(origin))
+        return "\n".join(lines)
+
+
+class query_budget(QueryLog):
+    """Fails when the code inside it runs more than `budget` queries, which is
+    either a number or the name of a view on `QUERY_BUDGETS`. Works as a context
+    manager and as a decorator.
+    """
+
+    def __init__(self, budget: int | str, using: str = DEFAULT_DB_ALIAS):
+        super().__init__(using)
+        self.name = budget if isinstance(budget, str) else None
+        self.budget = QUERY_BUDGETS[budget] if isinstance(budget, str) else budget
+
+    def __exit__(self, exc_type, *exc_info):
+        super().__exit__(exc_type, *exc_info)
+        if exc_type is None and len(self) > self.budget:
+            name = f" of {self.name}" if self.name else ""
+            raise AssertionError(
+                f"{len(self)} queries ran, over the budget{name} of {self.budget}:\n"
+                + self.report()
+            )
+
+
+class QueryBudgetMixin:
+    """Assertions for `TestCase`s about how the number of queries scales."""
+
+    def assertQueriesConstant(self, run, grow):
+        """Fails if `run` makes more queries after `grow` adds data than before."""
+        with QueryLog() as before:
+            run()
+        grow()
+        with QueryLog() as after:
+            run()
+
+        if len(after) > len(before):
+            self.fail(
+                f"The queries grew from {len(before)} to {len(after)} with more "
+                f"data:\n{after.report()}"
+            )
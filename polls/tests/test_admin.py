@@ -0,0 +1,109 @@
+import datetime
+
+from django.contrib.auth.models import User
+from django.core.paginator import EmptyPage
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from polls.admin import EstimatedCountPaginator, IndexedDatesQuerySet
+from polls.creation import create_polls
+from polls.models import Question, ChoiceShard
+from polls.tests.query_budget import QueryBudgetMixin
+
+
+def aware(*args):
+    return timezone.make_aware(datetime.datetime(*args))
+
+
+class QuestionAdminTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        self.client.force_login(
+            User.objects.create_superuser("admin", "admin@example.com", "password")
+        )
+        self.url = reverse("admin:polls_question_changelist")
+
+    def test_dates_match_distinct(self):
+        """Tests if the dates found by seeking the index are the distinct ones."""
+        dates = [
+            aware(2023, 12, 31, 23, 30),
+            aware(2024, 1, 1, 0, 10),
+            aware(2024, 1, 1, 22),
+            aware(2024, 2, 29, 12),
+            aware(2024, 12, 31, 23, 59),
+        ]
+        create_polls(
+            [(f"Question {i}", date, ["A", "B"]) for i, date in enumerate(dates)]
+        )
+        queryset = IndexedDatesQuerySet(Question)
+        for kind in ["year", "month", "day"]:
+            for order in ["ASC", "DESC"]:
+                self.assertEqual(
+                    queryset.datetimes("pub_date", kind, order),
+                    list(Question.objects.datetimes("pub_date", kind, order)),
+                )
+
+    @override_settings(POLLS_ADMIN_MAX_COUNT=3)
+    def test_estimated_count(self):
+        """Tests if counts over the limit are estimated when unfiltered and cut at
+        the limit when filtered.
+        """
+        questions = create_polls(
+            [(f"Question {i}", None, ["A", "B"]) for i in range(5)]
+        )
+        questions[-2].delete()
+        # estimated by the largest id, which counts the deleted question too
+        ordered = Question.objects.order_by("pk")
+        self.assertEqual(EstimatedCountPaginator(ordered, 10).count, questions[-1].pk)
+        filtered = ordered.exclude(pk=questions[0].pk)
+        self.assertEqual(EstimatedCountPaginator(filtered, 10).count, 3)
+        few = ordered.filter(pk__lte=questions[1].pk)
+        self.assertEqual(EstimatedCountPaginator(few, 10).count, 2)
+
+    @override_settings(POLLS_ADMIN_MAX_COUNT=3)
+    def test_pages_past_estimate(self):
+        """Tests if the pages of an estimated count are linked as far as rows are
+        known to exist, and the next page of each full one can be opened.
+        """
+        questions = create_polls(
+            [(f"Question {i}", None, ["A", "B"]) for i in range(9)]
+        )
+        questions[-1].delete()  # the largest id overestimates the count
+        for queryset in [
+            Question.objects.order_by("pk"),
+            Question.objects.filter(question_text__startswith="Question").order_by(
+                "pk"
+            ),
+        ]:
+            paginator = EstimatedCountPaginator(queryset, 2)
+            self.assertEqual(paginator.num_pages, 2)
+            for number in [2, 3]:
+                self.assertEqual(len(paginator.page(number)), 2)
+                self.assertEqual(paginator.num_pages, number + 1)
+            self.assertEqual(
+                [question.pk for question in paginator.page(4)],
+                [questions[6].pk, questions[7].pk],
+            )
+            self.assertEqual(paginator.num_pages, 4)
+            with self.assertRaises(EmptyPage):
+                paginator.page(5)
+
+    def test_total_votes(self):
+        """Tests if the total votes of the questions, shards included, are shown
+        with as many queries however many questions there are.
+        """
+        (question,) = create_polls([("Counted", None, ["A", "B"])])
+        choice = question.choice_set.first()
+        choice.votes = 2
+        choice.save()
+        ChoiceShard.objects.create(choice=choice, shard=0, count=3)
+
+        response = self.client.get(self.url)
+        self.assertContains(response, '<td class="field-total_votes">5</td>', html=True)
+
+        self.assertQueriesConstant(
+            lambda: self.client.get(self.url),
+            lambda: create_polls(
+                [(f"Question {i}", None, ["A", "B"]) for i in range(5)]
+            ),
+        )
@@ -0,0 +1,105 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth.models import User
+
+from polls.models import Question
+from polls.tests.test_caching import LOCMEM_CACHES
+
+
+# a single process, so its cache is shared
+@override_settings(CACHES=LOCMEM_CACHES, POLLS_CACHE_SHARED=True)
+class ApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.question = Question.objects.create(question_text="Test Question")
+        self.choice1 = self.question.choice_set.create(choice_text="Choice 1", votes=2)
+        self.choice2 = self.question.choice_set.create(choice_text="Choice 2")
+        self.future = Question.objects.create(
+            question_text="Future Question",
+            pub_date=timezone.now() + timedelta(days=1),
+        )
+        self.results_url = reverse("polls:api-results", args=(self.question.pk,))
+
+    def test_question_list(self):
+        """Tests if the list has only the published questions and supports ETags."""
+        url = reverse("polls:api-questions")
+        response = self.client.get(url)
+        self.assertEqual(
+            [question["id"] for question in response.json()["questions"]],
+            [self.question.pk],
+        )
+        self.assertIsNone(response.json()["next"])
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, headers={"if-none-match": response["ETag"]})
+        self.assertEqual(response.status_code, 304)
+
+        self.assertEqual(self.client.get(url, {"after": "invalid"}).status_code, 404)
+
+    def test_question_detail(self):
+        """Tests if the details have the choices and hide future questions."""
+        response = self.client.get(
+            reverse("polls:api-question", args=(self.question.pk,))
+        )
+        self.assertEqual(
+            response.json()["choices"],
+            [
+                {"id": self.choice1.pk, "choice_text": "Choice 1"},
+                {"id": self.choice2.pk, "choice_text": "Choice 2"},
+            ],
+        )
+
+        response = self.client.get(
+            reverse("polls:api-question", args=(self.future.pk,))
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_results_not_modified(self):
+        """Tests if an unchanged poll costs no query and gets a 304."""
+        response = self.client.get(self.results_url)
+        self.assertEqual(response.json()["choices"][0]["votes"], 2)
+        etag = response["ETag"]
+        self.assertTrue(etag.startswith('"'))
+
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                self.results_url, headers={"if-none-match": etag}
+            )
+        self.assertEqual(response.status_code, 304)
+
+    @override_settings(POLLS_CACHE_SHARED=False)
+    def test_no_etags_without_shared_cache(self):
+        """Tests if polls have no ETags when other workers may not see the versions."""
+        response = self.client.get(self.results_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header("ETag"))
+
+    @override_settings(POLLS_VOTE_COUNTER="polls.counters.BufferedCounter")
+    def test_no_results_etag_with_buffered_votes(self):
+        """Tests if the results have no ETag when they include the votes pending on
+        this process only, while the poll still has one.
+        """
+        response = self.client.get(self.results_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header("ETag"))
+        url = reverse("polls:api-question", args=(self.question.pk,))
+        self.assertTrue(self.client.get(url).has_header("ETag"))
+
+    def test_results_changed_by_vote(self):
+        """Tests if a vote changes the ETag, so the new results are sent."""
+        etag = self.client.get(self.results_url)["ETag"]
+
+        self.client.force_login(User.objects.create_user(username="testuser"))
+        self.client.post(
+            reverse("polls:vote", args=(self.question.pk,)),
+            {"choice": self.choice2.pk},
+        )
+
+        response = self.client.get(self.results_url, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(response.json()["choices"][1]["votes"], 1)
@@ -0,0 +1,108 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from django.urls import reverse
+from django.contrib.auth.models import User
+
+from polls.models import Question, Choice
+from polls.async_views import VoteView
+
+
+@override_settings(ROOT_URLCONF="polls.tests.async_urls")
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        self.question = Question.objects.create(question_text="Test Question")
+        self.choice1 = self.question.choice_set.create(choice_text="Choice 1", votes=2)
+        self.choice2 = self.question.choice_set.create(choice_text="Choice 2")
+        self.future = Question.objects.create(
+            question_text="Future Question",
+            pub_date=timezone.now() + timedelta(days=1),
+        )
+        self.user = User.objects.create_user(
+            username="testuser", password="testpass123"
+        )
+
+    async def test_index(self):
+        """Tests if the async index lists only the published questions."""
+        response = await self.async_client.get(reverse("polls:index"))
+        self.assertContains(response, "Test Question")
+        self.assertNotContains(response, "Future Question")
+
+    async def test_details(self):
+        """Tests if the async details page shows the choices and hides future questions."""
+        response = await self.async_client.get(
+            reverse("polls:details", args=(self.question.pk,))
+        )
+        self.assertContains(response, "Choice 1")
+        self.assertContains(response, "Choice 2")
+
+        response = await self.async_client.get(
+            reverse("polls:details", args=(self.future.pk,))
+        )
+        self.assertEqual(response.status_code, 404)
+
+    async def test_results(self):
+        """Tests if the async results page shows the vote counts."""
+        response = await self.async_client.get(
+            reverse("polls:results", args=(self.question.pk,))
+        )
+        self.assertContains(response, "Choice 1 -- 2 votes")
+        self.assertContains(response, "Choice 2 -- 0 votes")
+
+    async def test_vote(self):
+        """Tests if an authenticated vote is counted and redirects to the results."""
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.post(
+            reverse("polls:vote", args=(self.question.pk,)),
+            {"choice": self.choice2.pk},
+        )
+        self.assertRedirects(
+            response,
+            reverse("polls:results", args=(self.question.pk,)),
+            fetch_redirect_response=False,
+        )
+
+        choice = await Choice.objects.aget(pk=self.choice2.pk)
+        self.assertEqual(choice.votes, 1)
+
+    async def test_vote_twice(self):
+        """Tests if a second vote on the same question shows an error and isn't counted."""
+        await self.async_client.aforce_login(self.user)
+        url = reverse("polls:vote", args=(self.question.pk,))
+        await self.async_client.post(url, {"choice": self.choice2.pk})
+        response = await self.async_client.post(url, {"choice": self.choice1.pk})
+        self.assertContains(response, VoteView.ErrorMessages.ALREADY_VOTED.value)
+
+        choice = await Choice.objects.aget(pk=self.choice1.pk)
+        self.assertEqual(choice.votes, 2)
+
+    @override_settings(POLLS_VOTE_COUNTER="polls.counters.LedgerCounter")
+    async def test_results_with_ledger(self):
+        """Tests if the async results page includes the votes waiting on the ledger."""
+        await self.async_client.aforce_login(self.user)
+        await self.async_client.post(
+            reverse("polls:vote", args=(self.question.pk,)),
+            {"choice": self.choice2.pk},
+        )
+        response = await self.async_client.get(
+            reverse("polls:results", args=(self.question.pk,))
+        )
+        self.assertContains(response, "Choice 2 -- 1 vote")
+
+    async def test_vote_invalid_choice(self):
+        """Tests if an invalid choice renders the details page with an error."""
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.post(
+            reverse("polls:vote", args=(self.question.pk,)), {"choice": 999}
+        )
+        self.assertContains(response, VoteView.ErrorMessages.INVALID_CHOICE.value)
+
+    async def test_vote_unauthenticated(self):
+        """Tests if anonymous voters are redirected to the login page."""
+        response = await self.async_client.post(
+            reverse("polls:vote", args=(self.question.pk,)),
+            {"choice": self.choice2.pk},
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(response.url.startswith(reverse("polls:login")))
@@ -0,0 +1,39 @@
+from django.test import SimpleTestCase
+
+from polls.management.commands.bench_http import Command, is_error
+
+
+class BenchBaselineTests(SimpleTestCase):
+    baseline = {"wsgi": {"results": {"req_s": 100.0, "p95_ms": 10.0, "queries": 1.0}}}
+
+    def test_within_threshold(self):
+        """Tests if results up to the threshold worse than the baseline pass."""
+        results = {"wsgi": {"results": {"req_s": 85.0, "p95_ms": 11.5, "queries": 1.0}}}
+        self.assertEqual(Command().compare(results, self.baseline, 0.2), [])
+
+    def test_regressions(self):
+        """Tests if slower pages and extra queries are reported, and pages missing
+        from the baseline are skipped.
+        """
+        results = {
+            "wsgi": {"results": {"req_s": 70.0, "p95_ms": 10.0, "queries": 2.0}},
+            "asgi": {"results": {"req_s": 1.0, "p95_ms": 999.0, "queries": 9.0}},
+        }
+        self.assertEqual(
+            Command().compare(results, self.baseline, 0.2),
+            [
+                "wsgi results req_s: 70.00 (baseline 100.00)",
+                "wsgi results queries: 2.00 (baseline 1.00)",
+            ],
+        )
+
+
+class BenchErrorTests(SimpleTestCase):
+    def test_is_error(self):
+        """Tests if throttled and missing pages count as errors, not only server
+        errors.
+        """
+        self.assertEqual(
+            [is_error(status) for status in [200, 302, 404, 429, 500]],
+            [False, False, True, True, True],
+        )
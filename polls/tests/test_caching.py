@@ -0,0 +1,264 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.utils import timezone
+from django.http import Http404
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+
+from polls.models import Question
+from polls.auth import user_key
+from polls.caching import (
+    get_cache_stats,
+    get_poll_version,
+    get_poll_snapshot,
+    index_page_timeout,
+)
+from polls.views import VoteView
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+# what the settings turn on when the cache is shared
+CACHED_SESSIONS = {
+    "POLLS_CACHE_SHARED": True,
+    "SESSION_ENGINE": "django.contrib.sessions.backends.cached_db",
+    "AUTHENTICATION_BACKENDS": ["polls.auth.CachedModelBackend"],
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ResultsCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.question = Question.objects.create(question_text="Test Question")
+        self.choice1 = self.question.choice_set.create(choice_text="Choice 1", votes=1)
+        self.choice2 = self.question.choice_set.create(choice_text="Choice 2")
+        self.url = reverse("polls:results", args=(self.question.pk,))
+
+    def test_results_served_from_cache(self):
+        """Tests if the second request for the same results doesn't query the database."""
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertContains(response, "Choice 1 -- 1 vote")
+
+        self.assertEqual(
+            get_cache_stats("snapshot"), {"hits": 1, "misses": 1, "hit_rate": 0.5}
+        )
+
+    def test_vote_invalidates_results(self):
+        """Tests if a vote bumps the version, so the next request shows it."""
+        self.client.get(self.url)
+        version = get_poll_version(self.question.pk)
+
+        user = User.objects.create_user(username="testuser")
+        self.client.force_login(user)
+        self.client.post(
+            reverse("polls:vote", args=(self.question.pk,)),
+            {"choice": self.choice2.pk},
+        )
+        self.assertNotEqual(get_poll_version(self.question.pk), version)
+
+        response = self.client.get(self.url)
+        self.assertContains(response, "Choice 2 -- 1 vote")
+
+    def test_edits_invalidate_results(self):
+        """Tests if saving or deleting a question or choice makes the results stale."""
+        self.client.get(self.url)
+
+        self.question.question_text = "Edited Question"
+        self.question.save()
+        self.assertContains(self.client.get(self.url), "Edited Question")
+
+        self.choice2.delete()
+        self.assertNotContains(self.client.get(self.url), "Choice 2")
+
+    def test_cache_stats_view(self):
+        """Tests if the cache stats are only shown to staff members."""
+        stats_url = reverse("polls:cache-stats")
+        response = self.client.get(stats_url)
+        self.assertEqual(response.status_code, 302)
+
+        staff = User.objects.create_user(username="staff", is_staff=True)
+        self.client.force_login(staff)
+        self.client.get(self.url)
+        response = self.client.get(stats_url)
+        self.assertEqual(
+            response.json()["snapshots"], {"hits": 0, "misses": 1, "hit_rate": 0.0}
+        )
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class PollSnapshotTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.question = Question.objects.create(question_text="Test Question")
+        self.choice1 = self.question.choice_set.create(choice_text="Choice 1", votes=3)
+        self.choice2 = self.question.choice_set.create(choice_text="Choice 2")
+        self.choice1.shards.create(shard=0, count=2)
+
+    def test_snapshot_built_with_one_query(self):
+        """Tests if a snapshot that isn't cached costs a single query."""
+        with self.assertNumQueries(1):
+            question, choices = get_poll_snapshot(self.question.pk)
+
+        self.assertEqual(question.question_text, "Test Question")
+        self.assertEqual(question.pub_date, self.question.pub_date)
+        self.assertEqual(
+            [(c.pk, c.choice_text, c.total_votes) for c in choices],
+            [(self.choice1.pk, "Choice 1", 5), (self.choice2.pk, "Choice 2", 0)],
+        )
+
+    def test_snapshot_without_choices(self):
+        """Tests if questions without choices and missing questions are handled."""
+        question = Question.objects.create(question_text="Empty Question")
+        self.assertEqual(get_poll_snapshot(question.pk)[1], [])
+
+        with self.assertRaises(Http404):
+            get_poll_snapshot(999)
+
+    @override_settings(POLLS_CACHE_SHARED=True, POLLS_SNAPSHOT_CACHE_TIMEOUT=120)
+    def test_versions_of_existing_questions_only(self):
+        """Tests if versions are only created for questions that exist, and expire
+        like their snapshots.
+        """
+        for url in [
+            reverse("polls:details", args=(999,)),
+            reverse("polls:api-question", args=(999,)),
+        ]:
+            self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertIsNone(get_poll_version(999))
+
+        cache.clear()  # the version the choices of the question bumped
+        with mock.patch.object(cache, "add", wraps=cache.add) as add:
+            get_poll_snapshot(self.question.pk)
+        self.assertIsNotNone(get_poll_version(self.question.pk))
+        self.assertEqual(add.call_args.args[2], 120)
+
+    def test_details_page_queries(self):
+        """Tests if the details page costs one query at most."""
+        url = reverse("polls:details", args=(self.question.pk,))
+        with self.assertNumQueries(1):
+            self.client.get(url)
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertContains(response, "Choice 2")
+
+    @override_settings(**CACHED_SESSIONS)
+    def test_invalid_vote_uses_snapshot(self):
+        """Tests if rendering the details page again after an invalid vote doesn't
+        query the poll again.
+        """
+        user = User.objects.create_user(username="testuser")
+        self.client.force_login(user)
+        get_poll_snapshot(self.question.pk)
+
+        # user lookup only, the session comes from the cache
+        with self.assertNumQueries(1):
+            response = self.client.post(
+                reverse("polls:vote", args=(self.question.pk,)), {"choice": 999}
+            )
+        self.assertContains(response, VoteView.ErrorMessages.INVALID_CHOICE.value)
+
+
+@override_settings(CACHES=LOCMEM_CACHES, POLLS_INDEX_CACHE_TIMEOUT=600)
+class IndexPageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.url = reverse("polls:index")
+        Question.objects.create(
+            question_text="Published", pub_date=timezone.now() - timedelta(days=1)
+        )
+
+    def test_anonymous_page_cached(self):
+        """Tests if anonymous visitors get the index page from the cache."""
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertContains(response, "Published")
+        self.assertEqual(get_cache_stats("index")["hits"], 1)
+
+    def test_authenticated_page_not_cached(self):
+        """Tests if logged in users get their own page, which isn't cached."""
+        self.client.force_login(User.objects.create_user(username="testuser"))
+        self.client.get(self.url)
+        response = self.client.get(self.url)
+        self.assertContains(response, "testuser")
+        self.assertEqual(
+            get_cache_stats("index"), {"hits": 0, "misses": 0, "hit_rate": None}
+        )
+
+    def test_question_changes_invalidate_page(self):
+        """Tests if creating, editing or deleting a question makes the page stale."""
+        self.client.get(self.url)
+
+        question = Question.objects.create(question_text="New")
+        self.assertContains(self.client.get(self.url), "New")
+
+        question.question_text = "Edited"
+        question.save()
+        self.assertContains(self.client.get(self.url), "Edited")
+
+        question.delete()
+        self.assertNotContains(self.client.get(self.url), "Edited")
+
+    def test_timeout_until_next_publication(self):
+        """Tests if the page expires when the next scheduled question gets published."""
+        self.assertEqual(index_page_timeout(None), 600)
+        self.assertEqual(
+            index_page_timeout(timezone.now() + timedelta(seconds=30.5)), 30
+        )
+
+        Question.objects.create(
+            question_text="Scheduled", pub_date=timezone.now() + timedelta(seconds=60)
+        )
+        with mock.patch.object(cache, "set") as cache_set:
+            self.client.get(self.url)
+        self.assertLessEqual(cache_set.call_args.args[2], 60)
+
+
+@override_settings(CACHES=LOCMEM_CACHES, **CACHED_SESSIONS)
+class SessionCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="testuser")
+        self.client.force_login(self.user)
+        self.url = reverse("polls:index")
+
+    def test_authenticated_request_without_queries(self):
+        """Tests if the session and the user of a request come from the cache."""
+        self.client.get(self.url)
+        # just the page, which isn't cached for authenticated users
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertContains(response, "testuser")
+
+    def test_user_changes_invalidate_cache(self):
+        """Tests if saving a user drops it from the cache."""
+        self.client.get(self.url)
+        self.assertIsNotNone(cache.get(user_key(self.user.pk)))
+
+        self.user.username = "renamed"
+        self.user.save()
+        self.assertIsNone(cache.get(user_key(self.user.pk)))
+        self.assertContains(self.client.get(self.url), "renamed")
+
+    def test_clear_stale_sessions(self):
+        """Tests if only the expired sessions are deleted, in batches."""
+        expired = timezone.now() - timedelta(days=1)
+        Session.objects.bulk_create(
+            Session(session_key=f"expired{i}", session_data="", expire_date=expired)
+            for i in range(5)
+        )
+        stdout = StringIO()
+        call_command("clear_stale_sessions", batch_size=2, stdout=stdout)
+
+        self.assertIn("Deleted 5 expired sessions.", stdout.getvalue())
+        self.assertEqual(Session.objects.count(), 1)  # the one of the test client
@@ -0,0 +1,80 @@
+from django.test import SimpleTestCase, override_settings
+
+from polls.checks import (
+    check_debug,
+    check_templates,
+    check_static_storage,
+    check_shared_cache,
+)
+from polls.tests.test_caching import LOCMEM_CACHES
+
+PRODUCTION_TEMPLATES = [
+    {
+        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        "OPTIONS": {
+            "loaders": [
+                (
+                    "django.template.loaders.cached.Loader",
+                    ["django.template.loaders.app_directories.Loader"],
+                ),
+            ],
+        },
+    }
+]
+MANIFEST_STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {
+        "BACKEND": "django.contrib.staticfiles.storage.ManifestStaticFilesStorage"
+    },
+}
+
+REDIS_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": "redis://localhost:6379/0",
+    }
+}
+
+
+def ids(warnings) -> list[str]:
+    return [warning.id for warning in warnings]
+
+
+class PerformanceCheckTests(SimpleTestCase):
+    @override_settings(DEBUG=True, INSTALLED_APPS=["polls", "debug_toolbar"])
+    def test_debug_flagged(self):
+        """Tests if debugging and the debug toolbar are flagged."""
+        self.assertEqual(ids(check_debug(None)), ["polls.W001", "polls.W002"])
+
+    @override_settings(DEBUG=False)
+    def test_production_not_flagged(self):
+        with self.settings(TEMPLATES=PRODUCTION_TEMPLATES, STORAGES=MANIFEST_STORAGES):
+            self.assertEqual(check_debug(None), [])
+            self.assertEqual(check_templates(None), [])
+            self.assertEqual(check_static_storage(None), [])
+
+    def test_templates_flagged(self):
+        """Tests if uncached loaders and the debug context processor are flagged."""
+        templates = [
+            {
+                "BACKEND": "django.template.backends.django.DjangoTemplates",
+                "OPTIONS": {
+                    "loaders": ["django.template.loaders.app_directories.Loader"],
+                    "context_processors": ["django.template.context_processors.debug"],
+                },
+            }
+        ]
+        with self.settings(TEMPLATES=templates):
+            self.assertEqual(ids(check_templates(None)), ["polls.W003", "polls.W004"])
+
+    def test_static_storage_flagged(self):
+        self.assertEqual(ids(check_static_storage(None)), ["polls.W005"])
+
+    @override_settings(DEBUG=False, CACHES=LOCMEM_CACHES)
+    def test_per_process_cache_flagged(self):
+        """Tests if a cache that workers don't share is flagged outside of DEBUG."""
+        self.assertEqual(ids(check_shared_cache(None)), ["polls.E001"])
+        with self.settings(DEBUG=True):
+            self.assertEqual(check_shared_cache(None), [])
+        with self.settings(CACHES=REDIS_CACHES):
+            self.assertEqual(check_shared_cache(None), [])
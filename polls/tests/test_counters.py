@@ -0,0 +1,285 @@
+from unittest import mock
+
+from django.db import DatabaseError
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.contrib.auth.models import User
+
+from polls.models import Question, Choice, ChoiceShard, QuestionActivity, Vote
+from polls.views import VoteView
+from polls.counters import (
+    BaseVoteCounter,
+    DirectCounter,
+    ShardedCounter,
+    BufferedCounter,
+    LedgerCounter,
+    AlreadyVoted,
+    cast_vote,
+    compact_votes,
+    activity_buffer,
+    vote_buffer,
+    get_vote_counter,
+)
+
+
+class IncompleteCounter(BaseVoteCounter):
+    pass
+
+
+class DirectCounterTests(TestCase):
+    def test_increment(self):
+        """Tests if the votes are added to the `votes` field of the choice."""
+        question = Question.objects.create(question_text="question")
+        choice = question.choice_set.create(choice_text="choice")
+
+        DirectCounter().increment(choice)
+        DirectCounter().increment(choice, 2)
+
+        choice.refresh_from_db()
+        self.assertEqual(choice.votes, 3)
+        self.assertFalse(ChoiceShard.objects.exists())
+
+
+class BaseVoteCounterTests(SimpleTestCase):
+    @override_settings(POLLS_VOTE_COUNTER="polls.tests.test_counters.IncompleteCounter")
+    def test_increment_required(self):
+        """Tests if a counter without `increment()` fails as soon as it's created."""
+        with self.assertRaises(TypeError):
+            get_vote_counter()
+
+
+@override_settings(POLLS_VOTE_BUFFER_MAX_DELAY=60)
+class ShardedCounterTests(TestCase):
+    def setUp(self):
+        self.question = Question.objects.create(question_text="question")
+        self.choice = self.question.choice_set.create(choice_text="choice", votes=2)
+
+    def tearDown(self):
+        activity_buffer.flush()
+
+    def test_increment_spreads_votes_across_shards(self):
+        """Tests if the votes are stored on the shards instead of the choice row."""
+        counter = ShardedCounter(shard_count=4)
+        for _ in range(40):
+            counter.increment(self.choice)
+
+        self.choice.refresh_from_db()
+        self.assertEqual(self.choice.votes, 2)
+
+        shards = ChoiceShard.objects.filter(choice=self.choice)
+        self.assertLessEqual(shards.count(), 4)
+        self.assertGreater(shards.count(), 1)
+        self.assertEqual(sum(shard.count for shard in shards), 40)
+
+    @override_settings(POLLS_VOTE_BUFFER_MAX_VOTES=3)
+    def test_activity_buffered(self):
+        """Tests if a vote only updates its shard, leaving the activity of the
+        question, which every voter shares, to batched writes.
+        """
+        counter = ShardedCounter(shard_count=1)
+        counter.increment(self.choice)
+        with self.assertNumQueries(1):
+            counter.increment(self.choice)
+        self.assertFalse(QuestionActivity.objects.exists())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            counter.increment(self.choice)
+        self.assertEqual(QuestionActivity.objects.get().total_votes, 3)
+
+    @override_settings(POLLS_VOTE_BUFFER_MAX_VOTES=1)
+    def test_failed_activity_keeps_vote(self):
+        """Tests if a vote is kept when recording its activity fails."""
+        user = User.objects.create_user(username="voter")
+        with mock.patch("polls.counters.record_votes", side_effect=DatabaseError):
+            with self.assertLogs(level="ERROR"):
+                with self.captureOnCommitCallbacks(execute=True):
+                    cast_vote(user, self.choice, ShardedCounter())
+
+        self.assertTrue(Vote.objects.filter(user=user).exists())
+        self.assertEqual(ChoiceShard.objects.get(choice=self.choice).count, 1)
+
+    def test_total_votes(self):
+        """Tests if `total_votes` sums the `votes` field and the shards."""
+        counter = ShardedCounter(shard_count=2)
+        for _ in range(5):
+            counter.increment(self.choice)
+
+        other = self.question.choice_set.create(choice_text="other", votes=1)
+
+        choice = Choice.objects.get(pk=self.choice.pk)
+        self.assertEqual(choice.total_votes, 7)
+
+        annotated = list(self.question.choice_set.with_total_votes())
+        self.assertEqual(
+            [(c.pk, c.total_votes) for c in annotated],
+            [(self.choice.pk, 7), (other.pk, 1)],
+        )
+
+    @override_settings(POLLS_VOTE_COUNTER="polls.counters.ShardedCounter")
+    def test_vote_view_with_sharded_counter(self):
+        """Tests if `VoteView` uses the configured counter and the results page shows the sum."""
+        User.objects.create_user(username="testuser", password="testpass123")
+        self.client.login(username="testuser", password="testpass123")
+
+        response = self.client.post(
+            reverse("polls:vote", args=(self.question.id,)), {"choice": self.choice.id}
+        )
+        self.assertRedirects(
+            response, reverse("polls:results", args=(self.question.id,))
+        )
+        self.assertEqual(ChoiceShard.objects.filter(choice=self.choice).get().count, 1)
+
+        response = self.client.get(reverse("polls:results", args=(self.question.id,)))
+        self.assertContains(response, "choice -- 3 votes")
+
+
+@override_settings(POLLS_VOTE_BUFFER_MAX_VOTES=5, POLLS_VOTE_BUFFER_MAX_DELAY=60)
+class BufferedCounterTests(TestCase):
+    def setUp(self):
+        self.question = Question.objects.create(question_text="question")
+        self.choice1 = self.question.choice_set.create(choice_text="choice 1")
+        self.choice2 = self.question.choice_set.create(choice_text="choice 2", votes=1)
+
+    def tearDown(self):
+        vote_buffer.flush()
+
+    def test_votes_wait_for_flush(self):
+        """Tests if the votes are only written once the buffer is flushed, with the
+        counts of every choice in a single query.
+        """
+        counter = BufferedCounter()
+        counter.increment(self.choice1)
+        counter.increment(self.choice2)
+        counter.increment(self.choice2)
+
+        self.choice2.refresh_from_db()
+        self.assertEqual(self.choice2.votes, 1)
+        self.assertEqual(
+            counter.pending([self.choice1.pk, self.choice2.pk]),
+            {self.choice1.pk: 1, self.choice2.pk: 2},
+        )
+
+        # savepoint, counts, activity of the question (not there to be updated, so
+        # created on a savepoint, see polls/trending.py), buckets of the choices
+        # (not there either, so created and then updated), release
+        with self.assertNumQueries(10):
+            self.assertEqual(counter.flush(), 3)
+
+        self.choice1.refresh_from_db()
+        self.choice2.refresh_from_db()
+        self.assertEqual((self.choice1.votes, self.choice2.votes), (1, 3))
+        self.assertEqual(counter.pending([self.choice1.pk, self.choice2.pk]), {})
+
+    def test_flush_when_full(self):
+        """Tests if the buffer flushes by itself once `POLLS_VOTE_BUFFER_MAX_VOTES` is reached."""
+        counter = BufferedCounter()
+        with self.captureOnCommitCallbacks(execute=True):
+            for _ in range(5):
+                counter.increment(self.choice1)
+            # not until the votes are committed
+            self.choice1.refresh_from_db()
+            self.assertEqual(self.choice1.votes, 0)
+
+        self.choice1.refresh_from_db()
+        self.assertEqual(self.choice1.votes, 5)
+
+    def test_failed_flush_keeps_vote(self):
+        """Tests if a vote that fills the buffer is kept when the flush fails, and
+        its count waits on the buffer for the next flush.
+        """
+        user = User.objects.create_user(username="voter")
+        with self.settings(POLLS_VOTE_BUFFER_MAX_VOTES=1):
+            with mock.patch("polls.counters.add_votes", side_effect=DatabaseError):
+                with self.assertLogs(level="ERROR"):
+                    with self.captureOnCommitCallbacks(execute=True):
+                        cast_vote(user, self.choice1, BufferedCounter())
+
+        self.assertTrue(Vote.objects.filter(user=user).exists())
+        self.assertEqual(vote_buffer.get([self.choice1.pk]), {self.choice1.pk: 1})
+
+    def test_failed_flush_keeps_votes(self):
+        """Tests if the votes of a flush that fails are kept for the next one."""
+        counter = BufferedCounter()
+        counter.increment(self.choice1)
+        counter.increment(self.choice1)
+        with mock.patch.object(Choice.objects, "filter", side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                counter.flush()
+
+        self.assertEqual(counter.pending([self.choice1.pk]), {self.choice1.pk: 2})
+        self.assertEqual(counter.flush(), 2)
+
+    @override_settings(POLLS_VOTE_COUNTER="polls.counters.BufferedCounter")
+    def test_results_include_pending_votes(self):
+        """Tests if the results page shows the votes that haven't been flushed yet."""
+        BufferedCounter().increment(self.choice1)
+
+        response = self.client.get(reverse("polls:results", args=(self.question.id,)))
+        self.assertContains(response, "choice 1 -- 1 vote")
+        self.assertContains(response, "choice 2 -- 1 vote")
+
+
+class VoteLedgerTests(TestCase):
+    def setUp(self):
+        self.question = Question.objects.create(question_text="question")
+        self.choice1 = self.question.choice_set.create(choice_text="choice 1")
+        self.choice2 = self.question.choice_set.create(choice_text="choice 2", votes=1)
+        self.users = [User.objects.create_user(username=f"user{i}") for i in range(3)]
+
+    def test_cast_vote_records_and_counts(self):
+        """Tests if `cast_vote` records the vote on the ledger and counts it right away."""
+        cast_vote(self.users[0], self.choice1, DirectCounter())
+
+        vote = Vote.objects.get()
+        self.assertEqual(
+            (vote.user, vote.question, vote.choice, vote.counted),
+            (self.users[0], self.question, self.choice1, True),
+        )
+        self.choice1.refresh_from_db()
+        self.assertEqual(self.choice1.votes, 1)
+
+    def test_one_vote_per_question(self):
+        """Tests if a second vote on the same question is rejected and not counted."""
+        cast_vote(self.users[0], self.choice1, DirectCounter())
+        with self.assertRaises(AlreadyVoted):
+            cast_vote(self.users[0], self.choice2, DirectCounter())
+
+        self.choice2.refresh_from_db()
+        self.assertEqual(self.choice2.votes, 1)
+        self.assertEqual(Vote.objects.count(), 1)
+
+    def test_ledger_counter_and_compaction(self):
+        """Tests if `LedgerCounter` leaves the choices alone until the votes are compacted."""
+        counter = LedgerCounter()
+        cast_vote(self.users[0], self.choice1, counter)
+        cast_vote(self.users[1], self.choice1, counter)
+        cast_vote(self.users[2], self.choice2, counter)
+
+        self.choice1.refresh_from_db()
+        self.assertEqual(self.choice1.votes, 0)
+        self.assertEqual(
+            counter.pending([self.choice1.pk, self.choice2.pk]),
+            {self.choice1.pk: 2, self.choice2.pk: 1},
+        )
+
+        self.assertEqual(compact_votes(batch_size=2), 2)
+        self.assertEqual(compact_votes(), 1)
+        self.assertEqual(compact_votes(), 0)
+
+        self.choice1.refresh_from_db()
+        self.choice2.refresh_from_db()
+        self.assertEqual((self.choice1.votes, self.choice2.votes), (2, 2))
+        self.assertEqual(counter.pending([self.choice1.pk, self.choice2.pk]), {})
+
+    @override_settings(POLLS_VOTE_COUNTER="polls.counters.LedgerCounter")
+    def test_vote_view_with_ledger(self):
+        """Tests if the results include uncompacted votes and a second vote shows an error."""
+        self.client.force_login(self.users[0])
+        url = reverse("polls:vote", args=(self.question.id,))
+
+        self.client.post(url, {"choice": self.choice1.id})
+        response = self.client.get(reverse("polls:results", args=(self.question.id,)))
+        self.assertContains(response, "choice 1 -- 1 vote")
+
+        response = self.client.post(url, {"choice": self.choice2.id})
+        self.assertContains(response, VoteView.ErrorMessages.ALREADY_VOTED.value)
@@ -0,0 +1,113 @@
+import json
+import tempfile
+from datetime import datetime, timezone as dt_timezone
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import IntegrityError
+from django.test import TestCase
+
+from polls.models import Question, Choice
+from polls.creation import create_polls
+
+
+class CreatePollsTests(TestCase):
+    def test_create_polls(self):
+        """Tests if the polls are created with one insert for the questions and
+        one for the choices.
+        """
+        pub_date = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+        # savepoint, questions, choices, release
+        with self.assertNumQueries(4):
+            questions = create_polls(
+                [("First", None, ["A", "B"]), ("Second", pub_date, ["C", "D", "E"])]
+            )
+
+        self.assertEqual(questions[1].pub_date, pub_date)
+        self.assertQuerySetEqual(
+            Choice.objects.filter(question=questions[1]).order_by("pk"),
+            ["C", "D", "E"],
+            transform=lambda choice: choice.choice_text,
+        )
+
+    def test_create_polls_atomic(self):
+        """Tests if no question is left behind when the choices can't be created."""
+        with mock.patch.object(
+            Choice.objects, "bulk_create", side_effect=IntegrityError
+        ):
+            with self.assertRaises(IntegrityError):
+                create_polls([("Question", None, ["A", "B"])])
+        self.assertFalse(Question.objects.exists())
+
+
+class ImportPollsCommandTests(TestCase):
+    def import_file(self, suffix: str, content: str) -> tuple[str, str]:
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / f"polls{suffix}"
+            path.write_text(content)
+            stdout, stderr = StringIO(), StringIO()
+            call_command(
+                "import_polls", path, batch_size=2, stdout=stdout, stderr=stderr
+            )
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_import_jsonl(self):
+        lines = [
+            {"question": f"Question {i}", "choices": ["A", "B", ""]} for i in range(5)
+        ]
+        lines.append({"question": "", "choices": ["A", "B"]})
+        lines.append({"question": "Too few", "choices": ["A"]})
+        stdout, stderr = self.import_file(
+            ".jsonl", "\n".join(json.dumps(line) for line in lines)
+        )
+
+        self.assertIn("Imported 5 polls and 10 choices", stdout)
+        self.assertIn("skipped 2 invalid polls", stdout)
+        self.assertIn("line 7: there must be between 2 and 8 choices", stderr)
+        self.assertEqual(Question.objects.count(), 5)
+        self.assertEqual(Choice.objects.count(), 10)
+
+    def test_import_jsonl_malformed_lines(self):
+        """Tests if lines that aren't poll objects are skipped with their line
+        number, instead of stopping the import.
+        """
+        stdout, stderr = self.import_file(
+            ".jsonl",
+            "\n".join(
+                [
+                    '{"question": "First", "choices": ["A", "B"]}',
+                    '{"question": "Broken", ',
+                    "",
+                    '["not", "an", "object"]',
+                    '{"question": "Numbers", "choices": [1, 2]}',
+                    '{"question": "Last", "choices": ["A", "B"]}',
+                ]
+            ),
+        )
+
+        self.assertIn("Imported 2 polls", stdout)
+        self.assertIn("skipped 3 invalid polls", stdout)
+        self.assertIn("line 2: Expecting", stderr)
+        self.assertIn("line 4: not a JSON object", stderr)
+        self.assertIn("line 5: choices must be a list of strings", stderr)
+        self.assertEqual(
+            sorted(Question.objects.values_list("question_text", flat=True)),
+            ["First", "Last"],
+        )
+
+    def test_import_csv(self):
+        stdout, stderr = self.import_file(
+            ".csv",
+            "question,pub_date,choices\n"
+            "Dated,2024-01-01T12:00:00+00:00,A,B,C\n"
+            "Undated,,A,B\n",
+        )
+
+        self.assertIn("Imported 2 polls and 5 choices", stdout)
+        dated = Question.objects.get(question_text="Dated")
+        self.assertEqual(
+            dated.pub_date, datetime(2024, 1, 1, 12, tzinfo=dt_timezone.utc)
+        )
+        self.assertEqual(dated.choice_set.count(), 3)
@@ -0,0 +1,70 @@
+import json
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.contrib.auth.models import User
+
+from polls.models import Question
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.question = Question.objects.create(question_text="Test, Question")
+        self.choice1 = self.question.choice_set.create(choice_text="Choice 1", votes=2)
+        self.choice2 = self.question.choice_set.create(choice_text="Choice 2")
+        self.choice2.shards.create(shard=0, count=3)
+        self.url = reverse("polls:export")
+
+    def test_export_view_csv(self):
+        """Tests if the CSV export streams a header and one row per choice."""
+        self.client.force_login(User.objects.create_user("staff", is_staff=True))
+        response = self.client.get(self.url)
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        pub_date = self.question.pub_date.isoformat()
+        self.assertEqual(
+            lines,
+            [
+                "question_id,question_text,pub_date,choice_id,choice_text,votes",
+                f'{self.question.pk},"Test, Question",{pub_date},{self.choice1.pk},Choice 1,2',
+                f'{self.question.pk},"Test, Question",{pub_date},{self.choice2.pk},Choice 2,3',
+            ],
+        )
+
+    def test_export_view_staff_only(self):
+        """Tests if the export is only available to staff members and known formats."""
+        self.assertEqual(self.client.get(self.url).status_code, 302)
+
+        self.client.force_login(User.objects.create_user("staff", is_staff=True))
+        self.assertEqual(self.client.get(self.url, {"format": "xml"}).status_code, 400)
+
+    @override_settings(ROOT_URLCONF="polls.tests.async_urls")
+    async def test_async_export_view(self):
+        """Tests if the async view streams the export with an async iterator, so ASGI
+        servers send it as it's read, and is only available to staff members.
+        """
+        self.assertEqual((await self.async_client.get(self.url)).status_code, 302)
+
+        user = await User.objects.acreate(username="staff", is_staff=True)
+        await self.async_client.aforce_login(user)
+        response = await self.async_client.get(self.url, {"format": "ndjson"})
+
+        self.assertTrue(response.is_async)
+        content = b"".join([part async for part in response.streaming_content])
+        rows = [json.loads(line) for line in content.decode().splitlines()]
+        self.assertEqual([row["votes"] for row in rows], [2, 3])
+
+    def test_export_command_ndjson(self):
+        """Tests if the command writes one JSON object per choice, reading them in chunks."""
+        stdout = StringIO()
+        # a single query, whose rows are fetched a chunk at a time
+        with self.assertNumQueries(1):
+            call_command("export_results", format="ndjson", chunk_size=2, stdout=stdout)
+
+        rows = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        self.assertEqual([row["choice_text"] for row in rows], ["Choice 1", "Choice 2"])
+        self.assertEqual(rows[1]["votes"], 3)
@@ -0,0 +1,174 @@
+import datetime
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from polls.counters import (
+    BufferedCounter,
+    DirectCounter,
+    LedgerCounter,
+    ShardedCounter,
+    cast_vote,
+    compact_votes,
+)
+from polls.creation import create_polls
+from polls.histogram import POINTS, Resolution, get_histogram, roll_up_buckets
+from polls.models import Vote, VoteBucket
+from polls.tests.test_caching import LOCMEM_CACHES
+
+NOW = datetime.datetime(2026, 1, 10, 12, 30, 15, tzinfo=datetime.timezone.utc)
+
+
+def at(day: int, hour: int, minute: int = 0) -> datetime.datetime:
+    return NOW.replace(day=day, hour=hour, minute=minute, second=0)
+
+
+@override_settings(
+    POLLS_HISTOGRAM_MINUTE_RETENTION=2 * 60 * 60,
+    POLLS_HISTOGRAM_HOUR_RETENTION=2 * 24 * 60 * 60,
+)
+class HistogramTests(TestCase):
+    def setUp(self):
+        (self.question,) = create_polls([("Question", None, ["A", "B"])])
+        self.a, self.b = self.question.choice_set.order_by("pk")
+
+    def add_bucket(self, choice, resolution, start, count):
+        VoteBucket.objects.create(
+            choice=choice, resolution=resolution, start=start, count=count
+        )
+
+    def test_votes_recorded(self):
+        """Tests if each vote is counted on the minute bucket of its choice."""
+        for i, choice in enumerate([self.a, self.a, self.b]):
+            cast_vote(
+                User.objects.create(username=f"voter{i}"), choice, DirectCounter()
+            )
+
+        self.assertEqual(
+            sorted(VoteBucket.objects.values_list("choice", "resolution", "count")),
+            [(self.a.pk, Resolution.MINUTE, 2), (self.b.pk, Resolution.MINUTE, 1)],
+        )
+
+    @override_settings(POLLS_VOTE_BUFFER_MAX_DELAY=60)
+    def test_buffered_votes_recorded(self):
+        """Tests if the votes of counters that write them in batches are only added
+        to the buckets then, as a whole.
+        """
+        for i, counter in enumerate([BufferedCounter(), ShardedCounter()]):
+            cast_vote(User.objects.create(username=f"voter{i}"), self.a, counter)
+            self.assertEqual(sum(VoteBucket.objects.values_list("count", flat=True)), i)
+            counter.flush()
+            self.assertEqual(VoteBucket.objects.get().count, i + 1)
+
+    def test_ledger_votes_recorded(self):
+        """Tests if compacted votes are added to the buckets of the minutes they
+        were cast in.
+        """
+        for i, choice in enumerate([self.a, self.a, self.b]):
+            cast_vote(
+                User.objects.create(username=f"voter{i}"), choice, LedgerCounter()
+            )
+        self.assertFalse(VoteBucket.objects.exists())
+        Vote.objects.filter(user__username="voter0").update(voted_at=at(10, 11, 5))
+        Vote.objects.filter(user__username="voter1").update(voted_at=at(10, 12, 5))
+        Vote.objects.filter(user__username="voter2").update(voted_at=at(10, 12, 5))
+
+        compact_votes()
+        self.assertEqual(
+            sorted(VoteBucket.objects.values_list("choice", "start", "count")),
+            [
+                (self.a.pk, at(10, 11, 5), 1),
+                (self.a.pk, at(10, 12, 5), 1),
+                (self.b.pk, at(10, 12, 5), 1),
+            ],
+        )
+
+    def test_histogram(self):
+        """Tests if the histogram adds the finer buckets up into the requested
+        resolution and leaves out the ones before its first point.
+        """
+        self.add_bucket(self.a, Resolution.MINUTE, at(10, 11, 40), 2)
+        self.add_bucket(self.a, Resolution.MINUTE, at(10, 12, 25), 3)
+        self.add_bucket(self.b, Resolution.HOUR, at(10, 11), 4)
+        self.add_bucket(self.b, Resolution.HOUR, at(7, 12), 5)
+
+        histogram = get_histogram([self.a, self.b], Resolution.HOUR, NOW)
+        self.assertEqual(histogram["resolution"], "hour")
+        self.assertEqual(len(histogram["labels"]), POINTS[Resolution.HOUR])
+        self.assertEqual(histogram["labels"][-1], "2026-01-10T12:00:00+00:00")
+        a, b = histogram["series"]
+        self.assertEqual((a["id"], a["votes"][-2:]), (self.a.pk, [2, 3]))
+        self.assertEqual((b["id"], b["votes"][-3:]), (self.b.pk, [0, 4, 0]))
+        self.assertEqual(sum(b["votes"]), 4)
+
+    def test_roll_up(self):
+        """Tests if old buckets are rolled up, adding to the coarser buckets already
+        there, without changing the histograms.
+        """
+        self.add_bucket(self.a, Resolution.MINUTE, at(10, 12, 20), 1)
+        self.add_bucket(self.a, Resolution.MINUTE, at(10, 9, 20), 2)
+        self.add_bucket(self.a, Resolution.MINUTE, at(10, 9, 10), 3)
+        self.add_bucket(self.a, Resolution.HOUR, at(10, 9), 4)
+        self.add_bucket(self.b, Resolution.HOUR, at(7, 12), 5)
+        self.add_bucket(self.b, Resolution.HOUR, at(7, 11), 6)
+        before = {
+            resolution: get_histogram([self.a, self.b], resolution, NOW)
+            for resolution in [Resolution.HOUR, Resolution.DAY]
+        }
+
+        self.assertEqual(roll_up_buckets(NOW, batch_size=2), 4)
+        self.assertEqual(
+            sorted(
+                VoteBucket.objects.values_list("choice", "resolution", "start", "count")
+            ),
+            [
+                (self.a.pk, Resolution.MINUTE, at(10, 12, 20), 1),
+                (self.a.pk, Resolution.HOUR, at(10, 9), 9),
+                (self.b.pk, Resolution.DAY, at(7, 0), 11),
+            ],
+        )
+        for resolution, histogram in before.items():
+            self.assertEqual(
+                get_histogram([self.a, self.b], resolution, NOW), histogram
+            )
+
+        self.assertEqual(roll_up_buckets(NOW), 0)
+
+
+@override_settings(CACHES=LOCMEM_CACHES, POLLS_CACHE_SHARED=True)
+class HistogramViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        (self.question,) = create_polls([("Question", None, ["A", "B"])])
+        self.url = reverse("polls:api-histogram", args=(self.question.pk,))
+
+    def test_histogram(self):
+        """Tests if the histogram of the poll is returned, and supports ETags."""
+        choice = self.question.choice_set.order_by("pk").first()
+        cast_vote(User.objects.create(username="voter"), choice, DirectCounter())
+
+        response = self.client.get(self.url, {"resolution": "minute"})
+        data = response.json()
+        self.assertEqual(data["resolution"], "minute")
+        self.assertEqual(len(data["labels"]), POINTS[Resolution.MINUTE])
+        self.assertEqual(
+            [(series["choice_text"], series["votes"][-1]) for series in data["series"]],
+            [("A", 1), ("B", 0)],
+        )
+
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                self.url,
+                {"resolution": "minute"},
+                headers={"if-none-match": response["ETag"]},
+            )
+        self.assertEqual(response.status_code, 304)
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.json()["resolution"], "hour")
+
+    def test_unknown_resolution(self):
+        response = self.client.get(self.url, {"resolution": "week"})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,115 @@
+import asyncio
+import gc
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.contrib.auth.models import User
+
+from polls.models import Question
+from polls.counters import acast_vote
+from polls.live import ResultsHub, Topic, live_results
+
+
+@override_settings(
+    ROOT_URLCONF="polls.tests.async_urls",
+    POLLS_LIVE_RESULTS_INTERVAL=0.01,
+    POLLS_LIVE_RESULTS_KEEPALIVE=5,
+)
+class LiveResultsTests(TestCase):
+    def setUp(self):
+        self.question = Question.objects.create(question_text="Test Question")
+        self.choice1 = self.question.choice_set.create(choice_text="Choice 1", votes=2)
+        self.choice2 = self.question.choice_set.create(choice_text="Choice 2")
+        self.user = User.objects.create_user(username="testuser")
+
+    async def assertTopicsClosed(self):
+        # a dropped stream is only finalized once it's collected, which could wait
+        # on a reference cycle
+        gc.collect()
+        for _ in range(100):
+            if not live_results.topics:
+                break
+            await asyncio.sleep(0.01)
+        self.assertEqual(live_results.topics, {})
+
+    async def test_watchers_share_topic(self):
+        """Tests if every watcher of a question is fed by the same topic and gets
+        the new counts after a vote.
+        """
+        hub = ResultsHub()
+        first = hub.watch(self.question.pk)
+        second = hub.watch(self.question.pk)
+        totals = {self.choice1.pk: 2, self.choice2.pk: 0}
+        self.assertEqual(await anext(first), totals)
+        self.assertEqual(await anext(second), totals)
+        self.assertEqual(len(hub.topics), 1)
+
+        await acast_vote(self.user, self.choice2)
+        totals = {self.choice1.pk: 2, self.choice2.pk: 1}
+        self.assertEqual(await anext(first), totals)
+        self.assertEqual(await anext(second), totals)
+
+        await first.aclose()
+        self.assertEqual(len(hub.topics), 1)
+        await second.aclose()
+        self.assertEqual(hub.topics, {})
+
+    async def test_failed_topic_lets_watchers_go(self):
+        """Tests if the watchers of a question stop, instead of waiting forever,
+        when its counts can't be read.
+        """
+        hub = ResultsHub()
+        watcher = hub.watch(self.question.pk)
+        with mock.patch.object(Topic, "read_totals", side_effect=RuntimeError):
+            with self.assertLogs("polls.live", "ERROR"):
+                with self.assertRaises(StopAsyncIteration):
+                    await anext(watcher)
+        self.assertEqual(hub.topics, {})
+
+    async def test_stream(self):
+        """Tests if the stream starts with every count and then only sends the
+        counts that changed.
+        """
+        response = await self.async_client.get(
+            reverse("polls:results-stream", args=(self.question.pk,))
+        )
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        events = aiter(response.streaming_content)
+        self.assertEqual(
+            await anext(events),
+            b"event: votes\ndata: "
+            + f'{{"{self.choice1.pk}": 2, "{self.choice2.pk}": 0}}'.encode()
+            + b"\n\n",
+        )
+
+        await acast_vote(self.user, self.choice1)
+        self.assertEqual(
+            await anext(events),
+            f'event: votes\ndata: {{"{self.choice1.pk}": 3}}\n\n'.encode(),
+        )
+
+        # once the response is dropped, its stream gets closed by the event loop
+        await events.aclose()
+        del events, response
+        await self.assertTopicsClosed()
+
+    async def test_stream_without_choices(self):
+        """Tests if the stream of a poll without choices starts with an empty event."""
+        question = await Question.objects.acreate(question_text="No choices")
+        response = await self.async_client.get(
+            reverse("polls:results-stream", args=(question.pk,))
+        )
+        events = aiter(response.streaming_content)
+        self.assertEqual(await anext(events), b"event: votes\ndata: {}\n\n")
+
+        await events.aclose()
+        del events, response
+        await self.assertTopicsClosed()
+
+    async def test_stream_missing_question(self):
+        """Tests if missing questions are not streamed."""
+        response = await self.async_client.get(
+            reverse("polls:results-stream", args=(999,))
+        )
+        self.assertEqual(response.status_code, 404)
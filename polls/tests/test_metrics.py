@@ -0,0 +1,74 @@
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from polls.models import Question
+from polls.metrics import registry
+
+
+class InstrumentationTests(TestCase):
+    def setUp(self):
+        registry.clear()
+        self.question = Question.objects.create(question_text="Test Question")
+        self.question.choice_set.create(choice_text="Choice 1")
+        self.url = reverse("polls:results", args=(self.question.pk,))
+
+    def test_server_timing(self):
+        """Tests if responses tell how long the queries and templates took."""
+        response = self.client.get(self.url)
+        db, template, total = response["Server-Timing"].split(", ")
+        self.assertRegex(db, r'^db;dur=[\d.]+;desc="1 queries"$')
+        self.assertRegex(template, r"^tpl;dur=[\d.]+$")
+        self.assertRegex(total, r"^total;dur=[\d.]+$")
+
+    def test_metrics_endpoint(self):
+        """Tests if the requests are added to the histograms of their view."""
+        self.client.get(self.url)
+        self.client.get(self.url)
+
+        self.client.force_login(User.objects.create_user("staff", is_staff=True))
+        response = self.client.get(reverse("metrics"))
+        self.assertEqual(response["Content-Type"], "text/plain; version=0.0.4")
+        labels = 'method="GET",view="polls:results"'
+        self.assertContains(response, "# TYPE polls_request_duration_seconds histogram")
+        self.assertContains(
+            response, f"polls_request_duration_seconds_count{{{labels}}} 2\n"
+        )
+        self.assertContains(
+            response, f'polls_request_queries_bucket{{{labels},le="1"}} 2\n'
+        )
+        self.assertContains(response, f"polls_request_queries_sum{{{labels}}} 2\n")
+
+    def test_unknown_methods_grouped(self):
+        """Tests if the methods clients make up share a single label."""
+        for method in ["FOO", "BAR"]:
+            self.client.generic(method, self.url)
+
+        rendered = registry.render()
+        self.assertIn('polls_request_duration_seconds_count{method="other"', rendered)
+        self.assertNotIn("FOO", rendered)
+
+    @override_settings(POLLS_METRICS_TOKEN="scraper-token")
+    def test_metrics_access(self):
+        """Tests if the metrics are only served to staff members and to requests
+        with the token.
+        """
+        url = reverse("metrics")
+        self.assertEqual(self.client.get(url).status_code, 403)
+        response = self.client.get(url, headers={"authorization": "Bearer wrong"})
+        self.assertEqual(response.status_code, 403)
+
+        self.client.force_login(User.objects.create_user("user"))
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        self.client.logout()
+        response = self.client.get(
+            url, headers={"authorization": "Bearer scraper-token"}
+        )
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(ROOT_URLCONF="polls.tests.async_urls")
+    async def test_async_view_queries(self):
+        """Tests if the queries of async views, run on another thread, are counted."""
+        response = await self.async_client.get(self.url)
+        self.assertIn('desc="1 queries"', response["Server-Timing"])
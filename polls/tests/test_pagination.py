@@ -0,0 +1,111 @@
+from datetime import timedelta
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+from django.urls import reverse
+
+from polls.models import Question
+from polls.pagination import encode_cursor, decode_cursor, page_query
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        now = timezone.now()
+        # two questions share each pub_date, so the id has to break the ties
+        self.questions = [
+            Question.objects.create(
+                question_text=f"question {i}", pub_date=now - timedelta(days=i // 2 + 1)
+            )
+            for i in range(12)
+        ]
+        self.expected = sorted(
+            self.questions, key=lambda q: (q.pub_date, q.pk), reverse=True
+        )
+
+    def test_cursor_round_trip(self):
+        """Tests if a cursor decodes back to the pub_date and id of its question."""
+        question = self.questions[0]
+        self.assertEqual(
+            decode_cursor(encode_cursor(question)), (question.pub_date, question.pk)
+        )
+        with self.assertRaises(ValueError):
+            decode_cursor("not a cursor")
+
+    def test_walk_pages(self):
+        """Tests if following the cursors lists every question once, newest first."""
+        url = reverse("polls:index")
+        seen = []
+        response = self.client.get(url)
+        self.assertTrue(response.context["is_first_page"])
+        while True:
+            seen += response.context["question_list"]
+            cursor = response.context["next_cursor"]
+            if cursor is None:
+                break
+            self.assertContains(response, f"?after={cursor}")
+            response = self.client.get(url, {"after": cursor})
+            self.assertFalse(response.context["is_first_page"])
+
+        self.assertEqual(seen, self.expected)
+
+    def test_future_questions_excluded(self):
+        """Tests if later pages also hide questions set to be published in the future."""
+        Question.objects.create(
+            question_text="future", pub_date=timezone.now() + timedelta(days=1)
+        )
+        response = self.client.get(reverse("polls:index"))
+        self.assertNotContains(response, "future")
+
+    def test_invalid_cursor(self):
+        """Tests if a malformed cursor returns 404."""
+        response = self.client.get(reverse("polls:index"), {"after": "abc"})
+        self.assertEqual(response.status_code, 404)
+
+    def test_future_cursor(self):
+        """Tests if a cursor past the current time returns 404 instead of listing
+        the questions set to be published before it.
+        """
+        future = Question(pk=1, pub_date=timezone.now() + timedelta(days=1))
+        response = self.client.get(
+            reverse("polls:index"), {"after": encode_cursor(future)}
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_page_query_uses_index(self):
+        """Tests if the page query is answered by the (pub_date, id) index."""
+        cursor = encode_cursor(self.expected[4])
+        plan = page_query(Question.objects.all(), cursor, 5, timezone.now()).explain()
+        self.assertIn("question_pub_date_id_idx", plan)
+
+    @skipUnless(connection.vendor == "sqlite", "counts SQLite VM steps")
+    def test_deep_pages_bounded(self):
+        """Tests if a deep page takes as much work as one near the start, counted in
+        the steps of the SQLite VM.
+        """
+        now = timezone.now()
+        Question.objects.bulk_create(
+            Question(question_text="older", pub_date=now - timedelta(days=10 + i))
+            for i in range(1000)
+        )
+        questions = list(Question.objects.order_by("-pub_date", "-pk"))
+
+        def steps(question) -> int:
+            counted = [0]
+
+            def count():
+                counted[0] += 1
+
+            connection.ensure_connection()
+            connection.connection.set_progress_handler(count, 1)
+            try:
+                list(
+                    page_query(Question.objects.all(), encode_cursor(question), 5, now)
+                )
+            finally:
+                connection.connection.set_progress_handler(None, 1)
+            return counted[0]
+
+        shallow, deep = steps(questions[10]), steps(questions[990])
+        self.assertLess(deep, shallow * 2)
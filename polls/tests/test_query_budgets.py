@@ -0,0 +1,92 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth.models import User
+
+from polls.models import Question
+from polls.tests.query_budget import QueryBudgetMixin, QueryLog, query_budget
+
+
+class QueryBudgetTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        self.question = Question.objects.create(
+            question_text="Test Question", pub_date=timezone.now() - timedelta(days=1)
+        )
+        self.choice = self.question.choice_set.create(choice_text="Choice 1")
+        self.question.choice_set.create(choice_text="Choice 2")
+        self.user = User.objects.create_user(username="testuser")
+        self.client.force_login(self.user)
+
+    def add_choices(self):
+        for i in range(6):
+            self.question.choice_set.create(choice_text=f"Extra {i}")
+
+    def add_questions(self):
+        for i in range(6):
+            Question.objects.create(
+                question_text=f"Extra {i}", pub_date=timezone.now() - timedelta(days=2)
+            )
+
+    def get(self, name: str, *args):
+        return lambda: self.client.get(reverse(name, args=args))
+
+    def test_index(self):
+        with query_budget("polls:index"):
+            self.client.get(reverse("polls:index"))
+        self.assertQueriesConstant(self.get("polls:index"), self.add_questions)
+
+    def test_details(self):
+        with query_budget("polls:details"):
+            self.client.get(reverse("polls:details", args=(self.question.pk,)))
+        self.assertQueriesConstant(
+            self.get("polls:details", self.question.pk), self.add_choices
+        )
+
+    def test_results(self):
+        with query_budget("polls:results"):
+            self.client.get(reverse("polls:results", args=(self.question.pk,)))
+        self.assertQueriesConstant(
+            self.get("polls:results", self.question.pk), self.add_choices
+        )
+
+    def test_vote(self):
+        url = reverse("polls:vote", args=(self.question.pk,))
+        self.add_choices()
+        with query_budget("polls:vote"):
+            response = self.client.post(url, {"choice": self.choice.pk})
+        self.assertEqual(response.status_code, 302)
+
+    def test_create(self):
+        url = reverse("polls:create")
+        with query_budget("polls:create"):
+            self.client.post(url, {"question": "Small", "choices": ["A", "B"]})
+        with query_budget("polls:create"):
+            self.client.post(
+                url, {"question": "Large", "choices": [str(i) for i in range(8)]}
+            )
+
+    def test_over_budget_report(self):
+        """Tests if going over the budget fails with the SQL and where it came from."""
+        with self.assertRaises(AssertionError) as context:
+            with query_budget(1):
+                list(Question.objects.all())
+                self.question.choice_set.count()
+
+        message = str(context.exception)
+        self.assertIn("2 queries ran, over the budget of 1", message)
+        self.assertIn('FROM "polls_question"', message)
+        self.assertIn("polls/tests/test_query_budgets.py", message)
+
+    def test_growth_report(self):
+        """Tests if queries that grow with the data are caught."""
+        with self.assertRaises(AssertionError):
+            self.assertQueriesConstant(
+                lambda: [q.choice_set.count() for q in Question.objects.all()],
+                self.add_questions,
+            )
+
+        with QueryLog() as log:
+            Question.objects.count()
+        self.assertEqual(len(log), 1)
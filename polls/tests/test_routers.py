@@ -0,0 +1,53 @@
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from polls.models import Question
+from polls.routers import ReplicaRouter, ReplicaPinningMiddleware, use_primary
+
+router = ReplicaRouter()
+
+
+@override_settings(POLLS_DATABASE_REPLICAS=["replica"])
+class ReplicaRouterTests(SimpleTestCase):
+    def view(self, request, write: bool = False):
+        """Stands in for a view, returning where its reads went."""
+        if write:
+            router.db_for_write(Question)
+        return HttpResponse(router.db_for_read(Question))
+
+    def test_reads_go_to_replicas(self):
+        """Tests if reads go to the replicas and writes to the primary."""
+        self.assertEqual(router.db_for_read(Question), "replica")
+        self.assertEqual(router.db_for_write(Question), "default")
+        with use_primary():
+            self.assertEqual(router.db_for_read(Question), "default")
+
+        with override_settings(POLLS_DATABASE_REPLICAS=[]):
+            self.assertEqual(router.db_for_read(Question), "default")
+
+    def test_request_pinned_after_write(self):
+        """Tests if the reads after a write go to the primary, on that request and
+        on the next ones from the same client.
+        """
+        middleware = ReplicaPinningMiddleware(lambda request: self.view(request, True))
+        response = middleware(RequestFactory().post("/"))
+        self.assertEqual(response.content, b"default")
+        cookie = response.cookies[ReplicaPinningMiddleware.cookie_name]
+        self.assertEqual(cookie["max-age"], 5)
+
+        middleware = ReplicaPinningMiddleware(self.view)
+        self.assertEqual(middleware(RequestFactory().get("/")).content, b"replica")
+
+        request = RequestFactory().get("/")
+        request.COOKIES[ReplicaPinningMiddleware.cookie_name] = "1"
+        self.assertEqual(middleware(request).content, b"default")
+
+    async def test_async_request_pinned_after_write(self):
+        """Tests if the middleware tracks the writes of async views too."""
+
+        async def view(request):
+            return self.view(request, True)
+
+        response = await ReplicaPinningMiddleware(view)(RequestFactory().post("/"))
+        self.assertEqual(response.content, b"default")
+        self.assertIn(ReplicaPinningMiddleware.cookie_name, response.cookies)
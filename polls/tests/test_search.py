@@ -0,0 +1,148 @@
+import datetime
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from polls.creation import create_polls
+from polls.models import Question, Choice
+from polls.search import match_query, search_filter, search_questions
+
+
+def search(terms: str) -> list[str]:
+    questions, _ = search_questions(terms, 1, 100)
+    return [question.question_text for question in questions]
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        create_polls(
+            [
+                ("Favourite colour?", None, ["Red", "Blue"]),
+                ("Favourite café?", None, ["Colombo", "Other"]),
+                ("Best editor?", None, ["Vim", "Emacs"]),
+            ]
+        )
+
+    def test_match_query(self):
+        """Tests if the words are quoted, so FTS5 operators and syntax are ignored,
+        and the last one matches as a prefix.
+        """
+        self.assertEqual(
+            match_query('colour OR "blue" NOT'), '"colour" "OR" "blue" "NOT"*'
+        )
+        self.assertEqual(match_query(' "(*) '), "")
+
+    def test_ranked_matches(self):
+        """Tests if questions match by prefix and accents, and ones matching on the
+        question text rank above ones matching on their choices.
+        """
+        self.assertEqual(search("colo"), ["Favourite colour?", "Favourite café?"])
+        self.assertEqual(search("cafe"), ["Favourite café?"])
+        self.assertEqual(search("favourite vim"), [])
+
+    def test_index_kept_in_sync(self):
+        """Tests if edits and deletions of questions and choices are searchable
+        right away, and new votes don't touch the index.
+        """
+        question = Question.objects.get(question_text="Best editor?")
+        question.question_text = "Best text editor?"
+        question.save()
+        self.assertEqual(search("text"), ["Best text editor?"])
+
+        Choice.objects.filter(choice_text="Emacs").update(choice_text="Nano")
+        Choice.objects.filter(choice_text="Vim").delete()
+        Choice.objects.update(votes=3)
+        self.assertEqual(search("nano"), ["Best text editor?"])
+        self.assertEqual(search("vim"), [])
+
+        question.delete()
+        self.assertEqual(search("editor"), [])
+
+    def test_future_questions_excluded(self):
+        """Tests if questions set to be published in the future aren't found."""
+        future = timezone.now() + datetime.timedelta(days=1)
+        create_polls([("Future colour?", future, ["Green", "Gray"])])
+        self.assertNotIn("Future colour?", search("colour"))
+
+    def test_pages(self):
+        """Tests if results are split in pages."""
+        create_polls([(f"Paged {i}", None, ["A", "B"]) for i in range(5)])
+        questions, has_next = search_questions("paged", 2, 3)
+        self.assertEqual(len(questions), 2)
+        self.assertFalse(has_next)
+
+    @override_settings(POLLS_SEARCH_MAX_RANKED=2)
+    def test_max_ranked(self):
+        """Tests if only the newest published matches are ranked, and the older
+        ones follow them on every page, newest first.
+        """
+        future = timezone.now() + datetime.timedelta(days=1)
+        create_polls(
+            [
+                ("Colour of the sky?", None, ["Blue", "Gray"]),
+                ("Future colour?", future, ["Green", "Gray"]),
+            ]
+        )
+        # ranked by where they match, then the older match
+        self.assertEqual(
+            search("colo"),
+            ["Colour of the sky?", "Favourite café?", "Favourite colour?"],
+        )
+        questions, has_next = search_questions("colo", 2, 2)
+        self.assertEqual(
+            ([question.question_text for question in questions], has_next),
+            (["Favourite colour?"], False),
+        )
+
+
+class SearchViewTests(TestCase):
+    def test_search(self):
+        """Tests if the search page lists the matches with a link to the next page."""
+        create_polls([(f"Weather {i}?", None, ["Sun", "Rain"]) for i in range(11)])
+        response = self.client.get(reverse("polls:search"), {"q": "rain"})
+        self.assertEqual(len(response.context["question_list"]), 10)
+        self.assertContains(response, "?q=rain&amp;page=2")
+
+        response = self.client.get(reverse("polls:search"), {"q": "rain", "page": 2})
+        self.assertEqual(len(response.context["question_list"]), 1)
+        self.assertNotContains(response, "More results")
+
+    def test_invalid_page(self):
+        """Tests if invalid pages return 404."""
+        for page in ["0", "x"]:
+            response = self.client.get(
+                reverse("polls:search"), {"q": "a", "page": page}
+            )
+            self.assertEqual(response.status_code, 404)
+
+    def test_admin_search(self):
+        """Tests if the admin changelist searches the text of the choices too."""
+        create_polls(
+            [("Best editor?", None, ["Vim", "Emacs"]), ("Other?", None, ["A", "B"])]
+        )
+        self.client.force_login(
+            User.objects.create_superuser("admin", "admin@example.com", "password")
+        )
+        response = self.client.get(
+            reverse("admin:polls_question_changelist"), {"q": "emacs"}
+        )
+        self.assertEqual(
+            [question.question_text for question in response.context["cl"].result_list],
+            ["Best editor?"],
+        )
+
+    def test_admin_search_without_words(self):
+        """Tests if searches of punctuation alone match nothing instead of failing."""
+        create_polls([("Best editor?", None, ["Vim", "Emacs"])])
+        self.assertFalse(Question.objects.filter(search_filter("?!")).exists())
+
+        self.client.force_login(
+            User.objects.create_superuser("admin", "admin@example.com", "password")
+        )
+        response = self.client.get(
+            reverse("admin:polls_question_changelist"), {"q": "?"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context["cl"].result_list), [])
@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.db import connection
+from django.test import TestCase
+
+
+class SQLitePragmaTests(TestCase):
+    def pragma(self, name: str):
+        with connection.cursor() as cursor:
+            cursor.execute(f"PRAGMA {name}")
+            return cursor.fetchone()[0]
+
+    def test_connection_tuned(self):
+        """Tests if new connections run the pragmas from the settings."""
+        self.assertEqual(self.pragma("synchronous"), 1)  # NORMAL
+        for name in ["busy_timeout", "cache_size"]:
+            self.assertEqual(self.pragma(name), settings.POLLS_SQLITE_PRAGMAS[name])
@@ -0,0 +1,87 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.contrib.auth.models import User
+
+from polls.metrics import registry
+from polls.tests.test_caching import LOCMEM_CACHES
+from polls.throttle import allow_login_attempt, client_ip
+from polls.views import LoginView
+
+
+@override_settings(
+    CACHES=LOCMEM_CACHES,
+    POLLS_LOGIN_MAX_ATTEMPTS_PER_IP=5,
+    POLLS_LOGIN_MAX_ATTEMPTS_PER_USERNAME=3,
+    POLLS_LOGIN_THROTTLE_WINDOW=60,
+)
+class LoginThrottleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        registry.clear()
+        self.url = reverse("polls:login")
+
+    def test_limit_per_username(self):
+        """Tests if a username gets blocked after its limit, whatever the IP."""
+        for i in range(3):
+            self.assertTrue(allow_login_attempt(f"10.0.0.{i}", "target"))
+        self.assertFalse(allow_login_attempt("10.0.0.9", "Target"))
+        self.assertTrue(allow_login_attempt("10.0.0.9", "someone else"))
+
+    def test_limit_per_ip(self):
+        """Tests if an IP gets blocked after its limit, whatever the username."""
+        for i in range(5):
+            self.assertTrue(allow_login_attempt("10.0.0.1", f"user{i}"))
+        self.assertFalse(allow_login_attempt("10.0.0.1", "user9"))
+        self.assertTrue(allow_login_attempt("10.0.0.2", "user9"))
+
+    @override_settings(POLLS_TRUSTED_PROXIES=["10.0.0.1", "10.0.0.2"])
+    def test_client_ip(self):
+        """Tests if the client IP is taken from `X-Forwarded-For` only behind the
+        trusted proxies, skipping them and what the client sent itself.
+        """
+        factory = RequestFactory()
+
+        def ip(remote_addr: str, forwarded: str | None = None) -> str:
+            headers = {"x-forwarded-for": forwarded} if forwarded else {}
+            return client_ip(factory.get("/", REMOTE_ADDR=remote_addr, headers=headers))
+
+        self.assertEqual(ip("192.0.2.1", "198.51.100.1"), "192.0.2.1")
+        self.assertEqual(ip("10.0.0.1"), "10.0.0.1")
+        self.assertEqual(ip("10.0.0.1", "198.51.100.1"), "198.51.100.1")
+        self.assertEqual(
+            ip("10.0.0.1", "203.0.113.9, 198.51.100.1, 10.0.0.2"), "198.51.100.1"
+        )
+
+    def test_sliding_window(self):
+        """Tests if the attempts of the previous window count while it overlaps."""
+        with mock.patch("polls.throttle.time.time", return_value=600.0):
+            for _ in range(3):
+                allow_login_attempt("10.0.0.1", "target")
+        # halfway through the next window, half of them still count
+        with mock.patch("polls.throttle.time.time", return_value=690.0):
+            self.assertTrue(allow_login_attempt("10.0.0.1", "target"))
+            self.assertFalse(allow_login_attempt("10.0.0.1", "target"))
+        # they don't after that
+        with mock.patch("polls.throttle.time.time", return_value=780.0):
+            self.assertTrue(allow_login_attempt("10.0.0.1", "target"))
+
+    def test_rejected_before_hashing(self):
+        """Tests if throttled logins get a 429 without checking the password."""
+        User.objects.create_user(username="target", password="testpass123")
+        for _ in range(3):
+            self.client.post(self.url, {"username": "target", "password": "wrong"})
+
+        # not even the user is looked up, so there is nothing to hash against
+        with self.assertNumQueries(0):
+            response = self.client.post(
+                self.url, {"username": "target", "password": "testpass123"}
+            )
+        self.assertContains(
+            response, LoginView.ErrorMessages.TOO_MANY_ATTEMPTS.value, status_code=429
+        )
+        self.assertIn(
+            'polls_login_throttled_total{scope="username"} 1', registry.render()
+        )
@@ -0,0 +1,160 @@
+import datetime
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models import F
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from polls.counters import (
+    DirectCounter,
+    ShardedCounter,
+    BufferedCounter,
+    LedgerCounter,
+    cast_vote,
+    compact_votes,
+)
+from polls.creation import create_polls
+from polls.models import Choice, QuestionActivity
+from polls.tests.test_caching import LOCMEM_CACHES
+from polls.trending import (
+    add_to_score,
+    current_score,
+    get_leaderboard,
+    rebuild_activity,
+    record_votes,
+)
+
+HOUR = 60 * 60
+
+
+@override_settings(POLLS_TRENDING_HALF_LIFE=HOUR)
+class ScoreTests(TestCase):
+    def test_decay(self):
+        """Tests if votes weigh half as much after each half-life."""
+        score = add_to_score(None, 4, 0)
+        self.assertAlmostEqual(current_score(score, 0), 4)
+        self.assertAlmostEqual(current_score(score, 2 * HOUR), 1)
+
+    def test_newer_votes_weigh_more(self):
+        """Tests if scores add up, and a vote counted a half-life later ranks
+        like two earlier ones.
+        """
+        score = add_to_score(add_to_score(None, 1, 0), 1, HOUR)
+        self.assertAlmostEqual(current_score(score, HOUR), 1.5)
+        self.assertAlmostEqual(score, add_to_score(None, 3, 0))
+
+    def test_far_from_epoch(self):
+        """Tests if scores of votes counted long after the epoch still add up."""
+        now = 2_000_000_000
+        score = add_to_score(add_to_score(None, 1, now), 2, now)
+        self.assertAlmostEqual(current_score(score, now), 3)
+
+
+@override_settings(CACHES=LOCMEM_CACHES, POLLS_TRENDING_SIZE=2)
+class LeaderboardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.questions = create_polls(
+            [(f"Question {i}", None, ["A", "B"]) for i in range(3)]
+        )
+        self.ids = [question.pk for question in self.questions]
+
+    def test_top_questions(self):
+        """Tests if the leaderboard has the questions with the highest scores, and
+        later votes outweigh earlier ones.
+        """
+        with mock.patch("time.time", return_value=0):
+            record_votes({self.ids[0]: 5, self.ids[1]: 1})
+        with mock.patch("time.time", return_value=24 * 60 * 60):
+            record_votes({self.ids[2]: 1, self.ids[1]: 1})
+
+        self.assertEqual(
+            [(question_id, votes) for question_id, _, votes in get_leaderboard()],
+            [(self.ids[1], 2), (self.ids[2], 1)],
+        )
+
+    def test_update_in_sql(self):
+        """Tests if the scores updated by the database match `add_to_score()`."""
+        with mock.patch("time.time", return_value=1_000_000):
+            record_votes({self.ids[0]: 2})
+        with mock.patch("time.time", return_value=1_003_600):
+            record_votes({self.ids[0]: 3})
+
+        activity = QuestionActivity.objects.get(pk=self.ids[0])
+        self.assertEqual(activity.total_votes, 5)
+        expected = add_to_score(add_to_score(None, 2, 1_000_000), 3, 1_003_600)
+        self.assertAlmostEqual(activity.score, expected)
+
+    def test_cached_leaderboard_merged(self):
+        """Tests if new votes are merged into the cached leaderboard, which is read
+        without queries.
+        """
+        record_votes({self.ids[0]: 1})
+        get_leaderboard()
+        with self.captureOnCommitCallbacks(execute=True):
+            record_votes({self.ids[1]: 3, self.ids[2]: 2})
+
+        with self.assertNumQueries(0):
+            leaderboard = get_leaderboard()
+        self.assertEqual([entry[0] for entry in leaderboard], self.ids[1:])
+
+    def test_counters_record_votes(self):
+        """Tests if the votes are recorded when each counter counts them."""
+        choice = self.questions[0].choice_set.first()
+        DirectCounter().increment(choice)
+        sharded = ShardedCounter()
+        sharded.increment(choice)
+        # the activity of sharded votes waits on the buffer like buffered votes do
+        self.assertEqual(QuestionActivity.objects.get(pk=self.ids[0]).total_votes, 1)
+        sharded.flush()
+
+        counter = BufferedCounter()
+        counter.increment(choice)
+        self.assertEqual(QuestionActivity.objects.get(pk=self.ids[0]).total_votes, 2)
+        counter.flush()
+
+        cast_vote(User.objects.create(username="voter"), choice, LedgerCounter())
+        self.assertEqual(QuestionActivity.objects.get(pk=self.ids[0]).total_votes, 3)
+        compact_votes()
+        self.assertEqual(QuestionActivity.objects.get(pk=self.ids[0]).total_votes, 4)
+
+    def test_rebuild(self):
+        """Tests if the activity is rebuilt from the counts and the ledger."""
+        choice = self.questions[1].choice_set.first()
+        cast_vote(User.objects.create(username="voter"), choice, DirectCounter())
+        # a vote without a ledger entry
+        Choice.objects.filter(pk=choice.pk).update(votes=F("votes") + 1)
+        QuestionActivity.objects.all().delete()
+
+        self.assertEqual(rebuild_activity(), 1)
+        activity = QuestionActivity.objects.get()
+        self.assertEqual((activity.pk, activity.total_votes), (self.ids[1], 2))
+        # the vote missing from the ledger counts as cast when the question was
+        # published, which was just now too
+        self.assertAlmostEqual(current_score(activity.score), 2, places=3)
+
+
+class TrendingViewTests(TestCase):
+    def test_trending(self):
+        """Tests if the trending page lists the published questions with the most
+        recent votes.
+        """
+        future = timezone.now() + datetime.timedelta(days=1)
+        questions = create_polls(
+            [
+                ("Popular", None, ["A", "B"]),
+                ("Quiet", None, ["A", "B"]),
+                ("Future", future, ["A", "B"]),
+            ]
+        )
+        record_votes({questions[0].pk: 3, questions[2].pk: 5})
+
+        response = self.client.get(reverse("polls:trending"))
+        self.assertEqual(
+            [question.question_text for question in response.context["question_list"]],
+            ["Popular"],
+        )
+        self.assertContains(response, "3 votes")
@@ -0,0 +1,26 @@
+from django.contrib.auth import password_validation
+from django.core.exceptions import ValidationError
+from django.test import SimpleTestCase
+
+from polls.validators import CommonPasswordValidator
+
+
+class CommonPasswordValidatorTests(SimpleTestCase):
+    def test_rejects_common_passwords(self):
+        """Tests if passwords on the list are rejected, whatever their case."""
+        validator = CommonPasswordValidator()
+        with self.assertRaises(ValidationError):
+            validator.validate("Password123")
+        validator.validate("x9!kQz#mw2Lp")
+
+    def test_list_shared(self):
+        """Tests if every validator uses the same frozen copy of the list, which is
+        loaded by the time the app is ready.
+        """
+        (preloaded,) = [
+            validator
+            for validator in password_validation.get_default_password_validators()
+            if isinstance(validator, CommonPasswordValidator)
+        ]
+        self.assertIsInstance(preloaded.passwords, frozenset)
+        self.assertIs(CommonPasswordValidator().passwords, preloaded.passwords)
@@ -0,0 +1,92 @@
+"""
+Limits on login attempts, checked before the password is hashed, so a burst of
+guesses can't use up the CPU of the workers.
+
+Attempts are counted per client IP and per username on the cache, over a sliding
+window of `settings.POLLS_LOGIN_THROTTLE_WINDOW` seconds. The window is approximated
+with the counts of the current and of the previous fixed window, weighting the
+previous one by how much of it still overlaps.
+
+The limits only hold across workers if the cache is shared by all of them (the
+`polls.E001` deploy check fails when it isn't): with a cache in each process, every
+worker allows the full limits. On Redis, which production requires, the counts are
+incremented atomically.
+"""
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .metrics import registry
+
+registry.describe(
+    "polls_login_throttled_total",
+    "Login attempts rejected for going over the limit of an IP or username.",
+)
+
+
+def attempts_key(scope: str, identifier: str, window: int) -> str:
+    # hashed, as usernames may have characters that cache keys can't
+    digest = hashlib.sha256(identifier.encode()).hexdigest()[:32]
+    return f"polls:login-attempts:{scope}:{digest}:{window}"
+
+
+def count_attempt(scope: str, identifier: str) -> float:
+    """Counts an attempt and returns the attempts on the sliding window, this
+    one included.
+    """
+    length = settings.POLLS_LOGIN_THROTTLE_WINDOW
+    now = time.time()
+    window = int(now // length)
+
+    key = attempts_key(scope, identifier, window)
+    try:
+        current = cache.incr(key)
+    except ValueError:  # first attempt on this window
+        # kept until the next window stops needing it
+        if cache.add(key, 1, length * 2):
+            current = 1
+        else:
+            current = cache.incr(key)
+    previous = cache.get(attempts_key(scope, identifier, window - 1), 0)
+
+    overlap = 1 - (now % length) / length
+    return current + previous * overlap
+
+
+def client_ip(request) -> str:
+    """Returns the IP of the client of `request`: the address it came from, unless
+    that's one of `settings.POLLS_TRUSTED_PROXIES`. Those add the address they got
+    the request from to `X-Forwarded-For`, so it's the last address there that isn't
+    a trusted proxy (the ones before it are up to the client).
+    """
+    ip = request.META.get("REMOTE_ADDR", "")
+    trusted = settings.POLLS_TRUSTED_PROXIES
+    if ip not in trusted:
+        return ip
+    forwarded = request.headers.get("X-Forwarded-For", "").split(",")
+    for address in reversed([address.strip() for address in forwarded]):
+        if not address:
+            break
+        ip = address
+        if address not in trusted:
+            break
+    return ip
+
+
+def allow_login_attempt(ip: str, username: str) -> bool:
+    """Counts a login attempt and returns whether it is within the limits of its
+    IP and username.
+    """
+    limits = [
+        ("ip", ip, settings.POLLS_LOGIN_MAX_ATTEMPTS_PER_IP),
+        ("username", username.lower(), settings.POLLS_LOGIN_MAX_ATTEMPTS_PER_USERNAME),
+    ]
+    allowed = True
+    for scope, identifier, limit in limits:
+        if count_attempt(scope, identifier) > limit:
+            registry.inc("polls_login_throttled_total", scope=scope)
+            allowed = False
+    return allowed
@@ -0,0 +1,195 @@
+"""
+Leaderboard of the trending polls, the ones with the most votes lately.
+
+Each counted vote adds to the `QuestionActivity` of its question, which holds the
+total votes and a score where votes lose half their weight every
+`settings.POLLS_TRENDING_HALF_LIFE` seconds. Rather than decaying every score as
+time passes, each vote is weighted by how long after the Unix epoch it came, which
+keeps the scores comparable at any time: a question only moves on the leaderboard
+when it gets votes. The weights grow exponentially, so the scores are stored as
+their base 2 logarithm.
+
+The top `settings.POLLS_TRENDING_SIZE` questions are kept on the cache, sorted, and
+merged with the questions whose scores change, so the leaderboard is read in one
+cache lookup however many questions there are. It's read again from the `score`
+index when it expires or gets evicted, which also undoes any merge lost to a race
+between workers.
+"""
+
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, FloatField, IntegerField, Sum, Value, When
+from django.db.models.functions import Greatest, Least, Log, Power
+
+from .models import Question, Choice, ChoiceShard, QuestionActivity, Vote
+from .routers import use_primary
+
+LEADERBOARD_KEY = "polls:trending"
+
+# (question id, score, total votes) of each question on the leaderboard
+Entry = tuple[int, float, int]
+
+
+def add_to_score(score: float | None, votes: int, at: float) -> float:
+    """Returns `score` with `votes` more, counted at the timestamp `at`."""
+    added = math.log2(votes) + at / settings.POLLS_TRENDING_HALF_LIFE
+    if score is None:
+        return added
+    high, low = max(score, added), min(score, added)
+    return high + math.log2(1 + 2 ** (low - high))
+
+
+def current_score(score: float, now: float | None = None) -> float:
+    """Returns the decayed number of votes a score stands for at `now`."""
+    now = time.time() if now is None else now
+    return 2 ** (score - now / settings.POLLS_TRENDING_HALF_LIFE)
+
+
+def add_to_score_sql(score, added):
+    """SQL version of `add_to_score()`, which adds the score `added` to `score`."""
+    high, low = Greatest(score, added), Least(score, added)
+    return high + Log(2.0, 1.0 + Power(2.0, low - high))
+
+
+def per_question(values: dict, output_field):
+    if len(values) == 1:
+        return Value(*values.values(), output_field=output_field)
+    return Case(
+        *[
+            When(pk=question_id, then=Value(value))
+            for question_id, value in values.items()
+        ],
+        output_field=output_field,
+    )
+
+
+def record_votes(amounts: dict[int, int]):
+    """Adds `amounts` (question id -> votes) to the activity of the questions, with
+    a single `UPDATE` unless it's the first vote of a question, and to the
+    leaderboard once the current transaction (if any) commits.
+    """
+    amounts = {question_id: votes for question_id, votes in amounts.items() if votes}
+    if not amounts:
+        return
+
+    now = time.time()
+    added = {
+        question_id: add_to_score(None, votes, now)
+        for question_id, votes in amounts.items()
+    }
+    activities = QuestionActivity.objects.filter(pk__in=amounts)
+    updated = activities.update(
+        total_votes=F("total_votes") + per_question(amounts, IntegerField()),
+        score=add_to_score_sql(F("score"), per_question(added, FloatField())),
+    )
+    if updated < len(amounts):
+        missing = amounts.keys()
+        if updated:
+            missing -= set(activities.values_list("pk", flat=True))
+        for question_id in missing:
+            # first vote of the question
+            try:
+                with transaction.atomic():
+                    QuestionActivity.objects.create(
+                        question_id=question_id,
+                        total_votes=amounts[question_id],
+                        score=added[question_id],
+                    )
+            except IntegrityError:
+                # another voter created it first
+                record_votes({question_id: amounts[question_id]})
+
+    transaction.on_commit(lambda: update_leaderboard(list(amounts)))
+
+
+def top(entries, size: int) -> list[Entry]:
+    return sorted(entries, key=lambda entry: entry[1], reverse=True)[:size]
+
+
+def update_leaderboard(question_ids: list[int]):
+    """Merges the new scores of the given questions into the cached leaderboard.
+    They're read after the votes are committed, so the reads don't make other
+    voters wait.
+    """
+    leaderboard = cache.get(LEADERBOARD_KEY)
+    if leaderboard is None:
+        return  # read from the database when it's needed
+
+    merged = {entry[0]: entry for entry in leaderboard}
+    with use_primary():
+        merged.update(
+            (entry[0], entry)
+            for entry in QuestionActivity.objects.filter(
+                pk__in=question_ids
+            ).values_list("question_id", "score", "total_votes")
+        )
+    cache.set(
+        LEADERBOARD_KEY,
+        top(merged.values(), settings.POLLS_TRENDING_SIZE),
+        settings.POLLS_TRENDING_CACHE_TIMEOUT,
+    )
+
+
+def get_leaderboard() -> list[Entry]:
+    """Returns the `settings.POLLS_TRENDING_SIZE` questions with the highest scores,
+    highest first.
+    """
+    leaderboard = cache.get(LEADERBOARD_KEY)
+    if leaderboard is None:
+        with use_primary():
+            leaderboard = list(
+                QuestionActivity.objects.order_by("-score").values_list(
+                    "question_id", "score", "total_votes"
+                )[: settings.POLLS_TRENDING_SIZE]
+            )
+        cache.set(LEADERBOARD_KEY, leaderboard, settings.POLLS_TRENDING_CACHE_TIMEOUT)
+    return leaderboard
+
+
+def rebuild_activity(batch_size: int = 1000) -> int:
+    """Recomputes the activity of every question from the counts of its choices and
+    from the counted votes on the ledger, each one weighted by when it was cast.
+    Returns how many questions have votes.
+    """
+    totals = {}
+    choice_votes = Choice.objects.values_list("question").annotate(Sum("votes"))
+    shard_votes = ChoiceShard.objects.values_list("choice__question").annotate(
+        Sum("count")
+    )
+    for question_id, votes in [*choice_votes.order_by(), *shard_votes.order_by()]:
+        totals[question_id] = totals.get(question_id, 0) + votes
+
+    scores = {}
+    ledger_votes = {}
+    ledger = Vote.objects.filter(counted=True).values_list("question", "voted_at")
+    for question_id, voted_at in ledger.order_by().iterator(chunk_size=batch_size):
+        scores[question_id] = add_to_score(
+            scores.get(question_id), 1, voted_at.timestamp()
+        )
+        ledger_votes[question_id] = ledger_votes.get(question_id, 0) + 1
+
+    # votes missing from the ledger count as cast when their question was published
+    published = dict(
+        Question.objects.values_list("pk", "pub_date").iterator(chunk_size=batch_size)
+    )
+    activities = []
+    for question_id, total in totals.items():
+        score = scores.get(question_id)
+        if (unlogged := total - ledger_votes.get(question_id, 0)) > 0:
+            score = add_to_score(score, unlogged, published[question_id].timestamp())
+        if score is not None:
+            activities.append(
+                QuestionActivity(
+                    question_id=question_id, total_votes=total, score=score
+                )
+            )
+
+    with transaction.atomic():
+        QuestionActivity.objects.all().delete()
+        QuestionActivity.objects.bulk_create(activities, batch_size=batch_size)
+        transaction.on_commit(lambda: cache.delete(LEADERBOARD_KEY))
+    return len(activities)
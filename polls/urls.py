@@ -1,15 +1,49 @@
+from django.conf import settings
 from django.urls import path
 
-from . import views
+from . import views, async_views, api
+
+# views that have an async version (see polls/async_views.py)
+hot_views = async_views if settings.POLLS_ASYNC_VIEWS else views
 
 app_name = "polls"
 urlpatterns = [
-    path("", views.IndexView.as_view(), name="index"),
+    path("", hot_views.IndexView.as_view(), name="index"),
+    path("trending/", views.TrendingView.as_view(), name="trending"),
+    path("search/", views.SearchView.as_view(), name="search"),
     path("create/", views.CreateQuestionView.as_view(), name="create"),
-    path("<int:pk>/", views.DetailView.as_view(), name="details"),
-    path("<int:pk>/results/", views.ResultsView.as_view(), name="results"),
-    path("<int:question_id>/vote/", views.VoteView.as_view(), name="vote"),
+    path("<int:pk>/", hot_views.DetailView.as_view(), name="details"),
+    path("<int:pk>/results/", hot_views.ResultsView.as_view(), name="results"),
+    path("<int:question_id>/vote/", hot_views.VoteView.as_view(), name="vote"),
     path("login/", views.LoginView.as_view(), name="login"),
     path("register/", views.RegisterView.as_view(), name="register"),
     path("logout/", views.LogoutView.as_view(), name="logout"),
+    path("cache-stats/", views.CacheStatsView.as_view(), name="cache-stats"),
+    path("export/", hot_views.ExportView.as_view(), name="export"),
+    path("api/questions/", api.QuestionListView.as_view(), name="api-questions"),
+    path(
+        "api/questions/<int:pk>/",
+        api.QuestionDetailView.as_view(),
+        name="api-question",
+    ),
+    path(
+        "api/questions/<int:pk>/results/",
+        api.ResultsView.as_view(),
+        name="api-results",
+    ),
+    path(
+        "api/questions/<int:pk>/results/histogram/",
+        api.HistogramView.as_view(),
+        name="api-histogram",
+    ),
 ]
+
+# the live results never end, so they are only streamed by the ASGI app
+if settings.POLLS_ASYNC_VIEWS:
+    urlpatterns.append(
+        path(
+            "<int:pk>/results/stream/",
+            async_views.ResultsStreamView.as_view(),
+            name="results-stream",
+        )
+    )
@@ -0,0 +1,41 @@
+"""
+Password validators that keep their data loaded once per process.
+
+Django's `CommonPasswordValidator` decompresses and reads its list of 20000 common
+passwords when it's first used, which is on the first registration handled by each
+worker. `preload_password_validators()` does it when the app starts instead (see
+`PollsConfig.ready()`), so a server that loads the app before forking its workers
+shares a single copy of the list between them.
+"""
+
+import functools
+import gzip
+from pathlib import Path
+
+from django.contrib.auth import password_validation
+
+
+@functools.cache
+def load_password_list(path: Path) -> frozenset[str]:
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as file:
+            return frozenset(line.strip() for line in file)
+    except OSError:  # not compressed
+        with open(path, encoding="utf-8") as file:
+            return frozenset(line.strip() for line in file)
+
+
+class CommonPasswordValidator(password_validation.CommonPasswordValidator):
+    """Same as Django's, but every instance shares the same frozen copy of the list."""
+
+    def __init__(self, password_list_path=None):
+        self.passwords = load_password_list(
+            Path(password_list_path or self.DEFAULT_PASSWORD_LIST_PATH)
+        )
+
+
+def preload_password_validators():
+    """Creates the validators of `settings.AUTH_PASSWORD_VALIDATORS`, which Django
+    then reuses, loading their data.
+    """
+    password_validation.get_default_password_validators()
@@ -1,74 +1,267 @@
+import hmac
 from enum import Enum
 from urllib.parse import urlencode
 from ast import literal_eval
 
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
 from django.utils import timezone
-from django.http import HttpResponse, HttpResponseRedirect, HttpResponseBadRequest
+from django.http import (
+    HttpResponse,
+    HttpResponseRedirect,
+    HttpResponseBadRequest,
+    JsonResponse,
+    Http404,
+    StreamingHttpResponse,
+)
 from django.urls import reverse
 from django.views import generic, View
 from django.template import loader
-from django.db.models import F
-from django.shortcuts import render, get_object_or_404
+from django.shortcuts import render
 from django.core.handlers.wsgi import WSGIRequest
+from django.utils.decorators import method_decorator
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.models import User
 from django.contrib.auth import login, logout
 from django.contrib.auth.forms import UserCreationForm
 
 from .models import Question, Choice
 from .forms import LoginForm
+from .counters import AlreadyVoted, cast_vote, with_pending_votes
+from .caching import (
+    get_poll_snapshot,
+    get_cached_index_page,
+    cache_index_page,
+    get_cache_stats,
+)
+from .pagination import get_page
+from .search import search_questions
+from .trending import current_score, get_leaderboard
+from .creation import create_polls
+from .export import FORMATS, export_results
+from .routers import use_primary
+from .metrics import registry
+from .throttle import allow_login_attempt, client_ip
 
 
 class IndexView(generic.ListView):
     template_name = "polls/index.html"
     context_object_name = "question_list"
+    page_size = 5
 
     def get_queryset(self):
         """
-        Return the last five published questions (not including those set to be
-        published in the future).
+        Return the page of five published questions (not including those set to be
+        published in the future) that follows the `after` cursor, starting from the
+        latest ones (see polls/pagination.py).
         """
-        return Question.objects.filter(pub_date__lte=timezone.now()).order_by(
-            "-pub_date"
-        )[:5]
+        try:
+            questions, self.next_cursor = get_page(
+                Question.objects.all(),
+                self.request.GET.get("after"),
+                self.page_size,
+                timezone.now(),
+            )
+        except ValueError:
+            raise Http404("Invalid page.")
+        return questions
+
+    def get(self, request: WSGIRequest, *args, **kwargs):
+        # anonymous visitors all see the same page, so it can be cached whole
+        if request.user.is_authenticated:
+            return super().get(request, *args, **kwargs)
+
+        cursor = request.GET.get("after")
+        content = get_cached_index_page(cursor)
+        if content is not None:
+            return HttpResponse(content)
+
+        with use_primary():
+            response = super().get(request, *args, **kwargs).render()
+        cache_index_page(cursor, response.content)
+        return response
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["next_cursor"] = self.next_cursor
+        context["is_first_page"] = not self.request.GET.get("after")
+        return context
+
+
+class SearchView(generic.ListView):
+    template_name = "polls/search.html"
+    context_object_name = "question_list"
+    page_size = 10
+
+    def get_queryset(self):
+        """
+        Return the page of published questions matching the `q` parameter, on the
+        question or on its choices, with the best matches first (see polls/search.py).
+        """
+        self.terms = self.request.GET.get("q", "").strip()
+        try:
+            self.page = int(self.request.GET.get("page", 1))
+        except ValueError:
+            raise Http404("Invalid page.")
+        if self.page < 1:
+            raise Http404("Invalid page.")
+
+        questions, self.has_next = search_questions(
+            self.terms, self.page, self.page_size
+        )
+        return questions
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["terms"] = self.terms
+        context["page"] = self.page
+        context["has_next"] = self.has_next
+        return context
+
+
+class TrendingView(generic.ListView):
+    template_name = "polls/trending.html"
+    context_object_name = "question_list"
+
+    def get_queryset(self):
+        """
+        Return the published questions with the most votes lately, each with its
+        `total_votes` and its `score` (see polls/trending.py).
+        """
+        leaderboard = get_leaderboard()
+        questions = Question.objects.filter(pub_date__lte=timezone.now()).in_bulk(
+            [question_id for question_id, _, _ in leaderboard]
+        )
+        trending = []
+        for question_id, score, total_votes in leaderboard:
+            if question := questions.get(question_id):
+                question.score = current_score(score)
+                question.total_votes = total_votes
+                trending.append(question)
+        return trending
 
 
 class DetailView(generic.DetailView):
     model = Question
     template_name = "polls/details.html"
 
-    def get_queryset(self):
-        return Question.objects.filter(pub_date__lte=timezone.now())
+    def get_object(self, queryset=None):
+        # the question and its choices come from its snapshot (see polls/caching.py)
+        question, self.choices = get_poll_snapshot(self.kwargs[self.pk_url_kwarg])
+        if question.pub_date > timezone.now():
+            raise Http404("No Question matches the given query.")
+        return question
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["choices"] = self.choices
+        return context
 
 
 class ResultsView(generic.DetailView):
     model = Question
     template_name = "polls/results.html"
 
+    def get_object(self, queryset=None):
+        # the question and its choices come from its snapshot (see polls/caching.py)
+        question, self.choices = get_poll_snapshot(self.kwargs[self.pk_url_kwarg])
+        return question
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["choices"] = with_pending_votes(self.choices)
+        return context
+
+
+@method_decorator(staff_member_required, name="dispatch")
+class CacheStatsView(View):
+    def get(self, request: WSGIRequest):
+        return JsonResponse(
+            {
+                "snapshots": get_cache_stats("snapshot"),
+                "index": get_cache_stats("index"),
+                "api_index": get_cache_stats("api-index"),
+            }
+        )
+
+
+class MetricsView(View):
+    """Request metrics of this process, in the Prometheus text format, for staff
+    members and for scrapers that send `settings.POLLS_METRICS_TOKEN` as a bearer
+    token.
+    """
+
+    def get(self, request: WSGIRequest):
+        if not self.is_allowed(request):
+            raise PermissionDenied
+        return HttpResponse(registry.render(), content_type="text/plain; version=0.0.4")
+
+    def is_allowed(self, request: WSGIRequest) -> bool:
+        token = settings.POLLS_METRICS_TOKEN
+        authorization = request.headers.get("Authorization", "")
+        if token and hmac.compare_digest(
+            authorization.encode(), f"Bearer {token}".encode()
+        ):
+            return True
+        return request.user.is_active and request.user.is_staff
+
+
+def export_response(content, file_format: str) -> StreamingHttpResponse:
+    return StreamingHttpResponse(
+        content,
+        content_type=FORMATS[file_format],
+        headers={"Content-Disposition": f'attachment; filename="polls.{file_format}"'},
+    )
+
+
+@method_decorator(staff_member_required, name="dispatch")
+class ExportView(View):
+    """Streams every choice with its question and vote count, as CSV or as
+    newline-delimited JSON (`?format=ndjson`).
+    """
+
+    def get(self, request: WSGIRequest):
+        file_format = request.GET.get("format", "csv")
+        if file_format not in FORMATS:
+            return HttpResponseBadRequest("Unknown format.")
+
+        return export_response(export_results(file_format), file_format)
+
 
 class VoteView(View):
     class ErrorMessages(Enum):
         INVALID_CHOICE = "Please select one of the options below."
+        ALREADY_VOTED = "You have already voted on this poll."
 
     def post(self, request: WSGIRequest, question_id: int):
         if request.user.is_authenticated:
-            question = get_object_or_404(Question, pk=question_id)
+            question, choices = get_poll_snapshot(question_id)
             try:
-                choice = question.choice_set.get(pk=request.POST["choice"])
-            except (KeyError, Choice.DoesNotExist):
+                choice = self.get_choice(choices, request.POST["choice"])
+            except (KeyError, ValueError, Choice.DoesNotExist):
                 return render(
                     request,
                     "polls/details.html",
                     context={
                         "question": question,
+                        "choices": choices,
                         "error_message": self.ErrorMessages.INVALID_CHOICE.value,
                     },
                 )
-            else:
-                choice.votes = (
-                    F("votes") + 1
-                )  # Performs the update directly on the database
-                choice.save()
 
+            try:
+                cast_vote(request.user, choice)
+            except AlreadyVoted:
+                return render(
+                    request,
+                    "polls/details.html",
+                    context={
+                        "question": question,
+                        "choices": choices,
+                        "error_message": self.ErrorMessages.ALREADY_VOTED.value,
+                    },
+                )
+            else:
                 return HttpResponseRedirect(
                     reverse("polls:results", args=(question.id,))
                 )
@@ -86,6 +279,15 @@ class VoteView(View):
 
             return HttpResponseRedirect(url)
 
+    @staticmethod
+    def get_choice(choices: list[Choice], choice_id: str) -> Choice:
+        """Finds the choice with `choice_id` among the choices of the question."""
+        choice_id = int(choice_id)
+        for choice in choices:
+            if choice.pk == choice_id:
+                return choice
+        raise Choice.DoesNotExist
+
 
 class CreateQuestionView(View):
     class ErrorMessages(Enum):
@@ -141,9 +343,7 @@ class CreateQuestionView(View):
 
             if request.user.is_authenticated:
                 # create poll
-                question = Question.objects.create(question_text=question_text)
-                for choice in choices:
-                    question.choice_set.create(choice_text=choice)
+                create_polls([(question_text, None, choices)])
             else:
                 # get params
                 params = {
@@ -174,6 +374,9 @@ class CreateQuestionView(View):
 
 
 class LoginView(View):
+    class ErrorMessages(Enum):
+        TOO_MANY_ATTEMPTS = "Too many login attempts, please try again later."
+
     def get(self, request: WSGIRequest):
         params_url = f"?{query}" if (query := request.GET.urlencode()) else ""
         error_message = request.GET.get("error")
@@ -192,6 +395,22 @@ class LoginView(View):
     def post(self, request: WSGIRequest):
         params_url = f"?{query}" if (query := request.GET.urlencode()) else ""
         next_url = request.GET.get("next") or reverse("polls:index")
+
+        # checked before the form hashes the password
+        username = request.POST.get("username", "")
+        if not allow_login_attempt(client_ip(request), username):
+            return render(
+                request,
+                "polls/auth.html",
+                context={
+                    "form": LoginForm(initial={"username": username}),
+                    "name": "login",
+                    "params": params_url,
+                    "error_message": self.ErrorMessages.TOO_MANY_ATTEMPTS.value,
+                },
+                status=429,
+            )
+
         form = LoginForm(data=request.POST)
         if form.is_valid():
             user = form.get_user()